@@ -0,0 +1,126 @@
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from components import cleaner
+
+# Throughput benchmark for components/cleaner on a synthetic raw dump of a
+# 20k-track playlist: the original list + index loop versus the streaming
+# state-machine parser, reading the same file.
+#
+#   python -m benchmarks.bench_cleaner
+
+TRACKS = 20000
+MALFORMED_EVERY = 500  # every Nth block loses its artist line
+
+WORDS = ["love", "night", "dil", "tera", "mera", "sky", "fire", "rain", "heart", "dance", "ishq", "home"]
+ARTISTS = ["Arijit Singh", "Shreya Ghoshal & Sonu Nigam", "The Weeknd feat. Daft Punk",
+           "Pritam, Arijit Singh", "Taylor Swift", "Diljit Dosanjh"]
+HEADER = ["Amazon Music", "Home", "Find", "Library", "Search", "Playlist", "", "", "Bench Playlist",
+          f"{TRACKS} SONGS", "2 HOURS AND 5 MINUTES", "2024", ""]
+FOOTER = ["Contact Us", "Sorry, something went wrong", "2024"]
+
+# --- Original cleaner, as it was before streaming ---
+
+def legacy_clean(input_file_path):
+    with open(input_file_path, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f if line.strip()]
+
+    playlist_data = [["Number", "Title", "Artist"]]
+    i = 0
+    while i + 2 < len(lines):
+        if lines[i].isdigit():
+            number = lines[i]
+            title = lines[i + 1]
+            artist = lines[i + 3]
+
+            if title and artist:
+                playlist_data.append([number, title, artist])
+                i += 3
+            else:
+                i += 1
+        else:
+            i += 1
+    return playlist_data[1:]
+
+# --- Synthetic input ---
+
+def write_dump(path, count, malformed_every=None, seed=42):
+    rng = random.Random(seed)
+    expected = []
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(HEADER) + "\n")
+        for n in range(1, count + 1):
+            title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+            artist = rng.choice(ARTISTS)
+            if malformed_every and n % malformed_every == 0:
+                f.write(f"{n}\n{title}\nE\n")
+                continue
+            f.write(f"{n}\n{title}\nE\n{artist}\n{title} (Album)\n{rng.randint(2, 6)}:{rng.randint(0, 59):02d}\n\n")
+            expected.append((str(n), title, artist))
+        f.write("\n".join(FOOTER) + "\n")
+    return expected
+
+def timed(label, fn, path):
+    start = time.perf_counter()
+    rows = fn()
+    elapsed = time.perf_counter() - start
+    # Memory is measured on a second run, since tracing slows parsing down several times
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"{label:<28} {len(rows) / elapsed:>10,.0f} tracks/s  {size_mb / elapsed:>6.1f} MB/s  "
+          f"peak {peak / 1024 / 1024:>5.1f} MB  ({elapsed * 1000:.0f} ms)")
+    return elapsed
+
+def streaming_count(path):
+    # Consume the records without keeping them, as the CSV writer and uploader do
+    rows = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for _ in cleaner.iter_tracks(f):
+            rows += 1
+    return range(rows)
+
+def write_csv(path, csv_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        saved = cleaner.clean_amazon_playlist(path, csv_path)
+    return range(TRACKS) if saved else []
+
+def main():
+    folder = tempfile.mkdtemp(prefix="trackswap-bench-")
+    clean_path = os.path.join(folder, "clean_dump.txt")
+    noisy_path = os.path.join(folder, "noisy_dump.txt")
+    expected = write_dump(clean_path, TRACKS)
+    noisy_expected = write_dump(noisy_path, TRACKS, malformed_every=MALFORMED_EVERY)
+
+    with open(clean_path, "r", encoding="utf-8") as f:
+        assert list(cleaner.iter_tracks(f)) == expected
+    report = cleaner.ParseReport()
+    with open(noisy_path, "r", encoding="utf-8") as f:
+        assert list(cleaner.iter_tracks(f, report)) == noisy_expected
+    assert report.malformed == TRACKS // MALFORMED_EVERY
+
+    # The index loop takes the wrong line as the artist whenever a block is short
+    legacy_noisy = legacy_clean(noisy_path)
+    misaligned = sum(1 for row in legacy_noisy if tuple(row) not in set(noisy_expected))
+
+    size_mb = os.path.getsize(clean_path) / 1024 / 1024
+    print(f"🧪 Parsing a {TRACKS:,}-track raw dump ({size_mb:.1f} MB)\n")
+    before = timed("before (list + index loop)", lambda: legacy_clean(clean_path), clean_path)
+    after = timed("after (streaming parser)", lambda: streaming_count(clean_path), clean_path)
+    csv_path = os.path.join(folder, "out.csv")
+    timed("after, raw -> CSV end to end", lambda: write_csv(clean_path, csv_path), clean_path)
+
+    print(f"\n⚡ Speedup: {before / after:.1f}x")
+    print(f"🧩 Dump with a short block every {MALFORMED_EVERY} tracks: streaming parser kept "
+          f"{report.records} records and reported {report.malformed} malformed blocks; "
+          f"the index loop produced {misaligned} misaligned rows.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import random
+import statistics
+import time
+
+from components import fuzzy_index
+
+# Benchmark for components/fuzzy_index: build time and size for an index of
+# 50k known tracks, lookup latency, and how many re-spelled queries it
+# answers versus how many near-misses (other numbers, remixes, other
+# artists) it wrongly accepts.
+#
+#   python -m benchmarks.bench_fuzzy
+
+ENTRIES = 50000
+QUERIES = 5000
+SEED = 42
+
+# Consonant-vowel syllables give roughly the trigram variety of real titles
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvwyz" for v in ["a", "e", "i", "o", "u", "aa", "ee"]] + ["n", "r", "sh"]
+VOCABULARY = 3000
+ARTISTS = ["Arijit Singh", "Shreya Ghoshal", "Sonu Nigam", "The Weeknd", "Daft Punk", "Pritam",
+           "Taylor Swift", "Diljit Dosanjh", "Atif Aslam", "Neha Kakkar", "A.R. Rahman", "Badshah"]
+
+def make_words(rng):
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))))
+    return sorted(words)
+
+def make_entries(rng):
+    words = make_words(rng)
+    entries = []
+    titles = set()
+    while len(entries) < ENTRIES:
+        title = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.2:
+            title += f" {rng.randint(1, 5)}"
+        artist = rng.choice(ARTISTS)
+        if (title, artist) in titles:
+            continue
+        titles.add((title, artist))
+        entries.append((title, artist, f"spotify:track:{len(entries):022d}"))
+    return entries
+
+def respell(title, artist, rng):
+    """
+    The same track as another service might list it.
+    """
+    variant = rng.randrange(5)
+    if variant == 0:
+        return f"{title.title()} (From \"Some Film\")", artist
+    if variant == 1:
+        return f"{title} feat. {rng.choice(ARTISTS)}", artist
+    if variant == 2:
+        return title.replace("aa", "a").replace("ee", "i") + "!", artist
+    if variant == 3:
+        return f"{title} [Official Video]", f"{artist}, {rng.choice(ARTISTS)}"
+    return title.replace(" ", "  ").upper(), artist.lower()
+
+def near_miss(title, artist, rng):
+    """
+    A different track that looks like a known one.
+    """
+    variant = rng.randrange(3)
+    if variant == 0:
+        return f"{title} {rng.randint(6, 9)}", artist
+    if variant == 1:
+        return f"{title} remix", artist
+    return title, rng.choice([a for a in ARTISTS if a != artist])
+
+def main():
+    rng = random.Random(SEED)
+    entries = make_entries(rng)
+    known = {(fuzzy_index.fuzzy_title(t), a) for t, a, _ in entries}
+
+    index = fuzzy_index.FuzzyIndex()
+    start = time.perf_counter()
+    index.add_many(entries)
+    index.build_seconds = time.perf_counter() - start
+    stats = index.stats()
+    print(f"🧪 Fuzzy index over {stats['entries']:,} tracks: {stats['trigrams']:,} trigrams, "
+          f"{stats['postings']:,} postings, built in {stats['build_seconds'] * 1000:.0f} ms\n")
+
+    samples = rng.sample(range(ENTRIES), QUERIES)
+    for label, make_query, expect_hit in (("re-spelled known tracks", respell, True),
+                                          ("near-misses", near_miss, False)):
+        latencies = []
+        right = wrong = 0
+        for i in samples:
+            title, artist, uri = entries[i]
+            query_title, query_artist = make_query(title, artist, rng)
+            if not expect_hit and (fuzzy_index.fuzzy_title(query_title), query_artist) in known:
+                continue  # the "near-miss" happens to be another known track
+            start = time.perf_counter()
+            found = index.lookup(query_title, query_title, query_artist)
+            latencies.append(time.perf_counter() - start)
+            if found == uri and expect_hit:
+                right += 1
+            elif found is not None:
+                wrong += 1
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        summary = f"{right}/{len(latencies)} matched" if expect_hit else f"{len(latencies)} queries"
+        print(f"{label:<24} {summary}, {wrong} wrong matches, "
+              f"p50 {statistics.median(latencies) * 1e6:.0f} µs, p99 {p99 * 1e6:.0f} µs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import random
+import re
+import time
+
+from components import normalize
+
+# Micro-benchmark for components/normalize: strings/sec for the original
+# per-call regex helpers versus the precompiled, memoized ones on a
+# synthetic 10k-track playlist.
+#
+#   python -m benchmarks.bench_normalize
+
+TRACKS = 10000
+
+# --- Original helpers, as they were nested inside script.main ---
+
+LEGACY_UNWANTED_KEYWORDS = [
+    "remix", "lofi", "lo-fi", "chill", "version", "cover", "mix", "edit",
+    "acoustic", "reverb", "slowed", "speedup", "sped up", "nightcore", "karaoke", "reprise"
+]
+
+def legacy_clean_track_name(name):
+    name = re.sub(r"\s*\([^)]*\)", "", name)
+    name = re.sub(r"\s*\[[^]]*\]", "", name)
+    name = re.sub(r"(?i)(Original Motion Picture Soundtrack|From.*Album)", "", name)
+    return name.lower().strip()
+
+def legacy_clean_artist_name(name):
+    return re.sub(r"(?i)( - topic|official|music|audio)", "", name.lower()).strip()
+
+def legacy_expand_artists(artist):
+    parts = re.split(r",|&|feat\.|Feat\.|featuring|Featuring", artist)
+    return [legacy_clean_artist_name(p) for p in parts if p.strip()]
+
+def legacy_normalize_text(s):
+    s = s.lower()
+    s = re.sub(r"[^\w\s]", " ", s)
+    s = re.sub(r"\s+", " ", s)
+    return s.strip()
+
+def legacy_is_unwanted_version(track_name, raw_track):
+    norm_name = legacy_normalize_text(track_name)
+    norm_raw = legacy_normalize_text(raw_track)
+    for bad in LEGACY_UNWANTED_KEYWORDS:
+        bad_norm = legacy_normalize_text(bad)
+        if bad_norm in norm_name and bad_norm not in norm_raw:
+            return True
+    return False
+
+# --- Synthetic input ---
+
+WORDS = ["love", "night", "dil", "tera", "mera", "sky", "fire", "rain", "heart", "dance", "ishq", "home"]
+SUFFIXES = ["", "", "", " (From \"Film\")", " [Remastered]", " - Lofi Flip", " (Slowed + Reverb)", " (Acoustic)"]
+ARTISTS = ["Arijit Singh", "Shreya Ghoshal & Sonu Nigam", "The Weeknd feat. Daft Punk",
+           "Pritam, Arijit Singh", "Official Music Audio - Topic", "Taylor Swift"]
+
+def make_tracks(count, seed=42):
+    rng = random.Random(seed)
+    tracks = []
+    for _ in range(count):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+        tracks.append((title + rng.choice(SUFFIXES), rng.choice(ARTISTS)))
+    return tracks
+
+def run_pass(tracks, clean, expand, normalize_fn, unwanted):
+    for title, artist in tracks:
+        clean(title)
+        expand(artist)
+        normalize_fn(title)
+        # Compare against a candidate name, as the matcher does for every search result
+        unwanted(title + " remix", title)
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {TRACKS / elapsed:>12,.0f} tracks/s  ({elapsed * 1000:.1f} ms)")
+    return elapsed
+
+def check_equivalence(tracks):
+    for title, artist in tracks:
+        assert normalize.clean_track_name(title) == legacy_clean_track_name(title)
+        assert normalize.expand_artists(artist) == legacy_expand_artists(artist)
+        assert normalize.normalize_text(title) == legacy_normalize_text(title)
+        for candidate in (title, title + " remix", title + " (Lo-Fi)"):
+            assert normalize.is_unwanted_version(candidate, title) == legacy_is_unwanted_version(candidate, title)
+    titles = [title for title, _ in tracks]
+    assert normalize.normalize_column(titles) == [legacy_normalize_text(t) for t in titles]
+
+def clear_caches():
+    for fn in (normalize.clean_track_name, normalize.clean_artist_name, normalize._expand_artists,
+               normalize.normalize_text, normalize.is_unwanted_version):
+        fn.cache_clear()
+
+def main():
+    tracks = make_tracks(TRACKS)
+    check_equivalence(tracks)
+    clear_caches()
+
+    print(f"🧪 Normalizing {TRACKS:,} synthetic tracks (4 helpers per track)\n")
+    before = timed("before (per-call re.sub)", lambda: run_pass(
+        tracks, legacy_clean_track_name, legacy_expand_artists,
+        legacy_normalize_text, legacy_is_unwanted_version))
+    after_cold = timed("after, cold caches", lambda: run_pass(
+        tracks, normalize.clean_track_name, normalize.expand_artists,
+        normalize.normalize_text, normalize.is_unwanted_version))
+    after_warm = timed("after, warm caches (rerun)", lambda: run_pass(
+        tracks, normalize.clean_track_name, normalize.expand_artists,
+        normalize.normalize_text, normalize.is_unwanted_version))
+
+    titles = [title for title, _ in tracks]
+    column_before = timed("column: legacy normalize_text", lambda: [legacy_normalize_text(t) for t in titles])
+    column_after = timed("column: normalize_column", lambda: normalize.normalize_column(titles))
+
+    print(f"\n⚡ Speedup: {before / after_cold:.1f}x cold, {before / after_warm:.1f}x warm, "
+          f"{column_before / column_after:.1f}x for a whole column")
+
+if __name__ == "__main__":
+    main()
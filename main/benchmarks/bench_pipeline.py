@@ -0,0 +1,302 @@
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+from components import batch
+from components import cache
+from components import catalog
+from components import cleaner
+from components import client
+from components import fuzzy_index
+from components import journal
+from components import metrics
+from components import pipeline
+from components import script
+from components import sync_state
+from components.mock_server import start_server
+from components.ratelimit import RequestScheduler, SHARED_MAX_CONCURRENCY
+
+# End-to-end benchmark of cleaner -> uploader against the local Spotify
+# stand-in in components/mock_server.py, so no real API calls are made.
+# Each scenario runs twice: a cold pass (new playlist, empty track cache)
+# and a warm pass (cached tracks, existing playlist diffed in place). The
+# batch scenario adds an unchanged pass, where every playlist is skipped
+# by its fingerprint.
+#
+#   python -m benchmarks.bench_pipeline
+#   python -m benchmarks.bench_pipeline --scenarios 1000 --latency 0.05 --throttle 0.01
+#
+# Cache, playlist index, journals, sync state, metrics reports and
+# not-found files go to a temporary folder.
+
+DEFAULT_SCENARIOS = "100,1000,10000,batch"
+BATCH_PLAYLISTS = 5
+BATCH_TRACKS = 1000
+BATCH_OVERLAP = 0.5   # share of each batch playlist drawn from a common pool
+MISSING_RATIO = 0.05  # tracks absent from the mock catalog, searched with every query
+
+WORDS = ["love", "night", "dil", "tera", "mera", "sky", "fire", "rain", "heart", "dance", "ishq", "home"]
+ARTISTS = ["Arijit Singh", "Shreya Ghoshal & Sonu Nigam", "The Weeknd feat. Daft Punk",
+           "Pritam, Arijit Singh", "Taylor Swift", "Diljit Dosanjh"]
+
+# --- Synthetic data ---
+
+def make_tracks(count, rng, prefix="t"):
+    tracks = []
+    for i in range(count):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))).title()
+        tracks.append((f"{title} {prefix}{i}", rng.choice(ARTISTS)))
+    return tracks
+
+def make_catalog(tracks, rng):
+    catalog_tracks = []
+    for n, (title, artist) in enumerate(tracks):
+        if rng.random() < MISSING_RATIO:
+            continue
+        catalog_tracks.append({
+            "name": title,
+            "artists": [artist.split(",")[0].split("&")[0].split(" feat.")[0].strip()],
+            "uri": f"spotify:track:{n:022d}",
+        })
+    return catalog_tracks
+
+def make_raw_lines(name, tracks):
+    """
+    Raw text in the layout the GUI scraper copies from the playlist page.
+    """
+    lines = ["Amazon Music", "Home", "Find", "Library", "Search", "Playlist", "", "", name,
+             f"{len(tracks)} SONGS", ""]
+    for number, (title, artist) in enumerate(tracks, start=1):
+        lines.extend([str(number), title, "E", artist, "3:45"])
+    return [line + "\n" for line in lines]
+
+# --- Measurement ---
+
+class StageTimer:
+    """
+    Wall time per stage and client-side latency of every HTTP request,
+    attributed to the stage that was running when it was sent.
+    """
+
+    def __init__(self):
+        self.current = None
+        self.wall = defaultdict(float)
+        self.latencies = defaultdict(list)
+
+    def hook(self, resp, *args, **kwargs):
+        self.latencies[self.current].append(resp.elapsed.total_seconds())
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        self.current = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.wall[name] += time.perf_counter() - start
+            self.current = None
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+def bench_client(args, timer):
+    """
+    A client of its own for this scenario's mock server (the shared one
+    would keep the previous server's URL), with a scheduler sized for the
+    mock server and every response timed by `timer`.
+    """
+    sp = client.build_client()
+    sp._session.hooks["response"].append(timer.hook)
+    scheduler = RequestScheduler(rate=args.rate, max_rate=args.rate, max_concurrency=args.concurrency)
+    return sp, scheduler
+
+# --- Scenarios ---
+
+def run_single(args, raw_lines, timer):
+    sp, scheduler = bench_client(args, timer)
+
+    with timer.stage("clean"):
+        playlist_name, lines = cleaner.split_playlist_name(raw_lines)
+        tracks = list(cleaner.iter_tracks(lines))
+    with timer.stage("playlist"):
+        playlist_id, update_existing = script.find_or_create_playlist(sp, playlist_name, scheduler)
+    queries = script.prepare_queries(tracks)
+    if update_existing or args.no_overlap:
+        with timer.stage("resolve"):
+            _, resolved, _ = script.resolve_tracks(sp, scheduler, queries, args.backend)
+        with timer.stage("write"):
+            track_uris = [uri for uri in resolved if uri]
+            script.write_playlist(sp, scheduler, playlist_id, update_existing, playlist_name, track_uris)
+    else:
+        # New playlists are written while searching, so the two stages share one timer
+        with timer.stage("resolve+write"):
+            _, resolved, _, _ = script.resolve_and_add(sp, scheduler, playlist_id, playlist_name, queries,
+                                                       args.backend)
+    return len(tracks), sum(1 for uri in resolved if uri)
+
+def run_batch(args, playlists, timer):
+    scraped = {url: raw_lines for url, raw_lines in playlists}
+
+    def scrape(url, scraper_backend=None, debug_dir=None):
+        playlist_name, lines = cleaner.split_playlist_name(scraped[url])
+        return playlist_name, cleaner.iter_tracks(lines)
+
+    original_scrape, original_client = pipeline.scrape, script.create_client
+    pipeline.scrape = scrape
+    script.create_client = lambda cancel_event=None: bench_client(args, timer)
+    try:
+        with timer.stage("batch"):
+            results = batch.run_batch(list(scraped), workers=args.workers, search_backend=args.backend)
+    finally:
+        pipeline.scrape, script.create_client = original_scrape, original_client
+    return sum(r["tracks"] for r in results), sum(r.get("found", 0) for r in results)
+
+def run_scenario(args, label, catalog_tracks, run, passes=("cold", "warm")):
+    """
+    Run `run(timer)` once per pass against a fresh mock server and
+    return one result dict per pass.
+    """
+    server, base_url = start_server(catalog_tracks, latency=args.latency, jitter=args.jitter,
+                                    throttle_rate=args.throttle, seed=args.seed)
+    os.environ["TRACKSWAP_API_BASE"] = base_url
+    results = []
+    try:
+        for pass_name in passes:
+            if pass_name == "warm" and os.path.exists(sync_state.SYNC_STATE_FILE):
+                # Forget the fingerprints so the warm pass measures the diff sync, not the skip
+                os.remove(sync_state.SYNC_STATE_FILE)
+            timer = StageTimer()
+            requests_before = server.request_count
+            throttled_before = server.throttled
+            tracemalloc.reset_peak()
+            start = time.perf_counter()
+            quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            with quiet:
+                tracks, found = run(timer)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            api_calls = server.request_count - requests_before
+            results.append({
+                "scenario": label,
+                "pass": pass_name,
+                "tracks": tracks,
+                "found": found,
+                "seconds": elapsed,
+                "tracks_per_sec": tracks / elapsed if elapsed else 0.0,
+                "api_calls": api_calls,
+                "calls_per_track": api_calls / tracks if tracks else 0.0,
+                "throttled": server.throttled - throttled_before,
+                "peak_mb": peak / 1024 / 1024,
+                "stages": {
+                    stage: {
+                        "wall": timer.wall[stage],
+                        "requests": len(timer.latencies[stage]),
+                        "p50": percentile(timer.latencies[stage], 50),
+                        "p95": percentile(timer.latencies[stage], 95),
+                        "p99": percentile(timer.latencies[stage], 99),
+                    }
+                    for stage in timer.wall
+                },
+            })
+            print_result(results[-1])
+    finally:
+        server.shutdown()
+    return results
+
+def print_result(result):
+    print(f"\n🧪 {result['scenario']} ({result['pass']}): {result['found']}/{result['tracks']} found in "
+          f"{result['seconds']:.2f}s -> {result['tracks_per_sec']:,.0f} tracks/s, "
+          f"{result['calls_per_track']:.2f} API calls/track, {result['throttled']} x 429, "
+          f"peak {result['peak_mb']:.1f} MB")
+    for stage, s in result["stages"].items():
+        line = f"    {stage:<13} {s['wall']:>8.3f}s"
+        if s["requests"]:
+            line += (f"  {s['requests']:>6} requests  p50 {s['p50'] * 1000:6.1f}ms  "
+                     f"p95 {s['p95'] * 1000:6.1f}ms  p99 {s['p99'] * 1000:6.1f}ms")
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark against a mock Spotify API.")
+    parser.add_argument("--scenarios", default=DEFAULT_SCENARIOS,
+                        help="comma-separated track counts and/or 'batch' (default: %(default)s)")
+    parser.add_argument("--backend", choices=["threads", "async"], default=None,
+                        help="search backend (default: TRACKSWAP_SEARCH_BACKEND or threads)")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="+/- random latency in seconds")
+    parser.add_argument("--throttle", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--rate", type=float, default=1000.0, help="scheduler requests/sec")
+    parser.add_argument("--concurrency", type=int, default=SHARED_MAX_CONCURRENCY, help="scheduler max concurrency")
+    parser.add_argument("--workers", type=int, default=batch.BATCH_WORKERS, help="batch workers")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--no-overlap", action="store_true",
+                        help="finish every search before adding tracks to new playlists, as before")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    json_path = os.path.abspath(args.json) if args.json else None
+    workdir = tempfile.mkdtemp(prefix="trackswap-bench-")
+    cache.CACHE_FILE = os.path.join(workdir, "track_cache.sqlite3")
+    catalog.CATALOG_FILE = os.path.join(workdir, "playlist_index.json")
+    journal.JOURNAL_FOLDER = os.path.join(workdir, "journals")
+    sync_state.SYNC_STATE_FILE = os.path.join(workdir, "sync_state.json")
+    metrics.RUNS_FILE = os.path.join(workdir, "reports", "runs.jsonl")
+    metrics.PROMETHEUS_FILE = os.path.join(workdir, "reports", "trackswap.prom")
+    os.environ["TRACKSWAP_ACCESS_TOKEN"] = "mock-token"
+    # Answer "update existing playlist?" with yes on the warm pass
+    builtins.input = lambda prompt="": "y"
+    os.chdir(workdir)
+    tracemalloc.start()
+
+    results = []
+    for scenario in args.scenarios.split(","):
+        scenario = scenario.strip()
+        # Every scenario starts from an empty cache and playlist index
+        for path in (cache.CACHE_FILE, catalog.CATALOG_FILE, sync_state.SYNC_STATE_FILE):
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+        catalog._catalog = None
+        fuzzy_index._index = None
+
+        if scenario == "batch":
+            shared = make_tracks(BATCH_TRACKS, rng, prefix="s")
+            playlists = []
+            all_tracks = list(shared)
+            for n in range(BATCH_PLAYLISTS):
+                own = make_tracks(int(BATCH_TRACKS * (1 - BATCH_OVERLAP)), rng, prefix=f"p{n}-")
+                tracks = rng.sample(shared, int(BATCH_TRACKS * BATCH_OVERLAP)) + own
+                rng.shuffle(tracks)
+                all_tracks.extend(own)
+                playlists.append((f"bench://playlist/{n}", make_raw_lines(f"Bench batch {n}", tracks)))
+            label = f"batch {BATCH_PLAYLISTS}x{BATCH_TRACKS}"
+            run = lambda timer: run_batch(args, playlists, timer)
+            passes = ("cold", "warm", "unchanged")
+        else:
+            count = int(scenario)
+            all_tracks = make_tracks(count, rng)
+            raw_lines = make_raw_lines(f"Bench {count}", all_tracks)
+            label = f"{count} tracks"
+            run = lambda timer, raw_lines=raw_lines: run_single(args, raw_lines, timer)
+            passes = ("cold", "warm")
+        results.extend(run_scenario(args, label, make_catalog(all_tracks, rng), run, passes))
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📄 Results saved to '{json_path}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Cold-start benchmark: wall time, peak RSS and number of loaded modules for
+# importing each entry point in a fresh interpreter.
+#
+#   python -m benchmarks.bench_startup
+#   python -m benchmarks.bench_startup --baseline a93cf7f~1
+#
+# With --baseline, the same imports are also timed in a temporary git
+# worktree of that revision and both sets of numbers are printed side by
+# side. Optional GUI dependencies that aren't installed, and entry points
+# the baseline doesn't have yet, are reported and skipped, so the numbers
+# for those are a lower bound on such machines.
+
+RUNS = 5
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    ("interpreter only", "pass"),
+    ("components (pipeline + batch)", "from components import pipeline, batch"),
+    ("cli.py --help", "import cli; cli.build_parser().format_help()"),
+    ("cli.py, parse args + scraper", "import cli; cli.build_parser(); from components import pipeline"),
+    ("GUI deps (PyQt5, pyautogui, pyperclip)", "import PyQt5.QtWidgets; import pyautogui; import pyperclip"),
+]
+
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+missing = None
+try:
+    exec(compile(sys.argv[1], "<target>", "exec"))
+except ImportError as e:
+    missing = e.name
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "rss_kb": rss_kb, "modules": len(sys.modules), "missing": missing}))
+"""
+
+def measure(code, main_dir=MAIN_DIR):
+    samples = []
+    for _ in range(RUNS):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, code], cwd=main_dir, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(s["seconds"] for s in samples),
+        "rss_mb": statistics.median(s["rss_kb"] for s in samples) / 1024,
+        "modules": samples[-1]["modules"],
+        "missing": samples[-1]["missing"],
+    }
+
+def describe(result):
+    line = f"{result['seconds'] * 1000:>8.1f} ms  {result['rss_mb']:>6.1f} MB RSS  {result['modules']:>5} modules"
+    if result["missing"]:
+        line += f"  (stopped at missing module '{result['missing']}')"
+    return line
+
+def measure_revision(rev):
+    """
+    Measure every target in a temporary git worktree checked out at `rev`.
+    """
+    folder = tempfile.mkdtemp()
+    worktree = os.path.join(folder, "tree")
+    subprocess.run(["git", "worktree", "add", "--detach", "--quiet", worktree, rev], cwd=MAIN_DIR, check=True)
+    try:
+        return [measure(code, os.path.join(worktree, "main")) for _, code in TARGETS]
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=MAIN_DIR, check=True)
+        shutil.rmtree(folder, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Import cost of each entry point.")
+    parser.add_argument("--baseline", metavar="REV", help="also measure this git revision, for comparison")
+    args = parser.parse_args()
+
+    print(f"🧪 Import cost per entry point (median of {RUNS} fresh interpreters)\n")
+    baseline = measure_revision(args.baseline) if args.baseline else None
+    for i, (label, code) in enumerate(TARGETS):
+        result = measure(code)
+        if baseline is None:
+            print(f"{label:<40} {describe(result)}")
+        else:
+            print(label)
+            print(f"    {args.baseline:<12} {describe(baseline[i])}")
+            print(f"    {'now':<12} {describe(result)}")
+
+if __name__ == "__main__":
+    main()
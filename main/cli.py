@@ -0,0 +1,126 @@
+import argparse
+import builtins
+import contextlib
+import json
+import signal
+import sys
+import time
+
+# Headless entry point for cron jobs and servers: no PyQt5, and the Spotify
+# client and GUI automation are only imported by the stage that needs them.
+#
+#   python cli.py --url https://music.amazon.com/playlists/... --scraper http
+#   python cli.py --batch playlists.txt --json > summary.json
+#   python cli.py --batch playlists.txt --scraper http --watch 3600
+#   python cli.py --url https://music.amazon.com/playlists/... --profile
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Copy Amazon Music playlists to Spotify without the GUI.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--url", help="sync a single playlist")
+    source.add_argument("--batch", metavar="FILE", help="sync every playlist URL listed in FILE, one per line")
+    parser.add_argument("--scraper", choices=["gui", "http"], default=None,
+                        help="scraper backend (default: TRACKSWAP_SCRAPER or gui)")
+    parser.add_argument("--search-backend", choices=["threads", "async"], default=None,
+                        help="search backend (default: TRACKSWAP_SEARCH_BACKEND or threads)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="playlists processed at once in --batch mode (default: TRACKSWAP_SYNC_WORKERS or 4)")
+    parser.add_argument("--create-new", action="store_true",
+                        help="create a new playlist even if one with the same name exists (default: update it)")
+    parser.add_argument("--json", action="store_true",
+                        help="print the summary as JSON on stdout; progress goes to stderr")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", default=None,
+                        help="with --batch, re-read FILE and sync again every SECONDS until interrupted; "
+                             "unchanged playlists are skipped")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile each run and write the reports to components/music_data/profiles/ "
+                             "(also TRACKSWAP_PROFILE=1; send SIGUSR1 to switch it on or off while running)")
+    return parser
+
+def run_single(args):
+    from components import pipeline
+    try:
+        result = pipeline.run(args.url, scraper_backend=args.scraper, search_backend=args.search_backend)
+        result["status"] = "ok"
+    except Exception as e:
+        print(f"\n❌ An error occurred: {e}")
+        result = {"status": "error", "error": str(e)}
+    result["url"] = args.url
+    return [result]
+
+def run_batch(args):
+    from components import batch
+    try:
+        urls = batch.read_playlist_urls(args.batch)
+    except OSError as e:
+        print(f"❌ Could not read {args.batch}: {e}")
+        return [{"url": args.batch, "status": "error", "error": str(e)}]
+    if not urls:
+        print(f"❌ No playlist URLs found in {args.batch}.")
+        return []
+    workers = args.workers or batch.BATCH_WORKERS
+    print(f"🧵 Syncing {len(urls)} playlists with up to {workers} at a time...")
+    return batch.run_batch(urls, workers=workers, scraper_backend=args.scraper,
+                           search_backend=args.search_backend)
+
+def watch(args):
+    """
+    Run the batch every args.watch seconds until Ctrl+C. With --json each
+    round's summary is printed as one JSON line. Between rounds, tracks not
+    found earlier are re-checked in the background as they fall due.
+    """
+    from components import retry_queue
+    out = sys.stdout
+    progress = contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+    rounds = 0
+    with progress:
+        try:
+            while True:
+                rounds += 1
+                print(f"\n🔁 Sync round {rounds} at {time.strftime('%Y-%m-%d %H:%M:%S')}")
+                results = run_batch(args)
+                if args.json:
+                    out.write(json.dumps(results, ensure_ascii=False) + "\n")
+                    out.flush()
+                print(f"💤 Next check in {args.watch:g}s (Ctrl+C to stop).")
+                with retry_queue.background():
+                    time.sleep(args.watch)
+        except KeyboardInterrupt:
+            print(f"\n👋 Stopped after {rounds} rounds.")
+    return 0
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.watch is not None and not args.batch:
+        parser.error("--watch needs --batch")
+    if args.watch is not None and args.watch <= 0:
+        parser.error("--watch needs a positive number of seconds")
+
+    from components import profiling
+    if args.profile:
+        profiling.enable()
+    if hasattr(signal, "SIGUSR1"):
+        # Applies from the next run on, e.g. the next --watch round
+        signal.signal(signal.SIGUSR1, lambda *_: print(
+            f"🔬 Profiling {'on' if profiling.toggle() else 'off'} from the next run.", file=sys.stderr))
+
+    # Nobody is there to answer "update existing playlist? [y/n]"
+    answer = "n" if args.create_new else "y"
+    builtins.input = lambda prompt="": answer if "y/n" in prompt.lower() else ""
+
+    if args.watch:
+        return watch(args)
+
+    # Keep stdout clean for the JSON summary
+    progress = contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+    with progress:
+        results = run_batch(args) if args.batch else run_single(args)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    return 0 if results and all(r.get("status") == "ok" for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import aiohttp
+
+from components.matcher import CandidateRanking, candidate_queries, SEARCH_LIMIT
+from components.metrics import registry as metrics
+from components.ratelimit import Cancelled, DeadlineExceeded
+from components.script import TRACK_DEADLINE
+
+API_BASE = "https://api.spotify.com/v1"
+
+async def _search(session, base_url, scheduler, semaphore, get_token, query, deadline):
+    async def search():
+        # The token is read for every request, so a refresh during a long run is picked up
+        headers = {"Authorization": f"Bearer {get_token()}"}
+        params = {"q": query, "type": "track", "limit": SEARCH_LIMIT}
+        async with session.get(f"{base_url}/search", params=params, headers=headers) as resp:
+            # A 429 raises ClientResponseError, which the scheduler turns into a shared pause
+            resp.raise_for_status()
+            return await resp.json()
+    # Only as many searches as the scheduler could ever admit wait on it at once
+    async with semaphore:
+        return await scheduler.call_async(search, deadline=deadline)
+
+async def _resolve(session, base_url, scheduler, semaphore, get_token, stats, on_result, idx, raw_track,
+                   clean_track, artist):
+    cancel_event = scheduler.cancel_event
+    start = time.monotonic()
+    deadline = start + TRACK_DEADLINE
+    ranking = CandidateRanking(raw_track, clean_track, artist)
+    calls = 0
+    failed = False
+    for query in candidate_queries(clean_track, artist):
+        if cancel_event is not None and cancel_event.is_set():
+            raise Cancelled()
+        try:
+            results = await _search(session, base_url, scheduler, semaphore, get_token, query, deadline)
+            calls += 1
+        except (DeadlineExceeded, asyncio.TimeoutError):
+            print(f"⏱️ Gave up on {raw_track} after {TRACK_DEADLINE}s.")
+            failed = True
+            break
+        except aiohttp.ClientError as e:
+            print(f"❌ Error searching {raw_track}: {e}")
+            failed = True
+            break
+        ranking.add(results["tracks"]["items"])
+        if ranking.confident:
+            break
+    uri = ranking.result()
+    metrics.observe("track_resolve_seconds", time.monotonic() - start)
+    if stats is not None:
+        stats.record(calls, uri is not None)
+    result = (uri is not None or (None if failed else False), uri, raw_track, artist)
+    if on_result is not None:
+        on_result(idx, result)
+    return result
+
+async def resolve_all(queries, scheduler, get_token, base_url=API_BASE, stats=None, on_result=None):
+    # One keep-alive connection pool shared by every in-flight search; the
+    # scheduler decides how many of them are actually in flight
+    semaphore = asyncio.Semaphore(scheduler.max_concurrency)
+    connector = aiohttp.TCPConnector(limit=scheduler.max_concurrency, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        return await asyncio.gather(*(
+            _resolve(session, base_url, scheduler, semaphore, get_token, stats, on_result, idx, *q)
+            for idx, q in enumerate(queries)
+        ))
+
+def search_tracks(queries, scheduler, get_token, base_url=API_BASE, stats=None, on_result=None):
+    """
+    Resolve (raw_track, clean_track, artist) queries concurrently on one
+    event loop. Every search goes through `scheduler` (a RequestScheduler,
+    possibly shared with threads), so it gets the same rate limit, AIMD
+    concurrency and 429 pauses as the thread backend. get_token() returns
+    the bearer token to send and is called for every request.
+    Returns (found, uri, raw_track, artist) tuples in the same order as `queries`.
+    Search calls per track are recorded in `stats` (a MatchStats) if given,
+    and on_result(index, result) is called as each track completes.
+    Raises Cancelled once the scheduler's cancel event is set; the other
+    searches are abandoned.
+    """
+    return asyncio.run(resolve_all(queries, scheduler, get_token, base_url=base_url, stats=stats,
+                                   on_result=on_result))
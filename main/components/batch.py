@@ -0,0 +1,228 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from components import pipeline
+from components import retry_queue
+from components import script
+from components.cache import TrackCache, normalize_key
+from components.journal import open_journal
+from components.metrics import registry as metrics
+from components.playlist_sync import fetch_snapshot_id
+from components.sync_state import SyncState, fingerprint
+
+# Runs many playlist jobs concurrently. Every job keeps its data in memory
+# (and in its own music_data/jobs/<n>/ folder when debug dumps are on), so
+# jobs never read or overwrite each other's files.
+#
+# A batch runs in three phases: scrape every playlist, resolve the union of
+# all their tracks once, then write each playlist from the shared results.
+# Playlists whose tracks and Spotify copy are unchanged since their last
+# sync (see sync_state.py) drop out after scraping.
+
+BATCH_WORKERS = int(os.getenv("TRACKSWAP_SYNC_WORKERS", "4"))
+JOBS_FOLDER = os.path.join(pipeline.SCRAPE_FOLDER, "jobs")
+
+def read_playlist_urls(playlists_file):
+    with open(playlists_file, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def scrape_job(idx, total, url, scraper_backend=None):
+    print(f"\n⏳ Scraping playlist {idx}/{total}: {url}")
+    debug_dir = os.path.join(JOBS_FOLDER, f"{idx:03d}") if pipeline.DEBUG_DUMPS else None
+    if debug_dir:
+        os.makedirs(debug_dir, exist_ok=True)
+    job = {"idx": idx, "url": url, "playlist": None, "tracks": 0, "found": 0, "not_found": []}
+    start = time.monotonic()
+    try:
+        job["playlist"], tracks = pipeline.scrape(url, scraper_backend, debug_dir)
+        job["queries"] = script.prepare_queries(list(tracks))
+        job["tracks"] = len(job["queries"])
+        job["status"] = "ok"
+    except Exception as e:
+        job["status"] = "error"
+        job["error"] = str(e)
+        print(f"\n❌ Error with playlist {idx}: {e}")
+    job["elapsed"] = time.monotonic() - start
+    return job
+
+def newly_found(cache, job, not_found):
+    """
+    Return True if a track the last sync couldn't find now resolves from
+    `cache`, e.g. after the background re-check found it.
+    """
+    missing = set(not_found)
+    return any(
+        cache.get(clean_track, artist)
+        for raw_track, clean_track, artist in job["queries"] if f"{raw_track} by {artist}" in missing
+    )
+
+def check_unchanged(sp, scheduler, state, cache, job):
+    """
+    Mark the job skipped if neither its cleaned tracks nor its Spotify
+    playlist changed since the last sync, and none of its missing tracks
+    has been found since. Returns True if skipped.
+    """
+    job["fingerprint"] = fingerprint(job["playlist"], job["queries"])
+    entry = state.candidate(job["url"], job["fingerprint"])
+    if entry is None:
+        return False
+    if entry["not_found"] and newly_found(cache, job, entry["not_found"]):
+        print(f"🆕 Playlist {job['idx']} has tracks that were found since the last sync.")
+        return False
+    try:
+        snapshot_id = fetch_snapshot_id(sp, entry["playlist_id"], scheduler)
+    except Exception as e:
+        # Deleted or unreadable: sync it again
+        print(f"⚠️ Could not check playlist {job['idx']} on Spotify, syncing it: {e}")
+        return False
+    if snapshot_id != entry["snapshot_id"]:
+        print(f"✏️ Playlist {job['idx']} was edited on Spotify since the last sync.")
+        return False
+    job.update(playlist_id=entry["playlist_id"], found=entry["found"], not_found=entry["not_found"],
+               skipped=True)
+    print(f"⏭️ Playlist {job['idx']} is unchanged since the last sync, skipping it.")
+    return True
+
+def remember_sync(sp, scheduler, state, job):
+    try:
+        snapshot_id = fetch_snapshot_id(sp, job["playlist_id"], scheduler)
+    except Exception as e:
+        print(f"⚠️ Could not read playlist {job['idx']} back, it will be synced in full next time: {e}")
+        return
+    state.record(job["url"], job["fingerprint"], job, snapshot_id)
+
+def publish_job(sp, scheduler, job, resolved, state=None):
+    """
+    Create or update the job's playlist from the shared resolution results,
+    and remember it in `state` (a SyncState) once every write succeeded.
+    """
+    start = time.monotonic()
+    try:
+        journal = open_journal(job["url"])
+        playlist_id, update_existing = script.open_playlist(sp, journal, job["playlist"], scheduler)
+        track_uris = [resolved[key] for key in job["keys"] if resolved[key]]
+        not_found = [
+            f"{raw_track} by {artist}"
+            for (raw_track, _, artist), key in zip(job["queries"], job["keys"]) if not resolved[key]
+        ]
+        complete = script.write_playlist(sp, scheduler, playlist_id, update_existing, job["playlist"],
+                                         track_uris, journal=journal)
+        if complete:
+            journal.finish()
+        else:
+            journal.close()
+        job.update(script.report_playlist(job["playlist"], playlist_id, job["tracks"], track_uris, not_found))
+        if complete and state is not None:
+            remember_sync(sp, scheduler, state, job)
+        print(f"\n✅ Playlist {job['idx']} successfully transferred to Spotify!")
+    except Exception as e:
+        job["status"] = "error"
+        job["error"] = str(e)
+        print(f"\n❌ Error with playlist {job['idx']}: {e}")
+    job["elapsed"] += time.monotonic() - start
+    return job
+
+def deduplicate(jobs):
+    """
+    Map every job's tracks onto one list of unique queries, keyed like the
+    track cache. Sets job["keys"] and returns the unique queries.
+    """
+    unique = {}
+    unique_queries = []
+    for job in jobs:
+        job["keys"] = []
+        for query in job["queries"]:
+            key = normalize_key(query[1], query[2])
+            if key not in unique:
+                unique[key] = len(unique_queries)
+                unique_queries.append(query)
+            job["keys"].append(unique[key])
+    return unique_queries
+
+def print_summary(results):
+    print("\n📋 Sync summary:")
+    for idx, result in enumerate(results, start=1):
+        name = result.get("playlist") or result["url"]
+        if result.get("skipped"):
+            print(f" {idx:>3}. ⏭️ {name}: unchanged, {result['found']}/{result['tracks']} tracks "
+                  f"({len(result['not_found'])} not found)")
+        elif result["status"] == "ok":
+            print(f" {idx:>3}. ✅ {name}: {result['found']}/{result['tracks']} tracks "
+                  f"({len(result['not_found'])} not found) in {result['elapsed']:.1f}s")
+        else:
+            print(f" {idx:>3}. ❌ {name}: {result['error']}")
+
+def publish_batch(sp, scheduler, state, jobs, urls, workers, search_backend=None):
+    """
+    Resolve the union of the jobs' tracks once, then write every playlist.
+    """
+    unique_queries = deduplicate(jobs)
+    total = sum(job["tracks"] for job in jobs)
+    print(f"\n🧮 {total} tracks across {len(jobs)} playlists, {len(unique_queries)} unique: "
+          f"{total - len(unique_queries)} searches saved.")
+
+    # Search results for the whole batch survive a crash; each playlist journals its own writes
+    journal = open_journal("batch " + "\n".join(urls))
+    _, resolved, _ = script.resolve_tracks(sp, scheduler, unique_queries, search_backend, journal=journal)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda job: publish_job(sp, scheduler, job, resolved, state), jobs))
+    state.save()
+    if all(job["status"] == "ok" for job in jobs):
+        journal.finish()
+    else:
+        journal.close()
+
+def run_batch(urls, workers=BATCH_WORKERS, scraper_backend=None, search_backend=None):
+    """
+    Sync every playlist in `urls`, with up to `workers` scraping or writing
+    at once and each distinct track searched only once across the batch.
+    Returns one summary dict per URL, in input order.
+    """
+    workers = max(1, workers)
+    # Imported here so that runs with profiling off never load it
+    from components import profiling
+    with metrics.run_session(f"batch of {len(urls)} playlists"), metrics.stage("total"):
+        with profiling.session("batch"), retry_queue.background():
+            jobs = sync_jobs(urls, workers, scraper_backend, search_backend)
+
+        results = []
+        for job in jobs:
+            job.pop("queries", None)
+            job.pop("keys", None)
+            job.pop("fingerprint", None)
+            results.append(job)
+    print_summary(results)
+    return results
+
+def sync_jobs(urls, workers, scraper_backend=None, search_backend=None):
+    """
+    Scrape every playlist, drop the unchanged ones and publish the rest.
+    Returns the jobs in input order.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        jobs = list(executor.map(
+            lambda args: scrape_job(*args, scraper_backend),
+            [(idx, len(urls), url) for idx, url in enumerate(urls, start=1)],
+        ))
+
+    ready = [job for job in jobs if job["status"] == "ok" and job["queries"]]
+    for job in jobs:
+        if job["status"] == "ok" and not job["queries"]:
+            print(f"⚠️ No valid songs found in playlist {job['idx']}.")
+
+    state = SyncState()
+    if ready:
+        sp, scheduler = script.create_client()
+        cache = TrackCache()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            skipped = list(executor.map(lambda job: check_unchanged(sp, scheduler, state, cache, job), ready))
+        cache.close()
+        ready = [job for job, skip in zip(ready, skipped) if not skip]
+        metrics.incr("playlists_skipped_total", sum(skipped))
+        if ready:
+            publish_batch(sp, scheduler, state, ready, urls, workers, search_backend)
+        print(f"📊 {scheduler.calls} API calls, rate limited {scheduler.throttled} times "
+              f"({scheduler.throttle_seconds:.0f}s paused).")
+    return jobs
@@ -0,0 +1,209 @@
+import os
+import sqlite3
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRAPE_FOLDER = os.path.join(BASE_DIR, "music_data")
+CACHE_FILE = os.path.join(SCRAPE_FOLDER, "track_cache.sqlite3")
+
+DEFAULT_TTL = 30 * 24 * 60 * 60  # 30 days
+DEFAULT_MAX_ENTRIES = 50000
+
+# A track that wasn't found is searched again after 1 day, then 2, 4, 8...
+MISS_RECHECK_BASE = 24 * 60 * 60
+MISS_RECHECK_MAX = 30 * 24 * 60 * 60
+
+def normalize_key(track, artist):
+    """
+    Lowercase and collapse whitespace so trivially different spellings
+    of the same (track, artist) pair share one cache entry.
+    """
+    track = " ".join(str(track).lower().split())
+    artist = " ".join(str(artist).lower().split())
+    return track, artist
+
+class TrackCache:
+    """
+    Persistent (track, artist) -> Spotify URI cache backed by SQLite.
+
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted once more than `max_entries` are stored. Safe to share between
+    the search worker threads.
+
+    Tracks that searching couldn't find are kept in a separate `misses`
+    table with the time they are next due to be searched again. A miss no
+    playlist has asked for in `ttl` seconds is dropped, and so are the
+    least recently wanted ones beyond `max_entries`.
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        # Resolved at call time so CACHE_FILE can be pointed elsewhere (e.g. by the benchmarks)
+        path = path or CACHE_FILE
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tracks (
+                track TEXT NOT NULL,
+                artist TEXT NOT NULL,
+                uri TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (track, artist)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tracks_last_used ON tracks (last_used)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS misses (
+                track TEXT NOT NULL,
+                artist TEXT NOT NULL,
+                raw_track TEXT NOT NULL,
+                raw_artist TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                last_checked REAL NOT NULL,
+                next_check REAL NOT NULL,
+                last_wanted REAL NOT NULL,
+                PRIMARY KEY (track, artist)
+            )
+        """)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(misses)")]
+        if "last_wanted" not in columns:
+            # Caches written before misses expired
+            self._conn.execute("ALTER TABLE misses ADD COLUMN last_wanted REAL NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE misses SET last_wanted = last_checked")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_misses_next_check ON misses (next_check)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_misses_last_wanted ON misses (last_wanted)")
+        self._purge_expired()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.ttl
+        self._conn.execute("DELETE FROM tracks WHERE created_at < ?", (cutoff,))
+        self._conn.execute("DELETE FROM misses WHERE last_wanted < ?", (cutoff,))
+        self._conn.execute(
+            "DELETE FROM misses WHERE rowid IN "
+            "(SELECT rowid FROM misses ORDER BY last_wanted DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def get(self, track, artist):
+        key = normalize_key(track, artist)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT uri, created_at FROM tracks WHERE track = ? AND artist = ?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            uri, created_at = row
+            if now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM tracks WHERE track = ? AND artist = ?", key)
+                self._size -= 1
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE tracks SET last_used = ? WHERE track = ? AND artist = ?", (now,) + key
+            )
+            self.hits += 1
+            return uri
+
+    def put(self, track, artist, uri):
+        key = normalize_key(track, artist)
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE tracks SET uri = ?, created_at = ?, last_used = ? WHERE track = ? AND artist = ?",
+                (uri, now, now) + key,
+            )
+            if cur.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO tracks (track, artist, uri, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                    key + (uri, now, now),
+                )
+                self._size += 1
+            self._conn.execute("DELETE FROM misses WHERE track = ? AND artist = ?", key)
+            if self._size > self.max_entries:
+                self._evict(self._size - self.max_entries)
+
+    def known_miss(self, track, artist):
+        """
+        Return True if the track was searched in vain and isn't due for
+        another search yet. Asking counts as the track still being wanted.
+        """
+        key = normalize_key(track, artist)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT next_check FROM misses WHERE track = ? AND artist = ?", key
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE misses SET last_wanted = ? WHERE track = ? AND artist = ?", (now,) + key
+                )
+        return row is not None and row[0] > now
+
+    def put_miss(self, track, artist, raw_track, raw_artist, wanted=True):
+        """
+        Record a search that found nothing and schedule the next one,
+        doubling the wait each time. Returns the time of the next check.
+        Pass wanted=False for re-checks no playlist asked for, so they
+        don't keep the miss from expiring.
+        """
+        key = normalize_key(track, artist)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, last_wanted FROM misses WHERE track = ? AND artist = ?", key
+            ).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            last_wanted = now if wanted or row is None else row[1]
+            next_check = now + min(MISS_RECHECK_MAX, MISS_RECHECK_BASE * 2 ** (attempts - 1))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO misses "
+                "(track, artist, raw_track, raw_artist, attempts, last_checked, next_check, last_wanted) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (raw_track, raw_artist, attempts, now, next_check, last_wanted),
+            )
+        return next_check
+
+    def due_misses(self, limit=100):
+        """
+        Return up to `limit` (track, raw_track, raw_artist) misses whose
+        re-check time has passed, longest overdue first.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT track, raw_track, raw_artist FROM misses WHERE next_check <= ? "
+                "ORDER BY next_check LIMIT ?", (time.time(), limit)
+            ).fetchall()
+
+    def entries(self):
+        """
+        Return (track, artist, uri) for every unexpired entry.
+        """
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            return self._conn.execute(
+                "SELECT track, artist, uri FROM tracks WHERE created_at >= ?", (cutoff,)
+            ).fetchall()
+
+    def _evict(self, count):
+        self._conn.execute(
+            "DELETE FROM tracks WHERE rowid IN (SELECT rowid FROM tracks ORDER BY last_used LIMIT ?)",
+            (count,),
+        )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRAPE_FOLDER = os.path.join(BASE_DIR, "music_data")
+CATALOG_FILE = os.path.join(SCRAPE_FOLDER, "playlist_index.json")
+
+PAGE_SIZE = 50
+FULL_REFRESH_AFTER = 24 * 60 * 60  # also picks up renamed and deleted playlists
+
+class PlaylistCatalog:
+    """
+    Locally persisted name -> playlist index of the user's playlists.
+
+    Lookups are answered from the index. On a miss, the playlist listing is
+    re-read from the top until a page holds only playlists already indexed
+    with unchanged snapshot ids, since new playlists are listed first.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or CATALOG_FILE
+        self._lock = threading.RLock()
+        self.user_id = None
+        self.playlists = {}  # lower-case name -> {"id", "name", "snapshot_id"}
+        self.refreshed_at = 0.0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        self.user_id = data.get("user_id")
+        self.playlists = data.get("playlists", {})
+        self.refreshed_at = data.get("refreshed_at", 0.0)
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "user_id": self.user_id,
+                    "refreshed_at": self.refreshed_at,
+                    "playlists": self.playlists,
+                }, f)
+            os.replace(tmp_path, self.path)
+
+    def _entry(self, playlist):
+        return {"id": playlist["id"], "name": playlist["name"], "snapshot_id": playlist.get("snapshot_id")}
+
+    def refresh(self, sp, full=False, scheduler=None):
+        """
+        Page through the user's playlists, through `scheduler` when given.
+        Returns the number of API calls made.
+        """
+        with self._lock:
+            known = {p["id"]: p.get("snapshot_id") for p in self.playlists.values()}
+            fresh = {}
+            calls = 0
+            offset = 0
+            while True:
+                if scheduler is not None:
+                    page = scheduler.call(sp.current_user_playlists, limit=PAGE_SIZE, offset=offset)
+                else:
+                    page = sp.current_user_playlists(limit=PAGE_SIZE, offset=offset)
+                calls += 1
+                unchanged = True
+                for playlist in page["items"]:
+                    if not playlist:
+                        continue
+                    if known.get(playlist["id"]) != playlist.get("snapshot_id"):
+                        unchanged = False
+                    # The first playlist listed wins when several share a name
+                    fresh.setdefault(playlist["name"].lower(), self._entry(playlist))
+                if not page["next"] or (unchanged and not full):
+                    break
+                offset += PAGE_SIZE
+
+            if full:
+                self.playlists = fresh
+                self.refreshed_at = time.time()
+            else:
+                # Drop old names of playlists that were renamed since the last refresh
+                fresh_ids = {p["id"] for p in fresh.values()}
+                self.playlists = {k: v for k, v in self.playlists.items() if v["id"] not in fresh_ids}
+                self.playlists.update(fresh)
+            self.save()
+            return calls
+
+    def lookup(self, sp, user_id, name, scheduler=None):
+        """
+        Return the indexed playlist called `name` (case-insensitive) or None.
+        """
+        key = name.lower()
+        with self._lock:
+            if self.user_id != user_id:
+                self.user_id = user_id
+                self.playlists = {}
+                self.refreshed_at = 0.0
+            if time.time() - self.refreshed_at > FULL_REFRESH_AFTER:
+                calls = self.refresh(sp, full=True, scheduler=scheduler)
+                print(f"📇 Indexed {len(self.playlists)} playlists ({calls} API calls).")
+            elif key not in self.playlists:
+                self.refresh(sp, scheduler=scheduler)
+            return self.playlists.get(key)
+
+    def add(self, playlist):
+        # Newly created playlists are listed first, so they take over their name
+        with self._lock:
+            self.playlists[playlist["name"].lower()] = self._entry(playlist)
+            self.save()
+
+    def forget(self, playlist_id):
+        with self._lock:
+            self.playlists = {k: v for k, v in self.playlists.items() if v["id"] != playlist_id}
+            self.save()
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def get_catalog():
+    """
+    Return the process-wide catalog, loading it from disk on first use.
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = PlaylistCatalog()
+        return _catalog
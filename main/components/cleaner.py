@@ -1,6 +1,8 @@
 import os
 import csv
-import pandas as pd
+from itertools import chain, islice
+
+from components.metrics import registry as metrics
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SCRAPE_FOLDER = os.path.join(BASE_DIR, "music_data")
@@ -9,47 +11,229 @@ CLEAN_CSV_FILE = os.path.join(SCRAPE_FOLDER, "amazon_playlist.csv")
 
 BAD_VALUES = {"Search", "Contact Us", "Sorry, something went wrong"}
 
+# A digit line further ahead than this from the expected track number is
+# treated as page noise (a year, a play count...) rather than a track
+MAX_NUMBER_GAP = 50
+MAX_REPORTED_ISSUES = 20
+
 def is_valid_artist(artist):
     return artist not in BAD_VALUES and not artist.lower().endswith("soundtrack")
 
+class ParseReport:
+    """
+    What the parser kept and dropped. Only the first few issues are kept
+    verbatim so memory stays bounded on very long dumps.
+    """
+
+    def __init__(self):
+        self.lines = 0
+        self.records = 0
+        self.skipped_lines = 0
+        self.malformed = 0
+        self.missing_numbers = 0
+        self.restarts = 0
+        self.issues = []  # (line number, description)
+
+    def note(self, line_no, description):
+        if len(self.issues) < MAX_REPORTED_ISSUES:
+            self.issues.append((line_no, description))
+
+    def print_summary(self):
+        if self.malformed or self.missing_numbers or self.restarts:
+            print(f"⚠️ Skipped {self.malformed} malformed blocks; "
+                  f"{self.missing_numbers} track numbers missing from the dump; "
+                  f"numbering restarted {self.restarts} times.")
+            for line_no, description in self.issues:
+                print(f"   line {line_no}: {description}")
+
+class PlaylistParser:
+    """
+    State machine over raw playlist lines. A record is a line holding only
+    the track number, the title on the next line, one detail line, then the
+    artist. Feed it one stripped, non-empty line at a time.
+
+    The first record must be track `first_number`, so stray numbers in the
+    page header (a year, a play count) are not taken for a track. Pass
+    None for text that starts part-way through the list: the first record
+    may then be any number from `floor` up. Any other number than the next
+    expected one only counts once a complete record follows it: a lower
+    one restarts the numbering, which recovers from a stray number that was
+    taken for a track, and a higher one means tracks are missing. If a
+    likelier number turns up first, the other one was page noise, such as
+    an album called "21".
+    """
+
+    SEEK, TITLE, DETAIL, ARTIST = range(4)
+
+    def __init__(self, report=None, first_number=1, floor=1):
+        self.report = report or ParseReport()
+        self.state = self.SEEK
+        self.first_number = first_number
+        self.floor = floor
+        self.expected = None  # next track number, once the first one is seen
+        self.number = self.title = None
+        self.start_line = 0
+        self.resumes_at = None  # while an out-of-order number is unconfirmed, the number expected before it
+
+    def _starts_record(self, line):
+        if not line.isdigit():
+            return False
+        n = int(line)
+        if self.expected is None:
+            return n == self.first_number if self.first_number is not None else n >= self.floor
+        return self.floor <= n <= self.expected + MAX_NUMBER_GAP
+
+    def _begin(self, line, line_no):
+        if self.expected is not None and int(line) != self.expected:
+            self.resumes_at = self.expected
+        self.number = line
+        self.start_line = line_no
+        self.state = self.TITLE
+
+    def _abandon(self, description):
+        if self.resumes_at is not None:
+            # A lone out-of-order number between records: page noise, not a track
+            self.report.skipped_lines += 1
+            self.expected, self.resumes_at = self.resumes_at, None
+            self.state = self.SEEK
+            return
+        self.report.malformed += 1
+        self.report.note(self.start_line, description)
+        self.expected = int(self.number) + 1
+        self.state = self.SEEK
+
+    def _interrupted(self, line):
+        """
+        Whether `line` is a likelier track number than an unconfirmed
+        out-of-order one: the number expected before it, or one between
+        that and a jump ahead. The out-of-order number was noise then.
+        """
+        if self.resumes_at is None or not line.isdigit():
+            return False
+        return self.resumes_at <= int(line) < max(int(self.number), self.resumes_at + 1)
+
+    def feed(self, line, line_no):
+        """
+        Return a (number, title, artist) record when `line` completes one,
+        otherwise None.
+        """
+        if self.state == self.SEEK:
+            if self._starts_record(line):
+                self._begin(line, line_no)
+            else:
+                self.report.skipped_lines += 1
+        elif self._interrupted(line):
+            self._abandon(None)
+            self._begin(line, line_no)
+        elif self.state == self.TITLE:
+            if line in BAD_VALUES:
+                self._abandon(f"track {self.number} has page text '{line}' instead of a title")
+            else:
+                self.title = line
+                self.state = self.DETAIL
+        elif self.state == self.DETAIL:
+            if line in BAD_VALUES:
+                self._abandon(f"track {self.number} has page text '{line}' instead of its details")
+            else:
+                self.state = self.ARTIST
+        elif line.isdigit() and int(line) == int(self.number) + 1:
+            # The next record started early: this block was too short to hold an artist
+            self._abandon(f"track {self.number} ends before its artist line")
+            self._begin(line, line_no)
+        elif line in BAD_VALUES:
+            self._abandon(f"track {self.number} has page text '{line}' instead of an artist")
+        else:
+            n = int(self.number)
+            if self.resumes_at is not None and n < self.resumes_at:
+                self.report.restarts += 1
+                self.report.note(self.start_line, f"track numbers restart at {n} after {self.resumes_at - 1}")
+            elif self.resumes_at is not None:
+                self.report.missing_numbers += n - self.resumes_at
+                self.report.note(self.start_line, f"track numbers {self.resumes_at}-{n - 1} missing")
+            self.resumes_at = None
+            self.expected = n + 1
+            self.report.records += 1
+            self.state = self.SEEK
+            return self.number, self.title, line
+        return None
+
+    def finish(self):
+        if self.state != self.SEEK and self.resumes_at is not None:
+            self.report.skipped_lines += 1
+            self.state = self.SEEK
+        elif self.state != self.SEEK:
+            self.report.malformed += 1
+            self.report.note(self.start_line, f"track {self.number} is cut off at the end of the dump")
+            self.state = self.SEEK
+
+def iter_tracks(lines, report=None):
+    """
+    Yield validated (number, title, artist) records from raw playlist lines
+    as they arrive, holding only the current block in memory. Dropped lines
+    and malformed blocks are counted in `report` (a ParseReport) if given.
+    """
+    parser = PlaylistParser(report)
+    skipped = 0
+    line_no = 0
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        # Most lines between records are album names and durations; skip them without a call
+        if parser.state == PlaylistParser.SEEK and not line.isdigit():
+            skipped += 1
+            continue
+        record = parser.feed(line, line_no)
+        if record:
+            yield record
+    parser.report.lines = line_no
+    parser.report.skipped_lines += skipped
+    parser.finish()
+
+def split_playlist_name(lines, default="Converted from Amazon Music"):
+    """
+    Return (playlist_name, lines) where the name is line 9 of the raw dump and
+    `lines` still yields every raw line, including the ones read to find it.
+    """
+    lines = iter(lines)
+    head = list(islice(lines, 9))
+    name = head[8].strip() if len(head) >= 9 else ""
+    return name or default, chain(head, lines)
+
 def clean_amazon_playlist(input_file_path, output_file_path):
+    report = ParseReport()
     try:
-        with open(input_file_path, 'r', encoding='utf-8') as f:
-            lines = [line.strip() for line in f if line.strip()]
+        with open(input_file_path, 'r', encoding='utf-8') as f, metrics.stage("clean"):
+            records = iter_tracks(f, report)
+            first = next(records, None)
+            if first is None:
+                print("⚠️ No valid songs found.")
+                report.print_summary()
+                return False
+            # Rows go straight from the raw file to the CSV without being collected
+            saved = write_playlist_csv(chain([first], records), output_file_path)
     except FileNotFoundError:
         print(f"❌ Error: The file '{input_file_path}' was not found.")
         return False
 
-    playlist_data = [["Number", "Title", "Artist"]]
-    i = 0
-    while i + 2 < len(lines):
-        if lines[i].isdigit():
-            number = lines[i]
-            title = lines[i + 1]
-            artist = lines[i + 3]
-
-            if title and artist:
-                playlist_data.append([number, title, artist])
-                i += 3
-            else:
-                i += 1
-        else:
-            i += 1
-
-    if len(playlist_data) > 1:
-        try:
-            with open(output_file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile, quoting=csv.QUOTE_ALL)
-                writer.writerows(playlist_data)
-            print(f"✅ Successfully saved {len(playlist_data)-1} songs to: {output_file_path}")
-            return True
-        except IOError as e:
-            print(f"❌ Write error: {e}")
-            return False
-    else:
-        print("⚠️ No valid songs found.")
+    report.print_summary()
+    return saved
+
+def write_playlist_csv(rows, output_file_path):
+    try:
+        count = 0
+        with open(output_file_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile, quoting=csv.QUOTE_ALL)
+            writer.writerow(["Number", "Title", "Artist"])
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        print(f"✅ Successfully saved {count} songs to: {output_file_path}")
+        return True
+    except IOError as e:
+        print(f"❌ Write error: {e}")
         return False
 
 def main():
     print("🧼 Cleaning Amazon playlist data...")
-    clean_amazon_playlist(RAW_TEXT_FILE, CLEAN_CSV_FILE)
\ No newline at end of file
+    clean_amazon_playlist(RAW_TEXT_FILE, CLEAN_CSV_FILE)
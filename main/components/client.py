@@ -0,0 +1,128 @@
+import logging
+import os
+import threading
+import time
+import warnings
+
+import requests
+import spotipy
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+from spotipy.oauth2 import SpotifyOAuth
+
+# Process-wide Spotify client: one keep-alive connection pool, one token and
+# one user id shared by every playlist and worker thread in the process.
+# Imported only once a stage needs the API, like spotipy itself.
+
+SCOPE = "playlist-modify-public"
+
+# Headroom over the 8 search threads (script.SEARCH_THREADS), since batch
+# publishing and searching can overlap
+POOL_SIZE = 16
+
+# Refresh the token this many seconds before it expires, so that no request
+# in a long run goes out with a token about to lapse
+REFRESH_MARGIN = 300
+
+class SharedOAuth(SpotifyOAuth):
+    """
+    SpotifyOAuth that can be shared between threads. The token is kept in
+    memory instead of re-read from the auth cache for every request, and
+    only one thread refreshes it when it gets within REFRESH_MARGIN of
+    expiring.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._token_info = None
+
+    def is_token_expired(self, token_info):
+        return token_info["expires_at"] - time.time() < REFRESH_MARGIN
+
+    def get_access_token(self, code=None, as_dict=True, check_cache=True):
+        with self._lock:
+            token_info = self._token_info
+            if not check_cache or token_info is None or self.is_token_expired(token_info):
+                # Reads the auth cache, refreshing or logging in as needed
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", DeprecationWarning)
+                    token_info = super().get_access_token(code, as_dict=True, check_cache=check_cache)
+                self._token_info = token_info
+            return token_info if as_dict else token_info["access_token"]
+
+class Client(spotipy.Spotify):
+    """
+    spotipy.Spotify that looks up the current user's id once.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._user_lock = threading.Lock()
+        self._user_id = None
+
+    def current_user_id(self, scheduler=None):
+        """
+        Return the current user's id, asking the API (through `scheduler`,
+        a RequestScheduler, when given) only the first time.
+        """
+        with self._user_lock:
+            if self._user_id is None:
+                user = scheduler.call(self.current_user) if scheduler is not None else self.current_user()
+                self._user_id = user["id"]
+            return self._user_id
+
+def build_session():
+    """
+    Return a requests session with a connection pool sized for our
+    concurrency and retries for transient server errors.
+    """
+    # 429s are left to the shared scheduler so one throttle pauses every worker at once.
+    # urllib3 retries any response carrying Retry-After unless told not to, which
+    # would have each thread sleep it out on its own before the scheduler saw it.
+    session = requests.Session()
+    retries = Retry(
+        total=5,
+        backoff_factor=2,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["HEAD", "GET", "OPTIONS", "POST"],
+        respect_retry_after_header=False
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=POOL_SIZE, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def build_client():
+    """
+    Return a new authenticated Client with its own session. Most callers
+    want get_client() instead.
+    """
+    load_dotenv()
+    session = build_session()
+
+    # A static token and API base let the client talk to a local stand-in (see mock_server.py)
+    static_token = os.getenv("TRACKSWAP_ACCESS_TOKEN")
+    if static_token:
+        sp = Client(auth=static_token, requests_session=session)
+    else:
+        sp = Client(auth_manager=SharedOAuth(scope=SCOPE, requests_session=session), requests_session=session)
+    api_base = os.getenv("TRACKSWAP_API_BASE")
+    if api_base:
+        sp.prefix = api_base.rstrip("/") + "/"
+    return sp
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """
+    Return the process-wide Client, authenticating on first use.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            logging.basicConfig(level=logging.INFO)
+            _client = build_client()
+        return _client
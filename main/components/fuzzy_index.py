@@ -0,0 +1,218 @@
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from components.cache import TrackCache
+from components.matcher import ARTIST_WEIGHT, TITLE_WEIGHT, similarity
+from components.metrics import registry as metrics
+from components.normalize import (clean_track_column, clean_track_name, expand_artists, is_unwanted_version,
+                                  normalize_column, normalize_text)
+
+# In-memory character-trigram index over every track we have already placed
+# on Spotify (the track cache, which also holds the tracks read back from our
+# playlists). Source spellings that differ only slightly from a known one are
+# answered here instead of by the search API.
+
+# Set TRACKSWAP_FUZZY=0 to send every cache miss to the search API
+FUZZY_LOOKUP = os.getenv("TRACKSWAP_FUZZY", "1") != "0"
+
+MIN_TRIGRAM_SIMILARITY = 0.7  # Dice coefficient a candidate title needs to be scored at all
+MATCH_THRESHOLD = 0.92        # matcher score needed to accept a match, stricter than the API path
+MAX_CANDIDATES = 20
+
+_FEATURING = re.compile(r"\s+(feat|ft|featuring)\b.*$")
+_NUMBERS = re.compile(r"\d+")
+
+def fuzzy_title(title):
+    """
+    Normalized title with bracketed parts and "feat./ft." credits removed.
+    """
+    return _FEATURING.sub("", normalize_text(clean_track_name(title)))
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class FuzzyIndex:
+    """
+    Trigram inverted index from normalized titles to known (title, artists,
+    URI) entries. Titles that normalize identically are found by a plain
+    dict lookup; otherwise candidates come from the query's rarest trigrams.
+    Either way they are scored with the matcher's own title/artist
+    similarity. Titles that differ in any number, or look like an unwanted
+    version, never match.
+    """
+
+    def __init__(self, threshold=MATCH_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._titles = []
+        self._artists = []
+        self._uris = []
+        self._keys = {}                     # (title, artist) -> entry id
+        self._by_title = defaultdict(list)  # title -> entry ids
+        self._postings = defaultdict(list)  # trigram -> entry ids
+        self.build_seconds = 0.0
+        self.lookups = 0
+        self.hits = 0
+        self.lookup_seconds = 0.0
+
+    def __len__(self):
+        return len(self._uris)
+
+    def add(self, track, artist, uri):
+        self._add(fuzzy_title(track), normalize_text(artist), artist, uri)
+
+    def add_many(self, entries):
+        """
+        add() for a list of (track, artist, uri) entries, normalizing the
+        title and artist columns in one pass each.
+        """
+        titles = normalize_column(clean_track_column([track for track, _, _ in entries]))
+        artist_keys = normalize_column([artist for _, artist, _ in entries])
+        for (_, artist, uri), title, artist_key in zip(entries, titles, artist_keys):
+            self._add(_FEATURING.sub("", title), artist_key, artist, uri)
+
+    def _add(self, title, artist_key, artist, uri):
+        if not title:
+            return
+        key = (title, artist_key)
+        with self._lock:
+            idx = self._keys.get(key)
+            if idx is not None:
+                self._uris[idx] = uri
+                return
+            idx = len(self._uris)
+            self._keys[key] = idx
+            self._titles.append(title)
+            self._artists.append(tuple(expand_artists(artist)) or (artist.lower(),))
+            self._uris.append(uri)
+            self._by_title[title].append(idx)
+            for gram in trigrams(title):
+                self._postings[gram].append(idx)
+
+    def _candidates(self, grams):
+        # Any title with a Dice coefficient >= MIN_TRIGRAM_SIMILARITY shares at least
+        # `needed` trigrams with the query, so it must hold one of the rarest
+        # len(grams) - needed + 1 of them
+        needed = math.ceil(MIN_TRIGRAM_SIMILARITY * len(grams) / (2 - MIN_TRIGRAM_SIMILARITY))
+        rarest = sorted(grams, key=lambda g: len(self._postings.get(g, ())))[:len(grams) - needed + 1]
+        counts = Counter()
+        for gram in rarest:
+            counts.update(self._postings.get(gram, ()))
+        return [idx for idx, _ in counts.most_common(MAX_CANDIDATES)]
+
+    def _score(self, idx, title, grams, raw_track, artists):
+        entry_title = self._titles[idx]
+        if entry_title != title:
+            entry_grams = trigrams(entry_title)
+            if 2 * len(grams & entry_grams) / (len(grams) + len(entry_grams)) < MIN_TRIGRAM_SIMILARITY:
+                return 0.0
+        if _NUMBERS.findall(entry_title) != _NUMBERS.findall(title):
+            return 0.0
+        # A remix only matches a remix, in either direction
+        if is_unwanted_version(entry_title, raw_track) or is_unwanted_version(raw_track, entry_title):
+            return 0.0
+        artist_score = max(similarity(a, b) for a in self._artists[idx] for b in artists)
+        return TITLE_WEIGHT * similarity(entry_title, title) + ARTIST_WEIGHT * artist_score
+
+    def _best(self, candidates, title, grams, raw_track, artists):
+        """
+        Return (score, uri) for the best-scoring candidate. uri is None when
+        the score is below the threshold or two different URIs tie for best
+        (e.g. the same title by both credited artists).
+        """
+        best_score, best_uri, tied = 0.0, None, False
+        for idx in candidates:
+            score = self._score(idx, title, grams, raw_track, artists)
+            if score > best_score:
+                best_score, best_uri, tied = score, self._uris[idx], False
+            elif score == best_score and self._uris[idx] != best_uri:
+                tied = True
+        if best_score < self.threshold or tied:
+            return best_score, None
+        return best_score, best_uri
+
+    def lookup(self, raw_track, clean_track, artist):
+        """
+        Return the URI of the best known match scoring at least the
+        threshold, or None.
+        """
+        start = time.perf_counter()
+        title = fuzzy_title(clean_track)
+        artists = tuple(expand_artists(artist)) or (artist.lower(),)
+        uri = None
+        if title:
+            grams = trigrams(title)
+            with self._lock:
+                score, uri = self._best(self._by_title.get(title, ()), title, grams, raw_track, artists)
+                # An ambiguous exact title stays ambiguous; only look further if nothing qualified
+                if score < self.threshold:
+                    _, uri = self._best(self._candidates(grams), title, grams, raw_track, artists)
+        with self._lock:
+            self.lookups += 1
+            self.hits += uri is not None
+            self.lookup_seconds += time.perf_counter() - start
+        return uri
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._uris),
+                "trigrams": len(self._postings),
+                "postings": sum(len(ids) for ids in self._postings.values()),
+                "build_seconds": self.build_seconds,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "avg_lookup_us": self.lookup_seconds / self.lookups * 1e6 if self.lookups else 0.0,
+            }
+
+def build_index(cache):
+    """
+    Return a FuzzyIndex over every unexpired entry in `cache` (a TrackCache).
+    """
+    index = FuzzyIndex()
+    start = time.perf_counter()
+    index.add_many(cache.entries())
+    index.build_seconds = time.perf_counter() - start
+    return index
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index(cache):
+    """
+    Return the process-wide index, building it from `cache` on first use.
+    Later additions are made with add() as tracks are resolved.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = build_index(cache)
+            stats = _index.stats()
+            print(f"🧩 Fuzzy index: {stats['entries']} tracks, {stats['trigrams']} trigrams, "
+                  f"built in {stats['build_seconds'] * 1000:.0f} ms.")
+        return _index
+
+def remember_playlist_tracks(tracks):
+    """
+    Cache and index tracks read back from one of our Spotify playlists
+    (API track objects), so their Spotify spellings resolve locally too.
+    """
+    cache = TrackCache()
+    index = get_index(cache)
+    added = 0
+    for track in tracks:
+        if not track or not track.get("uri") or not track.get("name"):
+            continue
+        artist = ", ".join(a["name"] for a in track.get("artists", []) if a.get("name"))
+        title = clean_track_name(track["name"])
+        if cache.get(title, artist) is None:
+            cache.put(title, artist, track["uri"])
+            added += 1
+        index.add(title, artist, track["uri"])
+    cache.close()
+    metrics.incr("fuzzy_playlist_tracks_total", added)
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from components.cache import normalize_key
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRAPE_FOLDER = os.path.join(BASE_DIR, "music_data")
+JOURNAL_FOLDER = os.path.join(SCRAPE_FOLDER, "journals")
+
+MAX_AGE = 7 * 24 * 60 * 60  # older journals are discarded instead of resumed
+
+class RunJournal:
+    """
+    Append-only record of one run: the target playlist, every track searched
+    (found or not) and every batch of tracks added. If the run dies, the
+    next run for the same source replays it and carries on from there.
+    The file is deleted once the run finishes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.playlist = None  # (playlist_id, update_existing)
+        self.tracks = {}      # normalized (track, artist) -> URI or None
+        self.batches = []     # (start position, uris) in commit order
+        self._load()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        try:
+            if time.time() - os.path.getmtime(self.path) > MAX_AGE:
+                os.remove(self.path)
+                return
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by the crash
+            kind = entry.get("type")
+            if kind == "playlist":
+                self.playlist = (entry["playlist_id"], entry["update_existing"])
+            elif kind == "track":
+                self.tracks[tuple(entry["key"])] = entry["uri"]
+            elif kind == "batch":
+                self.batches.append((entry["start"], entry["uris"]))
+
+    def _append(self, entry, sync=False):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    def record_playlist(self, playlist_id, update_existing):
+        self.playlist = (playlist_id, update_existing)
+        self._append({"type": "playlist", "playlist_id": playlist_id, "update_existing": update_existing},
+                     sync=True)
+
+    def record_track(self, track, artist, uri):
+        key = normalize_key(track, artist)
+        self.tracks[key] = uri
+        self._append({"type": "track", "key": list(key), "uri": uri})
+
+    def lookup_track(self, track, artist):
+        """
+        Return (known, uri); uri is None for tracks already searched in vain.
+        """
+        key = normalize_key(track, artist)
+        return key in self.tracks, self.tracks.get(key)
+
+    def record_batch(self, start, uris):
+        # Synced so an acknowledged write is never repeated after a crash
+        self.batches.append((start, list(uris)))
+        self._append({"type": "batch", "start": start, "uris": list(uris)}, sync=True)
+
+    def committed_uris(self):
+        """
+        URIs added so far, if the batches form one contiguous prefix;
+        otherwise None.
+        """
+        uris = []
+        for start, batch in sorted(self.batches):
+            if start != len(uris):
+                return None
+            uris.extend(batch)
+        return uris
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def finish(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+def journal_path(key):
+    safe_name = re.sub(r'[^\w\-_. ]', '_', key)[:40].strip()
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:10]
+    return os.path.join(JOURNAL_FOLDER, f"{safe_name}-{digest}.jsonl")
+
+def open_journal(key):
+    """
+    Open the journal for the run identified by `key` (the playlist URL, or
+    its name when there is none), resuming it if a previous run died.
+    """
+    return RunJournal(journal_path(key))
@@ -0,0 +1,100 @@
+import threading
+from difflib import SequenceMatcher
+
+from components.normalize import clean_track_name, expand_artists, is_unwanted_version, normalize_text
+
+# One wide search usually contains the right track, so candidates are ranked
+# locally instead of firing a query per spelling variant.
+SEARCH_LIMIT = 50
+HIGH_CONFIDENCE = 0.9  # stop querying once a candidate scores this well
+MIN_SCORE = 0.6        # below this the track is reported as not found
+
+TITLE_WEIGHT = 0.6
+ARTIST_WEIGHT = 0.4
+UNWANTED_PENALTY = 0.5
+
+def candidate_queries(clean_track, artist):
+    """
+    Return the few queries to try, broadest-but-still-specific first.
+    """
+    clean_track = clean_track.lower()
+    artist_variants = expand_artists(artist)
+    primary_artist = artist_variants[0] if artist_variants else artist.lower()
+    queries = [
+        f"{clean_track} {primary_artist}",
+        f"track:{clean_track} artist:{primary_artist}",
+        clean_track,
+    ]
+    return list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+
+def similarity(a, b):
+    a = normalize_text(a)
+    b = normalize_text(b)
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+class CandidateRanking:
+    """
+    Keeps the best-scoring search result seen so far for one source track.
+    """
+
+    def __init__(self, raw_track, clean_track, artist):
+        self.raw_track = raw_track
+        self.title = clean_track
+        self.artists = expand_artists(artist) or [artist.lower()]
+        self.best_score = 0.0
+        self.best_uri = None
+        self._seen = set()
+
+    def score(self, item):
+        title_score = similarity(clean_track_name(item["name"]), self.title)
+        artist_score = max(
+            (similarity(a["name"], wanted) for a in item.get("artists", []) for wanted in self.artists),
+            default=0.0,
+        )
+        score = TITLE_WEIGHT * title_score + ARTIST_WEIGHT * artist_score
+        if is_unwanted_version(item["name"], self.raw_track):
+            score -= UNWANTED_PENALTY
+        return score
+
+    def add(self, items):
+        for item in items:
+            if not item or item["uri"] in self._seen:
+                continue
+            self._seen.add(item["uri"])
+            score = self.score(item)
+            if score > self.best_score:
+                self.best_score = score
+                self.best_uri = item["uri"]
+
+    @property
+    def confident(self):
+        return self.best_score >= HIGH_CONFIDENCE
+
+    def result(self):
+        return self.best_uri if self.best_score >= MIN_SCORE else None
+
+class MatchStats:
+    """
+    Thread-safe count of search calls made per track, to track how many API
+    calls each resolved track costs on average.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.api_calls = 0
+        self.searched = 0
+        self.resolved = 0
+
+    def record(self, calls, found):
+        with self._lock:
+            self.api_calls += calls
+            self.searched += 1
+            if found:
+                self.resolved += 1
+
+    def average_calls(self):
+        return self.api_calls / self.resolved if self.resolved else float(self.api_calls)
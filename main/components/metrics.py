@@ -0,0 +1,242 @@
+import bisect
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRAPE_FOLDER = os.path.join(BASE_DIR, "music_data")
+REPORTS_FOLDER = os.path.join(SCRAPE_FOLDER, "reports")
+RUNS_FILE = os.path.join(REPORTS_FOLDER, "runs.jsonl")
+PROMETHEUS_FILE = os.path.join(REPORTS_FOLDER, "trackswap.prom")
+
+# Upper bounds (seconds) of the per-track resolution latency histogram
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 90.0)
+
+# spotipy method -> call kind reported in api_calls_total
+CALL_KINDS = {
+    "search": "search",
+    "playlist_add_items": "add",
+    "playlist_remove_specific_occurrences_of_items": "remove",
+    "playlist_reorder_items": "reorder",
+    "playlist_replace_items": "replace",
+    "playlist_items": "read",
+    "playlist": "read",
+    "next": "read",
+}
+
+def _series(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            yield bound, total
+
+class MetricsRegistry:
+    """
+    Thread-safe counters, stage timers and histograms for one run.
+
+    Stage times add up across threads, so in a batch "resolve" is the sum
+    over every playlist rather than the elapsed time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Set by profiling.session() while a run is being profiled
+        self.profiler = None
+        self._active_runs = 0
+        self.reset()
+
+    def reset(self, run=None):
+        with self._lock:
+            self._reset(run)
+
+    def _reset(self, run):
+        self.run = run
+        self.started_at = time.time()
+        self.counters = {}
+        self.stages = {}  # name -> [seconds, count]
+        self.histograms = {}
+
+    @contextlib.contextmanager
+    def run_session(self, run):
+        """
+        Collect metrics for `run` and report them when it ends. Runs that
+        overlap, such as concurrent GUI jobs, share one collection: the
+        registry is only reset when no other run is active, and the report
+        is written once the last of them ends, labelled with all of them.
+        """
+        with self._lock:
+            if self._active_runs:
+                self.run = f"{self.run} + {run}"
+            else:
+                self._reset(run)
+            self._active_runs += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active_runs -= 1
+                last = not self._active_runs
+            if last:
+                self.write_reports()
+
+    def incr(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value):
+        with self._lock:
+            self.histograms.setdefault(name, Histogram()).observe(value)
+
+    def record_stage(self, name, seconds):
+        with self._lock:
+            stage = self.stages.setdefault(name, [0.0, 0])
+            stage[0] += seconds
+            stage[1] += 1
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        profiler = self.profiler
+        start = time.monotonic()
+        try:
+            if profiler is None:
+                yield
+            else:
+                with profiler.stage(name):
+                    yield
+        finally:
+            self.record_stage(name, time.monotonic() - start)
+
+    def timed(self, name):
+        """
+        Decorator recording every call of the function as stage `name`.
+        """
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, **labels):
+        with self._lock:
+            if labels:
+                return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+            return sum(v for (n, _), v in self.counters.items() if n == name)
+
+    def record_call(self, fn):
+        """
+        Count one API call made through `fn`, by kind (search, add, remove...).
+        """
+        name = getattr(fn, "__name__", "other")
+        self.incr("api_calls_total", call=CALL_KINDS.get(name, name))
+
+    def cache_hit_ratio(self):
+        hits = self.count("cache_hits_total")
+        total = hits + self.count("cache_misses_total")
+        return hits / total if total else None
+
+    def snapshot(self):
+        with self._lock:
+            counters = {_series(name, labels): value for (name, labels), value in self.counters.items()}
+            stages = {name: {"seconds": round(s, 3), "count": n} for name, (s, n) in self.stages.items()}
+            histograms = {
+                name: {
+                    "buckets": {str(bound): count for bound, count in h.cumulative()},
+                    "sum": round(h.sum, 3),
+                    "count": h.count,
+                }
+                for name, h in self.histograms.items()
+            }
+        return {
+            "run": self.run,
+            "started_at": self.started_at,
+            "elapsed": round(time.time() - self.started_at, 3),
+            "stages": stages,
+            "counters": counters,
+            "cache_hit_ratio": self.cache_hit_ratio(),
+            "histograms": histograms,
+        }
+
+    def prometheus(self):
+        """
+        Render the registry in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            names = sorted({name for name, _ in self.counters})
+            for name in names:
+                lines.append(f"# TYPE trackswap_{name} counter")
+                for (n, labels), value in sorted(self.counters.items()):
+                    if n == name:
+                        lines.append(f"{_series('trackswap_' + name, labels)} {value}")
+            if self.stages:
+                lines.append("# TYPE trackswap_stage_seconds_total counter")
+                for name, (seconds, _) in sorted(self.stages.items()):
+                    lines.append(f'trackswap_stage_seconds_total{{stage="{name}"}} {seconds:.3f}')
+            for name, h in sorted(self.histograms.items()):
+                lines.append(f"# TYPE trackswap_{name} histogram")
+                for bound, count in h.cumulative():
+                    lines.append(f'trackswap_{name}_bucket{{le="{bound}"}} {count}')
+                lines.append(f"trackswap_{name}_sum {h.sum:.3f}")
+                lines.append(f"trackswap_{name}_count {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self, runs_file=None, prometheus_file=None):
+        """
+        Append this run to the JSON-lines report and rewrite the Prometheus
+        textfile (atomically, so a collector never reads half a file).
+        """
+        runs_file = runs_file or RUNS_FILE
+        prometheus_file = prometheus_file or PROMETHEUS_FILE
+        try:
+            os.makedirs(os.path.dirname(runs_file), exist_ok=True)
+            with open(runs_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.snapshot()) + "\n")
+            os.makedirs(os.path.dirname(prometheus_file), exist_ok=True)
+            tmp_path = prometheus_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+            os.replace(tmp_path, prometheus_file)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics report: {e}")
+
+    def summary(self):
+        """
+        One-line overview for live display.
+        """
+        ratio = self.cache_hit_ratio()
+        histogram = self.histograms.get("track_resolve_seconds")
+        return (
+            f"Searches: {self.count('api_calls_total', call='search')}  ·  "
+            f"Adds: {self.count('api_calls_total', call='add')}  ·  "
+            f"Removes: {self.count('api_calls_total', call='remove')}  ·  "
+            f"429s: {self.count('rate_limited_total')} "
+            f"({self.count('retry_after_seconds_total'):.0f}s paused)  ·  "
+            f"Cache hits: {'-' if ratio is None else f'{ratio:.0%}'}  ·  "
+            f"Tracks searched: {histogram.count if histogram else 0}"
+        )
+
+# Process-wide registry shared by the pipeline, the scheduler and the GUI
+registry = MetricsRegistry()
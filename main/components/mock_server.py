@@ -0,0 +1,267 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Local stand-in for the Spotify Web API, used to exercise the search
+# backends, the uploader and the benchmarks offline. The catalog is a list
+# of {"name": ..., "artists": [...], "uri": ...} dicts. Recorded search
+# responses ({query: response body}) are replayed verbatim when a query
+# matches, and saved playlist pages can be served alongside for the HTTP
+# scraper. Latency, jitter and 429 responses can be injected.
+
+USER_ID = "mock-user"
+PAGE_SIZE = 100
+
+_PLAYLIST = re.compile(r"^/v1/playlists/([^/]+)$")
+_PLAYLIST_ITEMS = re.compile(r"^/v1/playlists/([^/]+)/(?:items|tracks)$")
+_USER_PLAYLISTS = re.compile(r"^/v1/users/([^/]+)/playlists$")
+
+def _track_item(track):
+    return {
+        "name": track["name"],
+        "uri": track["uri"],
+        "artists": [{"name": a} for a in track["artists"]],
+        "duration_ms": track.get("duration_ms"),
+    }
+
+class MockSpotifyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _base_url(self):
+        return f"http://{self.headers.get('Host')}"
+
+    def _dispatch(self, method):
+        server = self.server
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = self._read_json() if method in ("POST", "PUT", "DELETE") else {}
+
+        with server.lock:
+            server.request_count += 1
+            server.endpoint_counts[f"{method} {_endpoint_name(url.path)}"] += 1
+            throttle = server.throttle_rate and server.random.random() < server.throttle_rate
+        if server.latency or server.jitter:
+            time.sleep(max(0.0, server.latency + server.random.uniform(-server.jitter, server.jitter)))
+        if throttle:
+            with server.lock:
+                server.throttled += 1
+            self._send_json(429, {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                            headers={"Retry-After": str(server.retry_after)})
+            return
+
+        if url.path.startswith("/v1/"):
+            status, response = server.api.handle(method, url.path, params, body, self._base_url())
+            self._send_json(status, response)
+        elif method == "GET" and url.path in server.pages:
+            data = server.pages[url.path].encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send_json(404, {"error": {"status": 404, "message": "Not found"}})
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+def _endpoint_name(path):
+    if _PLAYLIST_ITEMS.match(path):
+        return "/v1/playlists/{id}/items"
+    if _PLAYLIST.match(path):
+        return "/v1/playlists/{id}"
+    if _USER_PLAYLISTS.match(path):
+        return "/v1/users/{id}/playlists"
+    return path
+
+class MockSpotifyAPI:
+    """
+    In-memory catalog and playlists behind the mock server.
+    """
+
+    def __init__(self, catalog, recordings=None):
+        self.recordings = recordings or {}
+        self.by_name = {}
+        self.by_uri = {}
+        for track in catalog:
+            self.by_name.setdefault(track["name"].lower(), []).append(track)
+            self.by_uri[track["uri"]] = track
+        self.playlists = {}  # id -> {"id", "name", "snapshot_id", "uris"}
+        self.lock = threading.Lock()
+
+    def search(self, query, limit):
+        if query in self.recordings:
+            return self.recordings[query]
+        words = query.lower().replace("track:", " ").replace("artist:", " ").split()
+        items = []
+        # Any run of leading words that names a catalog track counts as a hit
+        for end in range(len(words), 0, -1):
+            for track in self.by_name.get(" ".join(words[:end]), []):
+                items.append(_track_item(track))
+        return {"tracks": {"items": items[:limit], "next": None}}
+
+    def _new_snapshot(self, playlist):
+        playlist["snapshot_id"] = uuid.uuid4().hex
+        return {"snapshot_id": playlist["snapshot_id"]}
+
+    def _page(self, items, params, base_url, path):
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", PAGE_SIZE))
+        page = items[offset:offset + limit]
+        next_url = None
+        if offset + limit < len(items):
+            next_url = f"{base_url}{path}?offset={offset + limit}&limit={limit}"
+        return {"items": page, "next": next_url, "total": len(items), "offset": offset, "limit": limit}
+
+    def handle(self, method, path, params, body, base_url):
+        with self.lock:
+            return self._handle(method, path, params, body, base_url)
+
+    def _handle(self, method, path, params, body, base_url):
+        if path == "/v1/search":
+            return 200, self.search(params.get("q", ""), int(params.get("limit", 20)))
+        if path in ("/v1/me", "/v1/me/"):
+            return 200, {"id": USER_ID, "display_name": "Mock User"}
+        if path == "/v1/me/playlists" and method == "GET":
+            # Newest playlists are listed first, like the real API
+            listing = [
+                {"id": p["id"], "name": p["name"], "snapshot_id": p["snapshot_id"]}
+                for p in reversed(list(self.playlists.values()))
+            ]
+            return 200, self._page(listing, params, base_url, path)
+        if _USER_PLAYLISTS.match(path) and method == "POST":
+            playlist = {"id": uuid.uuid4().hex[:22], "name": body.get("name", ""), "uris": []}
+            self._new_snapshot(playlist)
+            self.playlists[playlist["id"]] = playlist
+            return 201, {"id": playlist["id"], "name": playlist["name"], "snapshot_id": playlist["snapshot_id"]}
+
+        match = _PLAYLIST.match(path) or _PLAYLIST_ITEMS.match(path)
+        playlist = self.playlists.get(match.group(1)) if match else None
+        if playlist is None:
+            return 404, {"error": {"status": 404, "message": "Not found"}}
+
+        if _PLAYLIST.match(path):
+            return 200, {"id": playlist["id"], "name": playlist["name"], "snapshot_id": playlist["snapshot_id"]}
+
+        uris = playlist["uris"]
+        if method == "GET":
+            items = [
+                {"track": _track_item(self.by_uri[uri]) if uri in self.by_uri else {"uri": uri}} for uri in uris
+            ]
+            return 200, self._page(items, params, base_url, path)
+        if method == "POST":
+            new_uris = body if isinstance(body, list) else body.get("uris", [])
+            position = params.get("position")
+            position = len(uris) if position is None else int(position)
+            uris[position:position] = new_uris
+            return 201, self._new_snapshot(playlist)
+        if method == "PUT" and "uris" in body:
+            playlist["uris"] = list(body["uris"])
+            return 200, self._new_snapshot(playlist)
+        if method == "PUT":
+            start, length = body["range_start"], body.get("range_length", 1)
+            insert_before = body["insert_before"]
+            moved = uris[start:start + length]
+            del uris[start:start + length]
+            if insert_before > start:
+                insert_before -= length
+            uris[insert_before:insert_before] = moved
+            return 200, self._new_snapshot(playlist)
+        if method == "DELETE":
+            drop = set()
+            for item in body.get("items", body.get("tracks", [])):
+                positions = item.get("positions")
+                if positions is None:
+                    drop.update(i for i, uri in enumerate(uris) if uri == item["uri"])
+                else:
+                    drop.update(p for p in positions if p < len(uris) and uris[p] == item["uri"])
+            playlist["uris"] = [uri for i, uri in enumerate(uris) if i not in drop]
+            return 200, self._new_snapshot(playlist)
+        return 405, {"error": {"status": 405, "message": "Method not allowed"}}
+
+def start_server(catalog, port=0, latency=0.0, pages=None, jitter=0.0, throttle_rate=0.0,
+                 retry_after=1, recordings=None, seed=None):
+    """
+    Serve `catalog` on 127.0.0.1 in a background thread. `pages` maps URL
+    paths to HTML served as-is, e.g. saved playlist pages. `throttle_rate`
+    is the fraction of requests answered with a 429.
+    Returns (server, base_url); call server.shutdown() when done.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockSpotifyHandler)
+    server.daemon_threads = True
+    server.api = MockSpotifyAPI(catalog, recordings)
+    server.latency = latency
+    server.jitter = jitter
+    server.throttle_rate = throttle_rate
+    server.retry_after = retry_after
+    server.pages = pages or {}
+    server.random = random.Random(seed)
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.throttled = 0
+    server.endpoint_counts = Counter()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+def load_pages(folder):
+    """
+    Map every .html file in `folder` to /<filename without extension>.
+    """
+    pages = {}
+    for filename in os.listdir(folder):
+        if filename.endswith(".html"):
+            with open(os.path.join(folder, filename), "r", encoding="utf-8") as f:
+                pages["/" + filename[:-5]] = f.read()
+    return pages
+
+if __name__ == "__main__":
+    import sys
+    catalog_file = sys.argv[1] if len(sys.argv) > 1 else None
+    pages_folder = sys.argv[2] if len(sys.argv) > 2 else None
+    catalog = []
+    if catalog_file:
+        with open(catalog_file, "r", encoding="utf-8") as f:
+            catalog = json.load(f)
+    pages = load_pages(pages_folder) if pages_folder else None
+    server, base_url = start_server(catalog, port=8765, pages=pages)
+    print(f"🧪 Mock Spotify API listening on {base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
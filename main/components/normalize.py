@@ -0,0 +1,83 @@
+import re
+from functools import lru_cache
+
+# Text cleaning shared by the uploader, the matcher and the batch runner.
+# Patterns are compiled once, and the per-string functions are memoized
+# because playlists repeat the same artists and titles many times.
+
+CACHE_SIZE = 65536
+
+_PARENTHESES = re.compile(r"\s*\([^)]*\)")
+_BRACKETS = re.compile(r"\s*\[[^]]*\]")
+_SOUNDTRACK = re.compile(r"(?i)(Original Motion Picture Soundtrack|From.*Album)")
+_ARTIST_NOISE = re.compile(r"(?i)( - topic|official|music|audio)")
+_ARTIST_SEPARATORS = re.compile(r",|&|feat\.|Feat\.|featuring|Featuring")
+# [^\w\s] -> " " followed by \s+ -> " " is the same as collapsing runs of \W
+_NON_WORD = re.compile(r"\W+")
+_NON_WORD_KEEP_NEWLINES = re.compile(r"[^\w\n]+")
+
+UNWANTED_KEYWORDS = [
+    "remix", "lofi", "lo-fi", "chill", "version", "cover", "mix", "edit",
+    "acoustic", "reverb", "slowed", "speedup", "sped up", "nightcore", "karaoke", "reprise"
+]
+
+@lru_cache(maxsize=CACHE_SIZE)
+def clean_track_name(name):
+    name = _PARENTHESES.sub("", name)  # remove (parentheses)
+    name = _BRACKETS.sub("", name)     # remove [brackets]
+    name = _SOUNDTRACK.sub("", name)
+    return name.lower().strip()
+
+@lru_cache(maxsize=CACHE_SIZE)
+def clean_artist_name(name):
+    return _ARTIST_NOISE.sub("", name.lower()).strip()
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _expand_artists(artist):
+    return tuple(clean_artist_name(p) for p in _ARTIST_SEPARATORS.split(artist) if p.strip())
+
+def expand_artists(artist):
+    return list(_expand_artists(artist))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_text(s):
+    """
+    Lowercase, remove punctuation except spaces, and collapse multiple spaces.
+    """
+    return _NON_WORD.sub(" ", s.lower()).strip()
+
+_UNWANTED_NORMALIZED = sorted({normalize_text(k) for k in UNWANTED_KEYWORDS}, key=len, reverse=True)
+# A lookahead alternation reports every keyword start in one scan, including overlapping ones
+_UNWANTED_PATTERN = re.compile("(?=(" + "|".join(re.escape(k) for k in _UNWANTED_NORMALIZED) + "))")
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_unwanted_version(track_name, raw_track):
+    """
+    Return True if track_name looks like an unwanted variant
+    BUT allow if the original/raw track explicitly mentions the same keyword
+    (punctuation/spacing differences ignored).
+    """
+    norm_name = normalize_text(track_name)
+    found = {m.group(1) for m in _UNWANTED_PATTERN.finditer(norm_name)}
+    if not found:
+        return False
+    norm_raw = normalize_text(raw_track)
+    return any(bad not in norm_raw for bad in found)
+
+def normalize_column(values):
+    """
+    normalize_text for a whole column at once: duplicates are normalized
+    once and the unique strings go through a single regex pass.
+    """
+    unique = list(dict.fromkeys(values))
+    joined = "\n".join(v.replace("\n", " ") for v in unique).lower()
+    normalized = _NON_WORD_KEEP_NEWLINES.sub(" ", joined).split("\n")
+    mapping = {v: n.strip() for v, n in zip(unique, normalized)}
+    return [mapping[v] for v in values]
+
+def clean_track_column(values):
+    """
+    clean_track_name for a whole column, cleaning each distinct title once.
+    """
+    mapping = {v: clean_track_name(v) for v in dict.fromkeys(values)}
+    return [mapping[v] for v in values]
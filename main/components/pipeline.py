@@ -0,0 +1,109 @@
+import csv
+import os
+from itertools import chain
+
+from components import cleaner
+from components.metrics import registry as metrics
+from components import retry_queue
+from components import script
+from components.ratelimit import Cancelled
+
+# Streaming scraper -> cleaner -> uploader chain. Each stage is a generator,
+# so the uploader starts searching the first tracks while later ones are
+# still being parsed. File dumps are only written when debugging.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRAPE_FOLDER = os.path.join(BASE_DIR, "music_data")
+
+# "gui" drives Chrome and the clipboard, "http" fetches the playlist page headlessly
+SCRAPER_BACKEND = os.getenv("TRACKSWAP_SCRAPER", "gui")
+
+# Set TRACKSWAP_DEBUG_DUMPS=1 to also write the raw text and cleaned CSV to music_data/
+DEBUG_DUMPS = os.getenv("TRACKSWAP_DEBUG_DUMPS") == "1"
+
+def tee_lines(lines, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(line + "\n")
+            yield line
+
+def tee_tracks(tracks, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(["Number", "Title", "Artist"])
+        for track in tracks:
+            writer.writerow(track)
+            yield track
+
+def report_when_done(tracks, report):
+    yield from tracks
+    report.print_summary()
+
+def stop_when_cancelled(tracks, cancel_event):
+    for track in tracks:
+        if cancel_event.is_set():
+            raise Cancelled()
+        yield track
+
+def scrape(playlist_url, scraper_backend=None, debug_dir=None):
+    """
+    Return (playlist_name, tracks) where tracks lazily yields
+    (number, title, artist) records.
+    """
+    scraper_backend = scraper_backend or SCRAPER_BACKEND
+    if scraper_backend == "http":
+        from components import web_scraper
+        playlist_name, tracks = web_scraper.fetch_playlist(playlist_url)
+        tracks = iter(tracks)
+    else:
+        from components import scrapper
+        lines = scrapper.iter_raw_lines(playlist_url)
+        if debug_dir:
+            lines = tee_lines(lines, os.path.join(debug_dir, "amazon_playlist_raw.txt"))
+        playlist_name, lines = cleaner.split_playlist_name(lines)
+        report = cleaner.ParseReport()
+        tracks = report_when_done(cleaner.iter_tracks(lines, report), report)
+
+    if debug_dir:
+        tracks = tee_tracks(tracks, os.path.join(debug_dir, "amazon_playlist.csv"))
+    return playlist_name, tracks
+
+def run(playlist_url=None, scraper_backend=None, search_backend=None, debug_dir=None, progress=None,
+        cancel_event=None):
+    """
+    Scrape, clean and upload one playlist without intermediate files.
+    Returns the uploader's summary dict. Metrics for the run are appended
+    to music_data/reports/, together with those of any run overlapping it.
+    progress(settled, total) reports resolved tracks as they come in. Once
+    `cancel_event` (a threading.Event) is set the run stops at its next
+    track or API call and raises Cancelled.
+    """
+    if not playlist_url:
+        playlist_url = input("🔗 Paste your Amazon Music playlist URL: ").strip()
+    # Imported here so that runs with profiling off never load it
+    from components import profiling
+    with metrics.run_session(playlist_url):
+        with profiling.session("playlist"), metrics.stage("total"), retry_queue.background():
+            return _run(playlist_url, scraper_backend, search_backend, debug_dir, progress, cancel_event)
+
+def _run(playlist_url, scraper_backend, search_backend, debug_dir, progress=None, cancel_event=None):
+    if debug_dir is None and DEBUG_DUMPS:
+        debug_dir = SCRAPE_FOLDER
+    if debug_dir:
+        os.makedirs(debug_dir, exist_ok=True)
+
+    print("\n📥 Scraping playlist...")
+    playlist_name, tracks = scrape(playlist_url, scraper_backend, debug_dir)
+    if cancel_event is not None:
+        tracks = stop_when_cancelled(tracks, cancel_event)
+
+    # Don't create an empty playlist when nothing could be parsed
+    first = next(tracks, None)
+    if first is None:
+        print("⚠️ No valid songs found.")
+        return {"playlist": playlist_name, "playlist_id": None, "tracks": 0, "found": 0, "not_found": []}
+    tracks = chain([first], tracks)
+
+    print(f"\n🎧 Uploading '{playlist_name}' to Spotify...")
+    return script.upload_tracks(tracks, playlist_name, backend=search_backend, journal_key=playlist_url,
+                                progress=progress, cancel_event=cancel_event)
@@ -0,0 +1,190 @@
+from collections import defaultdict, deque
+from bisect import bisect_left
+
+BATCH_SIZE = 100
+
+def _call(scheduler, fn, *args, **kwargs):
+    if scheduler is None:
+        return fn(*args, **kwargs)
+    return scheduler.call(fn, *args, **kwargs)
+
+def fetch_snapshot_id(sp, playlist_id, scheduler=None):
+    return _call(scheduler, sp.playlist, playlist_id, fields="snapshot_id")["snapshot_id"]
+
+def fetch_playlist_uris(sp, playlist_id, scheduler=None, on_tracks=None):
+    """
+    Return (uris, snapshot_id) for the current contents of a playlist.
+    Unavailable items without a track are returned as None.
+    If given, on_tracks(tracks) receives the track objects (uri, name and
+    artist names) of every page read.
+    """
+    snapshot_id = fetch_snapshot_id(sp, playlist_id, scheduler)
+    uris = []
+    fields = "items(track(uri,name,artists(name))),next" if on_tracks else "items(track(uri)),next"
+    page = _call(scheduler, sp.playlist_items, playlist_id, fields=fields, limit=100)
+    while page:
+        uris.extend(item["track"]["uri"] if item.get("track") else None for item in page["items"])
+        if on_tracks:
+            on_tracks([item["track"] for item in page["items"] if item.get("track")])
+        page = _call(scheduler, sp.next, page) if page.get("next") else None
+    return uris, snapshot_id
+
+def _longest_increasing_subsequence(values):
+    """
+    Return the set of indexes (into values) forming one longest strictly
+    increasing subsequence.
+    """
+    tails = []
+    tail_idx = []
+    prev = [-1] * len(values)
+    for i, v in enumerate(values):
+        pos = bisect_left(tails, v)
+        if pos == len(tails):
+            tails.append(v)
+            tail_idx.append(i)
+        else:
+            tails[pos] = v
+            tail_idx[pos] = i
+        prev[i] = tail_idx[pos - 1] if pos > 0 else -1
+    keep = set()
+    i = tail_idx[-1] if tail_idx else -1
+    while i != -1:
+        keep.add(i)
+        i = prev[i]
+    return keep
+
+def compute_delta(current, target):
+    """
+    Compute the operations turning the `current` URI list into `target`.
+
+    Returns (removals, moves, inserts):
+      - removals: {uri: [positions]} in `current` to delete
+      - moves:    [(range_start, insert_before)] applied one by one after removals
+      - inserts:  [(position, [uris])] applied in order after the moves
+    """
+    # Match every current occurrence to an occurrence in the target, in order
+    wanted = defaultdict(deque)
+    for idx, uri in enumerate(target):
+        wanted[uri].append(idx)
+
+    removals = defaultdict(list)
+    kept = []  # target indexes of kept items, in current playlist order
+    for pos, uri in enumerate(current):
+        if wanted[uri]:
+            kept.append(wanted[uri].popleft())
+        else:
+            removals[uri].append(pos)
+
+    # Items on a longest increasing run stay put, everything else is moved
+    anchors = _longest_increasing_subsequence(kept)
+    order = list(kept)
+    placed = {kept[i] for i in anchors}
+    moves = []
+    for i, value in enumerate(kept):
+        if i in anchors:
+            continue
+        start = order.index(value)
+        insert_before = len(order)
+        for j, other in enumerate(order):
+            if other in placed and other > value:
+                insert_before = j
+                break
+        if insert_before != start and insert_before != start + 1:
+            moves.append((start, insert_before))
+            order.pop(start)
+            if insert_before > start:
+                insert_before -= 1
+            order.insert(insert_before, value)
+        placed.add(value)
+
+    # Kept items are now in target order, so missing runs go in at their final index
+    present = set(kept)
+    inserts = []
+    run_start = None
+    for idx in range(len(target) + 1):
+        missing = idx < len(target) and idx not in present
+        if missing and run_start is None:
+            run_start = idx
+        elif not missing and run_start is not None:
+            for i in range(run_start, idx, BATCH_SIZE):
+                inserts.append((i, target[i:min(idx, i + BATCH_SIZE)]))
+            run_start = None
+
+    return dict(removals), moves, inserts
+
+def rewrite_calls(target):
+    """
+    Number of write calls replace_playlist makes for `target`.
+    """
+    return max(1, -(-len(target) // BATCH_SIZE))
+
+def delta_calls(removals, moves, inserts):
+    """
+    Number of write calls sync_playlist makes to apply a compute_delta result.
+    """
+    return -(-len(removals) // BATCH_SIZE) + len(moves) + len(inserts)
+
+def replace_playlist(sp, playlist_id, target_uris, scheduler=None):
+    """
+    Overwrite the playlist with `target_uris`: one replace call for the
+    first hundred, then adds. Returns the number of write calls made.
+    """
+    _call(scheduler, sp.playlist_replace_items, playlist_id, target_uris[:BATCH_SIZE])
+    for i in range(BATCH_SIZE, len(target_uris), BATCH_SIZE):
+        _call(scheduler, sp.playlist_add_items, playlist_id, target_uris[i:i + BATCH_SIZE])
+    return rewrite_calls(target_uris)
+
+def sync_playlist(sp, playlist_id, target_uris, scheduler=None, on_tracks=None):
+    """
+    Bring an existing playlist in line with `target_uris` by applying only the
+    removals, moves and inserts needed, chained through snapshot ids. When
+    that would take more calls than rewriting the playlist (e.g. after a
+    reversal or shuffle, with one call per move) it is rewritten instead.
+    Calls go through `scheduler` when one is given; `on_tracks` is passed
+    to fetch_playlist_uris.
+    Returns the number of write calls made.
+    """
+    def call(fn, *args, **kwargs):
+        return _call(scheduler, fn, *args, **kwargs)
+
+    current, snapshot_id = fetch_playlist_uris(sp, playlist_id, scheduler, on_tracks)
+
+    if None in current:
+        # Unavailable items can't be addressed by URI, so rewrite the playlist instead
+        print("⚠️ Playlist contains unavailable items, replacing its contents...")
+        return replace_playlist(sp, playlist_id, target_uris, scheduler)
+
+    removals, moves, inserts = compute_delta(current, target_uris)
+    removed = sum(len(p) for p in removals.values())
+    print(f"🔁 Sync delta: {removed} to remove, {len(moves)} to move, "
+          f"{sum(len(u) for _, u in inserts)} to add.")
+    if delta_calls(removals, moves, inserts) > rewrite_calls(target_uris):
+        print(f"🔁 Rewriting the playlist instead ({rewrite_calls(target_uris)} calls).")
+        return replace_playlist(sp, playlist_id, target_uris, scheduler)
+
+    calls = 0
+    # Removal positions all refer to the fetched snapshot, so every batch is sent against it
+    items = [{"uri": uri, "positions": positions} for uri, positions in removals.items()]
+    latest_snapshot = snapshot_id
+    for i in range(0, len(items), BATCH_SIZE):
+        result = call(
+            sp.playlist_remove_specific_occurrences_of_items,
+            playlist_id, items[i:i + BATCH_SIZE], snapshot_id=snapshot_id
+        )
+        latest_snapshot = result["snapshot_id"]
+        calls += 1
+    snapshot_id = latest_snapshot
+
+    for range_start, insert_before in moves:
+        result = call(
+            sp.playlist_reorder_items,
+            playlist_id, range_start=range_start, insert_before=insert_before, snapshot_id=snapshot_id
+        )
+        snapshot_id = result["snapshot_id"]
+        calls += 1
+
+    for position, uris in inserts:
+        call(sp.playlist_add_items, playlist_id, uris, position=position)
+        calls += 1
+
+    return calls
@@ -0,0 +1,374 @@
+import contextlib
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+from components.metrics import registry as metrics
+
+# Profiling mode for the pipeline entry points. While a session is open,
+# every metrics stage (scrape, clean, playlist, resolve, write...) also gets
+#   - its own cProfile stats, exclusive of the stages nested inside it,
+#   - wall, CPU, blocked-on-I/O and waiting time, from a sampling thread
+#     that reads every thread's stack and CPU clock,
+#   - traced memory, with the run's top allocation sites at the end.
+# Samples are also written as collapsed stacks for flame-graph tools
+# (flamegraph.pl, speedscope, inferno). With profiling off, a stage costs
+# one extra attribute check, and cProfile, pstats and tracemalloc are not
+# even imported.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRAPE_FOLDER = os.path.join(BASE_DIR, "music_data")
+PROFILES_FOLDER = os.path.join(SCRAPE_FOLDER, "profiles")
+
+# Set TRACKSWAP_PROFILE=1 (or pass --profile to cli.py) to profile every run
+ENABLED = os.getenv("TRACKSWAP_PROFILE") == "1"
+
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+TRACEMALLOC_FRAMES = 10
+TOP_ALLOCATIONS = 25
+TOP_FUNCTIONS = 15
+
+# Where a thread that isn't running Python code is, judged by its innermost frame
+IO_FILES = ("socket.py", "ssl.py", "selectors.py", "http/client.py", "urllib3", "requests", "aiohttp", "asyncio",
+            "sqlite3")
+WAIT_FILES = ("threading.py", "queue.py", "concurrent")
+COLUMNS = ("wall", "cpu", "io", "wait", "other")
+
+# Only imported once a run is actually profiled, see _load_tools()
+cProfile = pstats = tracemalloc = None
+
+def _load_tools():
+    global cProfile, pstats, tracemalloc
+    import cProfile
+    import pstats
+    import tracemalloc
+
+def enable():
+    """
+    Profile every run started from now on, in this process.
+    """
+    global ENABLED
+    ENABLED = True
+
+def disable():
+    """
+    Stop profiling runs started from now on; open sessions still finish.
+    """
+    global ENABLED
+    ENABLED = False
+
+def toggle():
+    """
+    Flip profiling for the runs started from now on. Returns the new state.
+    """
+    if ENABLED:
+        disable()
+    else:
+        enable()
+    return ENABLED
+
+def thread_cpu_clock(ident):
+    """
+    Return a function reading the CPU time of thread `ident`, or None where
+    other threads' CPU clocks can't be read (e.g. Windows).
+    """
+    getclockid = getattr(time, "pthread_getcpuclockid", None)
+    if getclockid is None:
+        return None
+    try:
+        clock_id = getclockid(ident)
+    except OSError:
+        return None
+    return lambda: time.clock_gettime(clock_id)
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def blocked_on(frame):
+    """
+    "io" or "wait" if the innermost frame is networking/database or
+    lock/queue code, else "other" (sleeping, C code, waiting for the GIL).
+    """
+    filename = frame.f_code.co_filename.replace("\\", "/")
+    if any(part in filename for part in IO_FILES):
+        return "io"
+    if any(part in filename for part in WAIT_FILES):
+        return "wait"
+    return "other"
+
+class Profiler:
+    """
+    Per-stage and per-thread time accounting for one profiling session.
+    MetricsRegistry.stage() calls stage() while this is installed as
+    metrics.registry.profiler.
+    """
+
+    def __init__(self, label="run", interval=SAMPLE_INTERVAL):
+        _load_tools()
+        self.label = label
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._local = threading.local()      # per thread: stack of (stage, cProfile or None)
+        self._thread_stages = {}             # thread ident -> stack of stage names
+        self._clocks = {}                    # thread ident -> CPU clock reader or None
+        self._cpu = {}                       # thread ident -> CPU seconds at the last sample
+        self.stages = defaultdict(Counter)   # stage -> sampled seconds per column, plus "wall" and "calls"
+        self.threads = defaultdict(Counter)  # thread name -> sampled seconds per column
+        self.stacks = Counter()              # collapsed stack -> samples
+        self.memory = defaultdict(Counter)   # stage -> "peak" and "net" traced bytes
+        self.profiles = {}                   # stage -> pstats.Stats
+        self.samples = 0
+        self.cprofile_unavailable = False
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._stop_event = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._sampler.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    # --- Stages ---
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        ident = threading.get_ident()
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        # Each stage's cProfile stats exclude the stages nested inside it
+        if stack and stack[-1][1] is not None:
+            stack[-1][1].disable()
+        profile = self._start_cprofile()
+        stack.append((name, profile))
+        with self._lock:
+            self._thread_stages.setdefault(ident, []).append(name)
+        memory_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            memory_after = tracemalloc.get_traced_memory()[0]
+            stack.pop()
+            if profile is not None:
+                profile.disable()
+            if stack and stack[-1][1] is not None and not self._enable(stack[-1][1]):
+                stack[-1] = (stack[-1][0], None)
+            with self._lock:
+                self._thread_stages[ident].pop()
+                if not self._thread_stages[ident]:
+                    del self._thread_stages[ident]
+                self.stages[name]["wall"] += wall
+                self.stages[name]["calls"] += 1
+                self.memory[name]["net"] += memory_after - memory_before
+                if profile is not None and profile.getstats():
+                    if name in self.profiles:
+                        self.profiles[name].add(profile)
+                    else:
+                        self.profiles[name] = pstats.Stats(profile)
+
+    def _start_cprofile(self):
+        profile = cProfile.Profile()
+        return profile if self._enable(profile) else None
+
+    def _enable(self, profile):
+        try:
+            profile.enable()
+            return True
+        except ValueError:
+            # Python 3.12+ allows one active cProfile per process; the sampler still covers this stage
+            self.cprofile_unavailable = True
+            return False
+
+    # --- Sampling ---
+
+    def _sample_loop(self):
+        last = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(now - last)
+            last = now
+
+    def _sample(self, elapsed):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        memory = tracemalloc.get_traced_memory()[0]
+        with self._lock:
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stages = self._thread_stages.get(ident)
+                stage = stages[-1] if stages else None
+                times = self._split(ident, frame, elapsed)
+                thread = names.get(ident, str(ident))
+                self.threads[thread].update(times)
+                if stage is not None:
+                    self.stages[stage].update({k: v for k, v in times.items() if k != "wall"})
+                    self.memory[stage]["peak"] = max(self.memory[stage]["peak"], memory)
+                self.stacks[self._collapse(thread, stages, frame)] += 1
+
+    def _split(self, ident, frame, elapsed):
+        """
+        Split `elapsed` seconds of one thread into CPU and off-CPU time by
+        reason. Without a per-thread CPU clock, off-CPU time is only told
+        apart when the thread sits in I/O or lock code.
+        """
+        if ident not in self._clocks:
+            self._clocks[ident] = thread_cpu_clock(ident)
+        clock = self._clocks[ident]
+        reason = blocked_on(frame)
+        times = Counter(wall=elapsed)
+        if clock is None:
+            times["cpu" if reason == "other" else reason] += elapsed
+            return times
+        try:
+            cpu = clock()
+        except OSError:
+            return times
+        previous = self._cpu.get(ident, cpu)
+        self._cpu[ident] = cpu
+        on_cpu = min(elapsed, max(0.0, cpu - previous))
+        times["cpu"] += on_cpu
+        times[reason] += elapsed - on_cpu
+        return times
+
+    @staticmethod
+    def _collapse(thread, stages, frame):
+        frames = []
+        while frame is not None:
+            frames.append(frame_label(frame))
+            frame = frame.f_back
+        # Pool threads are numbered; one root per pool keeps the flame graph readable
+        root = re.sub(r"_\d+$", "", thread)
+        return ";".join([root, "/".join(stages) if stages else "-"] + frames[::-1])
+
+    # --- Reports ---
+
+    def write(self, folder):
+        """
+        Write stacks.collapsed, one <stage>.prof per stage and report.txt
+        to `folder`. Returns the report text.
+        """
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "stacks.collapsed"), "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        for name, stats in self.profiles.items():
+            stats.dump_stats(os.path.join(folder, f"{name}.prof"))
+        report = self.report()
+        with open(os.path.join(folder, "report.txt"), "w", encoding="utf-8") as f:
+            f.write(report)
+        return report
+
+    def report(self):
+        lines = [f"Profiled {self.elapsed:.2f}s, {self.samples} samples every {self.interval * 1000:g} ms.", ""]
+        lines.append("Stages (wall is measured; the rest is sampled, summed over the threads in the stage):")
+        lines.append(self._table_header("stage"))
+        for name, times in sorted(self.stages.items(), key=lambda item: -item[1]["wall"]):
+            memory = self.memory[name]
+            lines.append(self._table_row(name, times) +
+                         f"  {memory['net'] / 1024 / 1024:>+9.1f}  {memory['peak'] / 1024 / 1024:>8.1f}")
+        lines.append("")
+        lines.append("Threads (sampled):")
+        lines.append(self._table_header("thread", memory=False))
+        for name, times in sorted(self.threads.items(), key=lambda item: -item[1]["cpu"]):
+            lines.append(self._table_row(name, times))
+        if self.cprofile_unavailable:
+            lines += ["", "⚠️ cProfile could not run in every thread (one profiler per process on this Python)."]
+        for name, stats in sorted(self.profiles.items()):
+            lines += ["", f"Top functions in stage '{name}' (cumulative, excluding nested stages):"]
+            lines.append(self._top_functions(stats))
+        lines += ["", "Top allocations still held at the end of the run:"]
+        lines += self._top_allocations()
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _table_header(label, memory=True):
+        header = f"  {label:<28}" + "".join(f"{column:>9}" for column in COLUMNS)
+        if memory:
+            header += "  net (MB)  peak (MB)"
+        return header
+
+    @staticmethod
+    def _table_row(name, times):
+        return f"  {name[:28]:<28}" + "".join(f"{times[column]:>8.2f}s" for column in COLUMNS)
+
+    @staticmethod
+    def _top_functions(stats):
+        rows = []
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append((cumtime, tottime, calls, f"{function} ({os.path.basename(filename)}:{line})"))
+        rows.sort(reverse=True)
+        return "\n".join(f"  {cum:>8.3f}s cum  {tot:>8.3f}s self  {calls:>8} calls  {label}"
+                         for cum, tot, calls, label in rows[:TOP_FUNCTIONS])
+
+    @staticmethod
+    def _top_allocations():
+        if not tracemalloc.is_tracing():
+            return ["  (tracemalloc was not running)"]
+        stats = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, pstats.__file__),
+            tracemalloc.Filter(False, __file__),
+        )).statistics("lineno")
+        return [f"  {stat.size / 1024:>10.1f} KiB  {stat.count:>8} blocks  {stat.traceback[0]}"
+                for stat in stats[:TOP_ALLOCATIONS]]
+
+_profiler = None
+_users = 0
+_started_tracemalloc = False
+_profiler_lock = threading.Lock()
+
+@contextlib.contextmanager
+def session(label="run"):
+    """
+    Profile the block if profiling is enabled, then write the reports to
+    music_data/profiles/<time>-<label>/. Overlapping sessions (concurrent
+    GUI jobs) share the first one's profiler, written when the last ends.
+    Does nothing when profiling is off.
+    """
+    global _profiler, _users, _started_tracemalloc
+    if not ENABLED:
+        yield None
+        return
+    with _profiler_lock:
+        if _users == 0:
+            _load_tools()
+            _started_tracemalloc = not tracemalloc.is_tracing()
+            if _started_tracemalloc:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            _profiler = Profiler(label=label)
+            _profiler.start()
+            metrics.profiler = _profiler
+        _users += 1
+        profiler = _profiler
+    try:
+        yield profiler
+    finally:
+        with _profiler_lock:
+            _users -= 1
+            if _users == 0:
+                metrics.profiler = None
+                profiler.stop()
+                safe_label = re.sub(r"[^\w\-]+", "_", profiler.label)[:40].strip("_")
+                folder = os.path.join(PROFILES_FOLDER, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_label}")
+                try:
+                    report = profiler.write(folder)
+                    print("\n🔬 " + report.split("\n\nThreads")[0])
+                    print(f"🔬 Profile written to '{folder}' (stacks.collapsed, *.prof, report.txt).")
+                except OSError as e:
+                    print(f"⚠️ Could not write profile: {e}")
+                if _started_tracemalloc:
+                    tracemalloc.stop()
+                _profiler = None
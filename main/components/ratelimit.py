@@ -0,0 +1,245 @@
+import threading
+import time
+
+from components.metrics import registry as metrics
+
+# Longest a waiting call sleeps before looking at its cancel event again
+CANCEL_POLL = 0.25
+
+# Ceiling for the shared AIMD concurrency limit. The async search backend
+# can keep this many searches in flight; the thread backend has fewer threads
+SHARED_MAX_CONCURRENCY = 32
+
+# How often a coroutine waiting for a free slot checks again, since it
+# can't be woken by _release like a waiting thread
+ASYNC_SLOT_POLL = 0.02
+
+class DeadlineExceeded(Exception):
+    pass
+
+class Cancelled(Exception):
+    """
+    Raised instead of making a call once the run has been cancelled.
+    """
+
+def retry_after_seconds(error):
+    """
+    Return the Retry-After delay (in seconds) if `error` is a 429 response
+    from spotipy, requests or aiohttp, otherwise None.
+    """
+    status = getattr(error, "http_status", None)
+    if status is None:
+        status = getattr(error, "status", None)
+    headers = getattr(error, "headers", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = response.status_code
+        headers = response.headers
+    if status != 429:
+        return None
+    try:
+        return max(1.0, float((headers or {}).get("Retry-After", 1)))
+    except (TypeError, ValueError):
+        return 1.0
+
+class RequestScheduler:
+    """
+    Shared gate for every Spotify API call made by the worker threads, and
+    by the async search backend through call_async().
+
+    Combines a token bucket (requests/sec) with an AIMD concurrency limit:
+    both grow slowly while requests succeed quickly and are halved on a 429,
+    at which point every worker is paused until Retry-After has elapsed.
+
+    Once `cancel_event` (a threading.Event) is set, every call still waiting
+    and every later call raises Cancelled; calls already sent are left to
+    finish.
+
+    With a `parent`, the limits, the pause and the AIMD state are the
+    parent's: calls wait for its slots and tokens, so everything sharing a
+    parent shares one budget. Cancellation and the calls/throttled counts
+    stay per scheduler.
+    """
+
+    def __init__(self, rate=10.0, max_rate=30.0, max_concurrency=8, min_concurrency=1,
+                 target_latency=1.5, cancel_event=None, parent=None):
+        self.parent = parent
+        self._gate = parent or self
+        if parent is not None:
+            max_concurrency = parent.max_concurrency
+        self.rate = rate
+        self.min_rate = 1.0
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.target_latency = target_latency
+        self.cancel_event = cancel_event
+
+        self.limit = float(min(4, max_concurrency))
+        self.tokens = rate
+        self.in_flight = 0
+        self.pause_until = 0.0
+        self._last_refill = time.monotonic()
+        self._cond = threading.Condition()
+
+        self.calls = 0
+        self.throttled = 0
+        self.throttle_seconds = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.rate, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _admit(self, deadline, run):
+        """
+        Take a slot and a token for `run` (this scheduler or a child) if
+        both are free and return None, otherwise return (seconds to wait,
+        whether a _release may end the wait early). Called with _cond held.
+        """
+        cancel_event = run.cancel_event
+        if cancel_event is not None and cancel_event.is_set():
+            raise Cancelled()
+        now = time.monotonic()
+        self._refill(now)
+        known_wait = True
+        if now < self.pause_until:
+            wait = self.pause_until - now
+        elif self.in_flight >= int(self.limit):
+            wait = 0.5  # woken early by _release
+            known_wait = False
+        elif self.tokens < 1:
+            wait = (1 - self.tokens) / self.rate
+        else:
+            self.tokens -= 1
+            self.in_flight += 1
+            self.calls += 1
+            if run is not self:
+                run.calls += 1
+            return None
+        if deadline is not None and (now >= deadline or (known_wait and now + wait > deadline)):
+            raise DeadlineExceeded()
+        if cancel_event is not None:
+            wait = min(wait, CANCEL_POLL)
+        return wait, not known_wait
+
+    def _acquire(self, deadline, run):
+        with self._cond:
+            while True:
+                wait = self._admit(deadline, run)
+                if wait is None:
+                    return
+                self._cond.wait(timeout=wait[0])
+
+    async def _acquire_async(self, deadline, run):
+        # Imported here so that runs on the thread backend never load asyncio
+        import asyncio
+        while True:
+            with self._cond:
+                wait = self._admit(deadline, run)
+            if wait is None:
+                return
+            seconds, slot_wait = wait
+            await asyncio.sleep(min(seconds, ASYNC_SLOT_POLL) if slot_wait else seconds)
+
+    def _release(self, run, latency=None, retry_after=None):
+        with self._cond:
+            self.in_flight -= 1
+            if retry_after is not None:
+                # Multiplicative decrease and a global pause for every worker
+                self.throttled += 1
+                if run is not self:
+                    run.throttled += 1
+                now = time.monotonic()
+                resume = now + retry_after
+                metrics.incr("rate_limited_total")
+                # Calls already in flight when the first 429 arrived come back throttled
+                # too; they belong to the same event and don't halve the limits again
+                new_event = now >= self.pause_until
+                if resume > self.pause_until:
+                    paused = resume - max(self.pause_until, now)
+                    self.throttle_seconds += paused
+                    if run is not self:
+                        run.throttle_seconds += paused
+                    metrics.incr("retry_after_seconds_total", paused)
+                    self.pause_until = resume
+                if new_event:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = 0
+            elif latency is not None and latency > self.target_latency:
+                self.limit = max(self.min_concurrency, self.limit * 0.9)
+            elif latency is not None:
+                # Additive increase while the API keeps up
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self.rate = min(self.max_rate, self.rate + 0.1)
+            self._cond.notify_all()
+
+    def call(self, fn, *args, deadline=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) once the scheduler allows it, retrying after
+        a 429. `deadline` is a time.monotonic() value after which
+        DeadlineExceeded is raised instead of waiting any longer.
+        """
+        gate = self._gate
+        while True:
+            gate._acquire(deadline, self)
+            metrics.record_call(fn)
+            start = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                retry_after = retry_after_seconds(e)
+                if retry_after is None:
+                    gate._release(self)
+                    raise
+                gate._release(self, retry_after=retry_after)
+                print(f"⚠️ Rate limited. Pausing all requests for {retry_after:.0f}s...")
+                continue
+            except BaseException:
+                # e.g. KeyboardInterrupt: free the slot so other workers aren't left waiting on it
+                gate._release(self)
+                raise
+            gate._release(self, latency=time.monotonic() - start)
+            return result
+
+    async def call_async(self, fn, *args, deadline=None, **kwargs):
+        """
+        call() for coroutines: await fn(*args, **kwargs) under the same
+        limits, waiting on the event loop instead of blocking its thread.
+        Threads and coroutines can share one scheduler.
+        """
+        gate = self._gate
+        while True:
+            await gate._acquire_async(deadline, self)
+            metrics.record_call(fn)
+            start = time.monotonic()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                retry_after = retry_after_seconds(e)
+                if retry_after is None:
+                    gate._release(self)
+                    raise
+                gate._release(self, retry_after=retry_after)
+                print(f"⚠️ Rate limited. Pausing all requests for {retry_after:.0f}s...")
+                continue
+            except BaseException:
+                # e.g. the task was cancelled: free the slot for the other callers
+                gate._release(self)
+                raise
+            gate._release(self, latency=time.monotonic() - start)
+            return result
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_scheduler():
+    """
+    Return the process-wide scheduler whose limits every run and the
+    background miss retrier draw from (as its children).
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = RequestScheduler(max_concurrency=SHARED_MAX_CONCURRENCY)
+        return _shared
@@ -0,0 +1,101 @@
+import contextlib
+import os
+import threading
+
+from components import script
+from components.cache import TrackCache
+from components.metrics import registry as metrics
+from components.ratelimit import Cancelled
+
+# Background pass over the track cache's `misses` table: tracks no search
+# could find are searched again once their re-check time comes. The searches
+# go through the same shared scheduler as the runs, so they come out of one
+# API budget and pause with everything else on a 429, and are spaced out so
+# they only take a small share of it. A track found this way is cached, so
+# the next sync of its playlist picks it up.
+
+# Set TRACKSWAP_RETRY_MISSES=0 to never re-check misses in the background
+RETRY_MISSES = os.getenv("TRACKSWAP_RETRY_MISSES", "1") != "0"
+
+RETRY_RATE = 1.0  # searches per second, at most
+BATCH_SIZE = 50
+STOP_TIMEOUT = 5  # seconds to wait for an in-flight search when stopping
+
+class MissRetrier(threading.Thread):
+    """
+    Re-searches due misses one at a time until none are left or stop()
+    is called.
+    """
+
+    def __init__(self, rate=RETRY_RATE):
+        super().__init__(name="miss-retrier", daemon=True)
+        self.rate = rate
+        self.retried = 0
+        self.recovered = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        cache = TrackCache()
+        try:
+            due = cache.due_misses(BATCH_SIZE)
+            if not due:
+                return
+            # Only now, so a run with nothing due never authenticates just for this
+            sp, scheduler = script.create_client(self._stop_event)
+            while due and not self._stop_event.is_set():
+                for track, raw_track, raw_artist in due:
+                    if self._stop_event.wait(1 / self.rate):
+                        return
+                    found, uri, _, _ = script.search_track(sp, scheduler, raw_track, track, raw_artist)
+                    if found is None:
+                        return  # the API is failing; leave the rest for the next pass
+                    self.retried += 1
+                    metrics.incr("miss_retries_total")
+                    if found:
+                        cache.put(track, raw_artist, uri)
+                        self.recovered += 1
+                        metrics.incr("miss_recovered_total")
+                    else:
+                        cache.put_miss(track, raw_artist, raw_track, raw_artist, wanted=False)
+                due = cache.due_misses(BATCH_SIZE)
+        except Cancelled:
+            pass  # stopped while waiting for the shared scheduler
+        finally:
+            cache.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(STOP_TIMEOUT)
+        if self.retried:
+            print(f"🔎 Re-checked {self.retried} tracks not found in earlier runs; "
+                  f"{self.recovered} found and cached for their next sync.")
+
+_retrier = None
+_users = 0
+_retrier_lock = threading.Lock()
+
+@contextlib.contextmanager
+def background(rate=RETRY_RATE):
+    """
+    Re-check due misses in the background for the duration of the block.
+    Overlapping runs (e.g. concurrent GUI jobs) share one retrier, stopped
+    when the last of them ends.
+    """
+    global _retrier, _users
+    if not RETRY_MISSES:
+        yield None
+        return
+    with _retrier_lock:
+        if _users == 0:
+            _retrier = MissRetrier(rate)
+            _retrier.start()
+        _users += 1
+        retrier = _retrier
+    try:
+        yield retrier
+    finally:
+        with _retrier_lock:
+            _users -= 1
+            if _users == 0:
+                retrier.stop()
+                _retrier = None
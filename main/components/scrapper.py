@@ -1,35 +1,263 @@
-import pyautogui
-import pyperclip
 import time
 import subprocess
 import os
-import sys
+import re
 import platform
+import threading
 
-# Determine OS-specific modifier key
-if platform.system() == "Darwin":
-    modifier = "command"
-    chrome_path = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-elif platform.system() == "Windows":
-    modifier = "ctrl"
-    chrome_path = "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
-else:
-    print("❌ Unsupported operating system.")
-    sys.exit(1)
+from components.cleaner import PlaylistParser
+from components.metrics import registry as metrics
+
+class ScrapeError(RuntimeError):
+    """
+    Raised when the GUI scraper can't run here, e.g. no supported OS or no
+    Chrome. Callers report it like any other failed playlist.
+    """
+
+def platform_settings():
+    """
+    Return (modifier key, Chrome path) for the current OS.
+    """
+    if platform.system() == "Darwin":
+        return "command", "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+    elif platform.system() == "Windows":
+        return "ctrl", "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
+    else:
+        raise ScrapeError("Unsupported operating system. Use the HTTP scraper backend "
+                          "(TRACKSWAP_SCRAPER=http) instead.")
 
 # Folder setup
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SCRAPE_FOLDER = os.path.join(BASE_DIR, "music_data")
-os.makedirs(SCRAPE_FOLDER, exist_ok=True)
 
 RAW_TEXT_FILE = os.path.join(SCRAPE_FOLDER, "amazon_playlist_raw.txt")
 
-def open_incognito_chrome(url):
+# The browser and clipboard are shared by the whole desktop, so only one capture runs at a time
+CAPTURE_LOCK = threading.Lock()
+
+# "scroll" copies the page chunk by chunk while scrolling down, which is needed
+# once a playlist is longer than the rows the page renders at once; "snapshot"
+# is a single copy after a fixed wait
+CAPTURE_MODE = os.getenv("TRACKSWAP_CAPTURE", "scroll")
+
+PAGE_LOAD_WAIT = 20       # seconds before the single copy in snapshot mode
+PAGE_LOAD_TIMEOUT = 30    # seconds to wait for the first rows in scroll mode
+POLL_INTERVAL = 1.0       # seconds between copies while waiting for rows
+COPY_DELAY = 0.3          # seconds for a keystroke to reach the page or clipboard
+SCROLL_STEP = 10          # mouse wheel clicks per chunk to start with
+MIN_SCROLL_STEP = 2
+MAX_SCROLL_STEP = 40
+STALE_CHUNKS = 3          # chunks in a row without new rows before the end is assumed
+
+SONG_COUNT = re.compile(r"^([\d,]+)\s+SONGS?$", re.IGNORECASE)
+
+class ChunkCollector:
+    """
+    Merges overlapping copies of the playlist page, de-duplicating rows by
+    track number. feed() returns the raw lines of rows not seen before:
+    for the first chunk preceded by the page header (so the playlist name
+    stays on line 9), then each new row's lines from its number to its
+    artist.
+    """
+
+    def __init__(self):
+        self.last = 0          # highest track number handed on
+        self.total = None      # song count from the page header, if shown
+        self.rows = 0
+        self.chunks = 0
+        self.new = 0           # rows in the latest chunk not seen before
+        self.overlap = 0       # rows in the latest chunk that were already handed on
+        self.gap = 0           # rows missing between the last one handed on and the latest chunk
+        self.first_visible = 1  # lowest row in the latest chunk; scrolling down never shows rows above it
+        self._header = None    # page lines above track 1, handed on with the first chunk
+
+    @property
+    def complete(self):
+        return self.total is not None and self.last >= self.total
+
+    def _blocks(self, raw_lines):
+        """
+        Return (header_end, [(number, first line, last line)]) for the
+        complete rows in one copy of the page.
+        """
+        # Only the first copy is known to start at track 1
+        if self.rows:
+            parser = PlaylistParser(first_number=None, floor=self.first_visible)
+        else:
+            parser = PlaylistParser()
+        blocks = []
+        # The page chrome above the list is the same in every copy; skip it so a
+        # number in it (a year, a follower count) isn't taken for a row
+        skip = 0
+        if self._header is not None:
+            for header_line, line in zip(self._header, raw_lines):
+                if header_line != line:
+                    break
+                skip += 1
+        for idx, line in enumerate(raw_lines[skip:], start=skip):
+            line = line.strip()
+            if not line:
+                continue
+            if self.total is None:
+                match = SONG_COUNT.match(line)
+                if match:
+                    self.total = int(match.group(1).replace(",", ""))
+            if parser.state == PlaylistParser.SEEK and not line.isdigit():
+                continue
+            restarts = parser.report.restarts
+            record = parser.feed(line, idx)
+            if record:
+                if parser.report.restarts > restarts:
+                    # What came before was a stray number in the page chrome, not rows
+                    blocks = []
+                blocks.append((int(record[0]), parser.start_line, idx))
+        header_end = blocks[0][1] if blocks else len(raw_lines)
+        if self.total is not None:
+            blocks = [block for block in blocks if block[0] <= self.total]
+        return header_end, blocks
+
+    def feed(self, text, allow_gap=True):
+        """
+        Return the raw lines of the rows in `text` that are new. If rows
+        are missing before them and `allow_gap` is False, nothing is taken
+        and None is returned, so the caller can scroll back and copy again.
+        """
+        raw_lines = text.splitlines()
+        header_end, blocks = self._blocks(raw_lines)
+        if blocks:
+            self.first_visible = blocks[0][0]
+        new = [block for block in blocks if block[0] > self.last]
+        self.new = len(new)
+        self.overlap = len(blocks) - len(new)
+        self.gap = new[0][0] - self.last - 1 if new and self.last else 0
+        if self.gap > 0 and not allow_gap:
+            return None
+        lines = []
+        if self._header is None and blocks:
+            self._header = raw_lines[:header_end]
+            lines.extend(self._header)
+        for number, start, end in new:
+            lines.extend(raw_lines[start:end + 1])
+        if new:
+            self.last = new[-1][0]
+            self.rows += len(new)
+        self.chunks += 1
+        return lines
+
+def open_incognito_chrome(url, chrome_path):
     try:
         subprocess.Popen([chrome_path, "--incognito", url])
     except FileNotFoundError:
-        print("❌ Chrome not found at the specified path.")
-        sys.exit(1)
+        raise ScrapeError(f"Chrome not found at '{chrome_path}'.") from None
+
+def copy_page(pyautogui, pyperclip, modifier):
+    pyautogui.hotkey(modifier, "a")
+    time.sleep(COPY_DELAY)
+    pyautogui.hotkey(modifier, "c")
+    time.sleep(COPY_DELAY)
+    return pyperclip.paste()
+
+def capture_raw_text(playlist_url):
+    """
+    Open the playlist in Chrome and return the page text copied via the
+    clipboard in one go (snapshot mode).
+    """
+    modifier, chrome_path = platform_settings()
+    # GUI automation needs a desktop session, so it is only loaded when used
+    import pyautogui
+    import pyperclip
+
+    with CAPTURE_LOCK, metrics.stage("scrape"):
+        print(f"🌐 Opening playlist in incognito Chrome: {playlist_url}")
+        open_incognito_chrome(playlist_url, chrome_path)
+        time.sleep(PAGE_LOAD_WAIT)  # Let page load
+
+        print("⌨️ Copying playlist content...")
+        pyautogui.hotkey(modifier, "a")
+        time.sleep(1)
+        pyautogui.hotkey(modifier, "c")
+        time.sleep(1)
+
+        print("🔒 Closing browser tab and switching to VSCode...")
+        pyautogui.hotkey(modifier, "w")
+        time.sleep(1)
+
+        return pyperclip.paste()
+
+def scroll_capture(playlist_url):
+    """
+    Open the playlist in Chrome and yield its raw lines chunk by chunk:
+    copy the rendered rows, hand on the new ones, scroll down and repeat
+    until the page's song count is reached or scrolling stops bringing
+    new rows. The scroll step shrinks when rows were skipped and grows
+    while chunks mostly repeat rows already seen.
+    """
+    modifier, chrome_path = platform_settings()
+    # GUI automation needs a desktop session, so it is only loaded when used
+    import pyautogui
+    import pyperclip
+
+    with CAPTURE_LOCK:
+        start = time.monotonic()
+        collector = ChunkCollector()
+        print(f"🌐 Opening playlist in incognito Chrome: {playlist_url}")
+        with metrics.stage("scrape"):
+            open_incognito_chrome(playlist_url, chrome_path)
+            # Poll until the first rows are rendered instead of always waiting out the slowest load
+            deadline = time.monotonic() + PAGE_LOAD_TIMEOUT
+            while True:
+                time.sleep(POLL_INTERVAL)
+                lines = collector.feed(copy_page(pyautogui, pyperclip, modifier))
+                if collector.rows or time.monotonic() >= deadline:
+                    break
+            # Wheel events go to the element under the pointer: the track list
+            width, height = pyautogui.size()
+            pyautogui.moveTo(width // 2, height * 2 // 3)
+        try:
+            if not collector.rows:
+                print(f"⚠️ No tracks appeared within {PAGE_LOAD_TIMEOUT}s.")
+                yield from lines
+                return
+            print("📜 Scrolling through the playlist...")
+            yield from lines
+            step = SCROLL_STEP
+            stale = 0
+            while not collector.complete and stale < STALE_CHUNKS:
+                with metrics.stage("scrape"):
+                    pyautogui.scroll(-step)
+                    text = copy_page(pyautogui, pyperclip, modifier)
+                    lines = collector.feed(text, allow_gap=step <= MIN_SCROLL_STEP)
+                    if lines is None:
+                        # Scrolled past rows that were never rendered: go back and take smaller steps
+                        pyautogui.scroll(step)
+                        step = max(MIN_SCROLL_STEP, step // 2)
+                        continue
+                metrics.incr("scrape_chunks_total")
+                if not lines:
+                    stale += 1
+                    time.sleep(POLL_INTERVAL)  # more rows may still be loading
+                    continue
+                stale = 0
+                if collector.overlap > collector.new:
+                    # Mostly rows already seen: cover more of the list per chunk
+                    step = min(MAX_SCROLL_STEP, step * 2)
+                yield from lines
+        finally:
+            print("🔒 Closing browser tab...")
+            pyautogui.hotkey(modifier, "w")
+            summary = f"📜 Captured {collector.rows} rows in {collector.chunks} chunks"
+            print(f"{summary} ({time.monotonic() - start:.0f}s).")
+            if collector.total is not None and collector.last < collector.total:
+                print(f"⚠️ The page lists {collector.total} songs but only rows up to {collector.last} appeared.")
+
+def iter_raw_lines(playlist_url):
+    """
+    Yield the raw lines of the captured playlist page, for the streaming pipeline.
+    """
+    if CAPTURE_MODE == "snapshot":
+        yield from capture_raw_text(playlist_url).splitlines()
+    else:
+        yield from scroll_capture(playlist_url)
 
 def main(playlist_url=None):
     """
@@ -39,21 +267,8 @@ def main(playlist_url=None):
     if not playlist_url:
         playlist_url = input("🔗 Paste your Amazon Music playlist URL: ").strip()
 
-    print(f"🌐 Opening playlist in incognito Chrome: {playlist_url}")
-    open_incognito_chrome(playlist_url)
-    time.sleep(20)  # Let page load
-
-    print("⌨️ Copying playlist content...")
-    pyautogui.hotkey(modifier, "a")
-    time.sleep(1)
-    pyautogui.hotkey(modifier, "c")
-    time.sleep(1)
-
-    print("🔒 Closing browser tab and switching to VSCode...")
-    pyautogui.hotkey(modifier, "w")
-    time.sleep(1)
-
-    raw_text = pyperclip.paste()
+    raw_text = "\n".join(iter_raw_lines(playlist_url))
+    os.makedirs(SCRAPE_FOLDER, exist_ok=True)
     with open(RAW_TEXT_FILE, "w", encoding="utf-8") as f:
         f.write(raw_text)
     print(f"📝 Raw text saved to {RAW_TEXT_FILE}")
@@ -1,247 +1,557 @@
-import pandas as pd
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-from dotenv import load_dotenv
 import os
 import re
+import csv
 import time
-import random
-import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from requests.exceptions import HTTPError
-import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
-
-def main():
-    # Enable logging
-    logging.basicConfig(level=logging.INFO)
-
-    # Load environment variables
-    load_dotenv()
-
-    # Spotify authentication with retry-capable session
-    scope = "playlist-modify-public"
-    session = requests.Session()
-    retries = Retry(
-        total=5,
-        backoff_factor=2,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["HEAD", "GET", "OPTIONS", "POST"]
-    )
-    adapter = HTTPAdapter(max_retries=retries)
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
-
-    sp = spotipy.Spotify(auth_manager=SpotifyOAuth(scope=scope), requests_session=session)
-
-    # Extract playlist name from line 9 of the raw Amazon file
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    raw_file_path = os.path.join(BASE_DIR, "music_data", "amazon_playlist_raw.txt")
-
-    try:
-        with open(raw_file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            playlist_name = lines[8].strip() if len(lines) >= 9 else "Converted from Amazon Music"
-    except Exception as e:
-        print(f"⚠️ Could not read playlist name from file: {e}")
-        playlist_name = "Converted from Amazon Music"
-
-    if not playlist_name:
-        playlist_name = "Converted from Amazon Music"
-
-    def sanitize_filename(name):
-        return re.sub(r'[^\w\-_. ]', '_', name)
-
-    # Read CSV
-    csv_path = os.path.join(BASE_DIR, "music_data", "amazon_playlist.csv")
-    df = pd.read_csv(csv_path)
-
-    # Create or update playlist
-    user_id = sp.current_user()["id"]
-
-    # Check if playlist with the same name exists
-    existing_playlists = []
-    limit = 50
-    offset = 0
-    while True:
-        playlists = sp.current_user_playlists(limit=limit, offset=offset)
-        existing_playlists.extend(playlists['items'])
-        if playlists['next']:
-            offset += limit
-        else:
-            break
-
-    matched_playlist = None
-    for p in existing_playlists:
-        if p['name'].lower() == playlist_name.lower():
-            matched_playlist = p
-            break
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from components.cache import TrackCache
+from components import fuzzy_index
+from components.catalog import get_catalog
+from components.journal import open_journal
+from components.matcher import CandidateRanking, MatchStats, candidate_queries, SEARCH_LIMIT
+from components.metrics import registry as metrics
+from components.normalize import clean_track_name, clean_track_column
+from components.playlist_sync import sync_playlist
+from components.ratelimit import Cancelled, RequestScheduler, DeadlineExceeded, shared_scheduler
+
+# Time budget for resolving a single track, including waits imposed by rate limiting
+TRACK_DEADLINE = 90
+
+# "threads" (default) or "async"; the async backend needs aiohttp
+SEARCH_BACKEND = os.getenv("TRACKSWAP_SEARCH_BACKEND", "threads")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_TEXT_FILE = os.path.join(BASE_DIR, "music_data", "amazon_playlist_raw.txt")
+CLEAN_CSV_FILE = os.path.join(BASE_DIR, "music_data", "amazon_playlist.csv")
+DEFAULT_PLAYLIST_NAME = "Converted from Amazon Music"
+
+# Spotify accepts at most 100 tracks per add call
+ADD_BATCH_SIZE = 100
+
+# Search threads of the thread backend; the scheduler may allow more calls in flight
+SEARCH_THREADS = 8
+
+# Searches queued per search thread before reading more of the source waits for one to finish
+SEARCHES_PER_WORKER = 4
+
+def sanitize_filename(name):
+    return re.sub(r'[^\w\-_. ]', '_', name)
+
+def create_client(cancel_event=None):
+    """
+    Return the shared Spotify client (see client.py) and a RequestScheduler
+    for this run, which stops making calls once `cancel_event` is set.
+    Every run's scheduler draws from the same shared_scheduler() budget.
+    """
+    # Imported here so that scraping, cleaning and --help don't pay for spotipy
+    from components.client import get_client
+    return get_client(), RequestScheduler(cancel_event=cancel_event, parent=shared_scheduler())
+
+def access_token(sp):
+    """
+    Return the bearer token the spotipy client authenticates with.
+    """
+    if sp.auth_manager is not None:
+        return sp.auth_manager.get_access_token(as_dict=False)
+    return sp._auth
+
+@metrics.timed("playlist")
+def find_or_create_playlist(sp, playlist_name, scheduler=None):
+    """
+    Return (playlist_id, update_existing) for the target playlist, asking
+    whether to update a playlist that already has the same name. API calls
+    go through `scheduler` when one is given.
+    """
+    user_id = sp.current_user_id(scheduler)
+
+    # Check if playlist with the same name exists, using the local playlist index
+    catalog = get_catalog()
+    matched_playlist = catalog.lookup(sp, user_id, playlist_name, scheduler=scheduler)
 
     if matched_playlist:
         answer = input(f"Playlist named '{playlist_name}' already exists. Update existing playlist? [y/n]: ").strip().lower()
         if answer == 'y':
-            playlist_id = matched_playlist['id']
-            # Clear existing tracks
-            print(f"🗑️ Clearing existing tracks from playlist '{playlist_name}'...")
-            # Spotify API does not provide a direct clear endpoint,
-            # so we remove all tracks in batches
-            while True:
-                current_tracks = sp.playlist_tracks(playlist_id, fields="items(track(uri)),next", limit=100)
-                uris_to_remove = [item['track']['uri'] for item in current_tracks['items'] if item['track']]
-                if not uris_to_remove:
-                    break
-                sp.playlist_remove_all_occurrences_of_items(playlist_id, uris_to_remove)
-            print("✅ Playlist cleared.")
-        else:
-            # Create new playlist with same name
-            playlist = sp.user_playlist_create(user=user_id, name=playlist_name, public=True)
-            playlist_id = playlist["id"]
-    else:
-        # Create new playlist as usual
-        playlist = sp.user_playlist_create(user=user_id, name=playlist_name, public=True)
-        playlist_id = playlist["id"]
-
-
-    def clean_track_name(name):
-        name = re.sub(r"\s*\([^)]*\)", "", name)  # remove (parentheses)
-        name = re.sub(r"\s*\[[^]]*\]", "", name)  # remove [brackets]
-        name = re.sub(r"(?i)(Original Motion Picture Soundtrack|From.*Album)", "", name)
-        return name.lower().strip()
+            # Existing tracks are left in place and diffed against the new list once searching is done
+            return matched_playlist['id'], True
 
-    def clean_artist_name(name):
-        return re.sub(r"(?i)( - topic|official|music|audio)", "", name.lower()).strip()
-
-    def expand_artists(artist):
-        parts = re.split(r",|&|feat\.|Feat\.|featuring|Featuring", artist)
-        return [clean_artist_name(p) for p in parts if p.strip()]
+    # Create new playlist (possibly with the same name as an existing one)
+    create = sp.user_playlist_create
+    if scheduler is not None:
+        playlist = scheduler.call(create, user=user_id, name=playlist_name, public=True)
+    else:
+        playlist = create(user=user_id, name=playlist_name, public=True)
+    catalog.add(playlist)
+    return playlist["id"], False
+
+def search_track(sp, scheduler, raw_track, clean_track, artist, stats=None):
+    """
+    Fetch a wide candidate set with as few queries as possible and pick the
+    best-scoring match, stopping as soon as one is confident enough.
+    Returns (found, uri, raw_track, artist); found is None rather than False
+    when a search failed before any match turned up.
+    """
+    start = time.monotonic()
+    deadline = start + TRACK_DEADLINE
+    ranking = CandidateRanking(raw_track, clean_track, artist)
+    calls = 0
+    failed = False
+    for query in candidate_queries(clean_track, artist):
+        try:
+            results = scheduler.call(sp.search, q=query, type="track", limit=SEARCH_LIMIT, deadline=deadline)
+            calls += 1
+            ranking.add(results["tracks"]["items"])
+            if ranking.confident:
+                break
+        except DeadlineExceeded:
+            print(f"⏱️ Gave up on {raw_track} after {TRACK_DEADLINE}s.")
+            failed = True
+            break
+        except Cancelled:
+            raise
+        except Exception as e:
+            print(f"❌ Error searching {raw_track}: {e}")
+            failed = True
+            break
+    uri = ranking.result()
+    metrics.observe("track_resolve_seconds", time.monotonic() - start)
+    if stats is not None:
+        stats.record(calls, uri is not None)
+    return (uri is not None or (None if failed else False), uri, raw_track, artist)
 
-    UNWANTED_KEYWORDS = [
-        "remix", "lofi", "lo-fi", "chill", "version", "cover", "mix", "edit",
-        "acoustic", "reverb", "slowed", "speedup", "sped up", "nightcore", "karaoke", "reprise"
-    ]
+def safe_add_items(sp, scheduler, playlist_id, items):
+    try:
+        scheduler.call(sp.playlist_add_items, playlist_id, items)
+        return True
+    except Cancelled:
+        raise
+    except Exception as e:
+        print(f"❌ Unexpected error adding items: {e}")
+        return False
 
-    def normalize_text(s):
+class OrderedUploader:
+    """
+    Adds tracks to a new playlist while searching is still going on.
+    Results may arrive in any order; a batch is written as soon as every
+    track before it has been resolved, so the playlist keeps the source
+    order. Writes go through one worker thread, one batch at a time.
+    """
+
+    def __init__(self, sp, scheduler, playlist_id, journal=None):
+        self.sp = sp
+        self.scheduler = scheduler
+        self.playlist_id = playlist_id
+        self.journal = journal
+        # URIs added by an interrupted run; they are checked, not added again
+        committed = journal.committed_uris() if journal and journal.batches else []
+        # Batches with a gap between them: nothing is added here and write_playlist syncs instead
+        self.diverged = committed is None
+        self.committed = committed or []
+        self.complete = True
+        self.added = 0
+        self._results = {}  # source index -> URI or None, for indices past the frontier
+        self._frontier = 0  # every source index below this has been handed on
+        self._position = 0  # playlist position of the next URI handed on
+        self._pending = []
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self._writes = []
+        if self.committed:
+            print(f"📒 {len(self.committed)} tracks were already added by the interrupted run.")
+        print("🎧 Adding tracks to playlist as they are found...")
+
+    def resolve(self, idx, uri):
         """
-        Lowercase, remove punctuation except spaces, and collapse multiple spaces.
+        Record the outcome for source index `idx` (None if not found) and
+        queue every batch that is now complete.
         """
-        s = s.lower()
-        s = re.sub(r"[^\w\s]", " ", s)  # replace punctuation with space
-        s = re.sub(r"\s+", " ", s)      # collapse spaces
-        return s.strip()
-
-    def is_unwanted_version(track_name, raw_track):
+        with self._lock:
+            self._results[idx] = uri
+            while self._frontier in self._results:
+                uri = self._results.pop(self._frontier)
+                self._frontier += 1
+                if uri:
+                    self._take(uri)
+
+    def _take(self, uri):
+        position = self._position
+        self._position += 1
+        if position < len(self.committed):
+            if self.committed[position] != uri:
+                self.diverged = True
+        elif not self.diverged:
+            self._pending.append(uri)
+            if len(self._pending) == ADD_BATCH_SIZE:
+                self._submit()
+
+    def _submit(self):
+        start = self._position - len(self._pending)
+        batch, self._pending = self._pending, []
+        self._writes.append(self._writer.submit(self._add, start, batch))
+
+    def _add(self, start, batch):
+        if not safe_add_items(self.sp, self.scheduler, self.playlist_id, batch):
+            self.complete = False
+            return
+        self.added += len(batch)
+        if self.journal:
+            self.journal.record_batch(start, batch)
+
+    def close(self, flush=True):
         """
-        Return True if track_name looks like an unwanted variant
-        BUT allow if the original/raw track explicitly mentions the same keyword
-        (punctuation/spacing differences ignored).
+        Write the last partial batch (unless `flush` is False, when the run
+        is being aborted), wait for every write and return whether they all
+        succeeded. Check `diverged` afterwards: if set, the interrupted
+        run's writes don't match and nothing was added.
         """
-        norm_name = normalize_text(track_name)
-        norm_raw = normalize_text(raw_track)
-        for bad in UNWANTED_KEYWORDS:
-            bad_norm = normalize_text(bad)
-            if bad_norm in norm_name and bad_norm not in norm_raw:
-                return True
-        return False
-
-    def search_track(raw_track, clean_track, artist):
-        clean_track = clean_track.lower()
-        artist_variants = expand_artists(artist)
-        query_variants = [
-            f"track:{clean_track} artist:{artist}",
-            f"{clean_track} {artist}",
-            f"{clean_track}",
-            f"{clean_track.split('-')[0].strip()} {artist}"
-        ]
-        for alt_artist in artist_variants:
-            query_variants.append(f"track:{clean_track} artist:{alt_artist}")
-            query_variants.append(f"{clean_track} {alt_artist}")
-
-        for query in query_variants:
-            try:
-                results = sp.search(q=query, type="track", limit=5)
-                time.sleep(random.uniform(0.1, 0.3))  # throttle
-                items = results["tracks"]["items"]
-                for item in items:
-                    if not is_unwanted_version(item["name"], raw_track):
-                        return (True, item["uri"], raw_track, artist)
-            except HTTPError as e:
-                if e.response.status_code == 429:
-                    retry_after = int(e.response.headers.get("Retry-After", 1))
-                    print(f"⚠️ Rate limited. Retrying in {retry_after}s for: {raw_track}...")
-                    time.sleep(retry_after + random.uniform(0.5, 1.5))
-                else:
-                    break
-            except Exception as e:
-                print(f"❌ Error searching {raw_track}: {e}")
-                break
-        return (False, None, raw_track, artist)
-
-    def safe_add_items(sp, playlist_id, items):
-        retries = 3
-        while retries > 0:
-            try:
-                sp.playlist_add_items(playlist_id, items)
-                return
-            except HTTPError as e:
-                if e.response.status_code == 429:
-                    retry_after = int(e.response.headers.get("Retry-After", 1))
-                    print(f"⚠️ Rate limited while adding items. Retrying in {retry_after}s...")
-                    time.sleep(retry_after + random.uniform(0.5, 1.5))
-                    retries -= 1
-                else:
-                    raise
-            except Exception as e:
-                print(f"❌ Unexpected error adding items: {e}")
-                break
-
-    # Prepare search inputs
-    queries = []
-    for _, row in df.iterrows():
-        raw_track = str(row["Title"]).strip()
-        clean_track = clean_track_name(raw_track)
-        artist = str(row["Artist"]).strip()
-        queries.append((raw_track, clean_track, artist))
+        with self._lock:
+            if self._position < len(self.committed):
+                self.diverged = True
+            if flush and self._pending and not self.diverged:
+                self._submit()
+        self._writer.shutdown(wait=True)
+        for write in self._writes:
+            write.result()  # re-raise an interrupt that hit the writer
+        return self.complete
+
+def write_not_found(playlist_name, not_found):
+    folder = "not_found_songs"
+    os.makedirs(folder, exist_ok=True)
+    safe_name = sanitize_filename(playlist_name)
+    not_found_file = os.path.join(folder, f"{safe_name}_tracks_not_found.txt")
+
+    with open(not_found_file, "w", encoding="utf-8") as f:
+        for line in not_found:
+            f.write(line + "\n")
+
+    print(f"📄 Not-found songs saved to '{not_found_file}'")
+
+def prepare_query(title, artist):
+    raw_track = str(title).strip()
+    return (raw_track, clean_track_name(raw_track), str(artist).strip())
+
+def prepare_queries(tracks):
+    """
+    prepare_query for a whole list of (number, title, artist) records at once.
+    """
+    raw_tracks = [str(title).strip() for _, title, _ in tracks]
+    clean_tracks = clean_track_column(raw_tracks)
+    return [
+        (raw_track, clean_track, str(artist).strip())
+        for raw_track, clean_track, (_, _, artist) in zip(raw_tracks, clean_tracks, tracks)
+    ]
 
-    track_uris = []
+@metrics.timed("resolve")
+def resolve_tracks(sp, scheduler, queries, backend=None, journal=None, on_resolved=None, progress=None):
+    """
+    Resolve (raw_track, clean_track, artist) queries, answering from the run
+    journal, the track cache and the fuzzy index first. Tracks searched in
+    vain before are skipped until their re-check is due. `queries` may be a
+    generator: with the thread backend each query is searched as soon as it
+    arrives.
+    Every search result is recorded in `journal` (a RunJournal) as it comes in,
+    and on_resolved(index, uri or None) is called as each query is settled.
+    progress(settled, total) is called whenever either count changes; the
+    total grows while `queries` is still being read.
+    Returns (queries, resolved, not_found) where resolved[i] is the URI for
+    queries[i] or None.
+    """
+    backend = backend or SEARCH_BACKEND
+
+    # Results are kept by source position so the playlist follows the source order
+    prepared = []
+    resolved = []
     not_found = []
 
-    # Search tracks with controlled concurrency
+    # Answer previously resolved tracks from the on-disk cache before any network call
+    cache = TrackCache()
+    stats = MatchStats()
+    # Then from known tracks spelled slightly differently
+    index = fuzzy_index.get_index(cache) if fuzzy_index.FUZZY_LOOKUP else None
+    matched_locally = []
+    skipped_misses = 0
+
+    journaled = 0
+    settled = 0
+
+    def settle(idx, uri):
+        nonlocal settled
+        settled += 1
+        if on_resolved:
+            on_resolved(idx, uri)
+        if progress:
+            progress(settled, len(prepared))
+
+    def prepare(query):
+        """
+        Queue the query and return its index if it still needs a search, else None.
+        """
+        nonlocal journaled, skipped_misses
+        prepared.append(query)
+        known, uri = journal.lookup_track(query[1], query[2]) if journal else (False, None)
+        idx = len(prepared) - 1
+        if known:
+            journaled += 1
+            resolved.append(uri)
+            if uri is None:
+                not_found.append(f"{query[0]} by {query[2]}")
+        else:
+            uri = cache.get(query[1], query[2])
+            if uri is None and index is not None:
+                uri = index.lookup(*query)
+                if uri:
+                    matched_locally.append(idx)
+            resolved.append(uri)
+            if uri is None:
+                if not cache.known_miss(query[1], query[2]):
+                    return idx
+                # Searched in vain before, and not due for another try yet
+                skipped_misses += 1
+                not_found.append(f"{query[0]} by {query[2]}")
+        settle(idx, resolved[-1])
+        return None
+
+    def record(idx, result):
+        # Failed searches are left out so a resumed run tries them again
+        if journal and result[0] is not None:
+            journal.record_track(prepared[idx][1], prepared[idx][2], result[1])
+        settle(idx, result[1] if result[0] else None)
+
     print("🔍 Searching for tracks on Spotify...")
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        future_to_query = {executor.submit(search_track, *q): q for q in queries}
-        for future in as_completed(future_to_query):
-            found, uri, raw_track, artist = future.result()
-            if found:
-                track_uris.append(uri)
-            else:
-                not_found.append(f"{raw_track} by {artist}")
-
-    # Add found tracks to the playlist in batches
-    print(f"🎧 Adding {len(track_uris)} tracks to playlist...")
-    for i in range(0, len(track_uris), 100):
-        safe_add_items(sp, playlist_id, track_uris[i:i + 100])
+    if backend == "async":
+        from components import async_search
+        to_search = [idx for idx in map(prepare, queries) if idx is not None]
+        results = zip(to_search, async_search.search_tracks(
+            [prepared[idx] for idx in to_search], scheduler, lambda: access_token(sp),
+            base_url=sp.prefix.rstrip("/"), stats=stats, on_result=lambda i, result: record(to_search[i], result),
+        ))
+    else:
+        # Results are recorded (journal, uploader) while the source is still being read,
+        # e.g. while the scroll capture is still scrolling
+        results = []
+        future_to_idx = {}
+        finished = queue.SimpleQueue()
+        workers = min(SEARCH_THREADS, scheduler.max_concurrency)
+        max_in_flight = workers * SEARCHES_PER_WORKER
+
+        def collect():
+            future = finished.get()
+            results.append((future_to_idx.pop(future), future.result()))
+            record(*results[-1])
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for query in queries:
+                idx = prepare(query)
+                if idx is not None:
+                    future = executor.submit(search_track, sp, scheduler, *query, stats=stats)
+                    future_to_idx[future] = idx
+                    future.add_done_callback(finished.put)
+                    if progress:
+                        progress(settled, len(prepared))
+                while future_to_idx and (len(future_to_idx) >= max_in_flight or not finished.empty()):
+                    collect()
+            while future_to_idx:
+                collect()
+    if journaled:
+        print(f"📒 {journaled} tracks restored from the interrupted run.")
+    print(f"💾 {cache.hits} of {len(prepared)} tracks resolved from cache.")
+    metrics.incr("cache_hits_total", cache.hits)
+    metrics.incr("cache_misses_total", cache.misses)
+    if index is not None and len(index):
+        index_stats = index.stats()
+        print(f"🧩 {len(matched_locally)} more matched by the fuzzy index "
+              f"({index_stats['avg_lookup_us']:.0f} µs per lookup, {index_stats['entries']} tracks indexed).")
+        metrics.incr("fuzzy_hits_total", len(matched_locally))
+        # Remembered under this spelling too, so the next run gets an exact cache hit
+        for idx in matched_locally:
+            cache.put(prepared[idx][1], prepared[idx][2], resolved[idx])
+    if skipped_misses:
+        print(f"⏭️ {skipped_misses} tracks not found in earlier runs were skipped until their next re-check.")
+        metrics.incr("misses_skipped_total", skipped_misses)
+    if stats.searched:
+        print(f"🎯 {stats.api_calls} search calls for {stats.searched} tracks "
+              f"({stats.average_calls():.2f} per resolved track).")
+
+    for idx, (found, uri, raw_track, artist) in results:
+        if found:
+            resolved[idx] = uri
+            cache.put(prepared[idx][1], artist, uri)
+            if index is not None:
+                index.add(prepared[idx][1], artist, uri)
+        else:
+            if found is False:
+                cache.put_miss(prepared[idx][1], artist, raw_track, artist)
+            not_found.append(f"{raw_track} by {artist}")
+    cache.close()
+
+    return prepared, resolved, not_found
+
+@metrics.timed("write")
+def write_playlist(sp, scheduler, playlist_id, update_existing, playlist_name, track_uris, journal=None):
+    committed = journal.committed_uris() if journal and journal.batches else []
+    if committed is None or track_uris[:len(committed)] != committed:
+        # The interrupted run wrote something other than a prefix of this list; let the diff fix it
+        print("⚠️ Playlist differs from the interrupted run's writes, syncing instead.")
+        update_existing = True
+    if update_existing:
+        # Apply only the difference between the playlist and the resolved tracks
+        print(f"🔄 Syncing existing playlist '{playlist_name}'...")
+        try:
+            # The playlist is read anyway, so its tracks feed the fuzzy index at no extra cost
+            on_tracks = fuzzy_index.remember_playlist_tracks if fuzzy_index.FUZZY_LOOKUP else None
+            calls = sync_playlist(sp, playlist_id, track_uris, scheduler=scheduler, on_tracks=on_tracks)
+        except Exception as e:
+            if getattr(e, "http_status", None) == 404:
+                # The indexed playlist was deleted; forget it so the next run creates a new one
+                get_catalog().forget(playlist_id)
+            raise
+        print(f"✅ Playlist synced with {calls} write calls.")
+    else:
+        # Add found tracks to the playlist in batches, after any added before an interruption
+        if committed:
+            print(f"📒 {len(committed)} tracks were already added by the interrupted run.")
+        print(f"🎧 Adding {len(track_uris) - len(committed)} tracks to playlist...")
+        complete = True
+        for i in range(len(committed), len(track_uris), ADD_BATCH_SIZE):
+            batch = track_uris[i:i + ADD_BATCH_SIZE]
+            if not safe_add_items(sp, scheduler, playlist_id, batch):
+                complete = False
+            elif journal:
+                journal.record_batch(i, batch)
+        return complete
+    return True
+
+def resolve_and_add(sp, scheduler, playlist_id, playlist_name, queries, backend=None, journal=None,
+                    progress=None):
+    """
+    resolve_tracks followed by write_playlist for a new playlist, with the
+    writes overlapping the searches through an OrderedUploader.
+    Returns (queries, resolved, not_found, complete).
+    """
+    uploader = OrderedUploader(sp, scheduler, playlist_id, journal)
+    try:
+        queries, resolved, not_found = resolve_tracks(sp, scheduler, queries, backend, journal=journal,
+                                                      on_resolved=uploader.resolve, progress=progress)
+    except BaseException:
+        uploader.close(flush=False)
+        raise
+    # Only the batches still in flight once searching ends are waited for here
+    with metrics.stage("write"):
+        complete = uploader.close()
+    track_uris = [uri for uri in resolved if uri]
+    if uploader.diverged:
+        # write_playlist sees the same mismatch and syncs instead
+        complete = write_playlist(sp, scheduler, playlist_id, False, playlist_name, track_uris, journal=journal)
+    else:
+        print(f"✅ Added {uploader.added} tracks while searching.")
+    return queries, resolved, not_found, complete
 
-    # Final report
+def report_playlist(playlist_name, playlist_id, track_count, track_uris, not_found):
+    """
+    Print the final report, save the not-found list and return a summary dict.
+    """
     print(f"\n✅ Playlist '{playlist_name}' created with {len(track_uris)} tracks.")
+    metrics.incr("tracks_total", track_count)
+    metrics.incr("tracks_found_total", len(track_uris))
+    metrics.incr("tracks_not_found_total", len(not_found))
 
     if not_found:
         print("\n⚠️ Some songs were not found:")
         for line in not_found:
             print(" -", line)
+        write_not_found(playlist_name, not_found)
+    else:
+        print("\n🎉 All songs were successfully added!")
+
+    return {
+        "playlist": playlist_name,
+        "playlist_id": playlist_id,
+        "tracks": track_count,
+        "found": len(track_uris),
+        "not_found": not_found,
+    }
+
+def open_playlist(sp, journal, playlist_name, scheduler=None):
+    """
+    find_or_create_playlist, unless the journal already holds the playlist
+    chosen by an interrupted run.
+    """
+    if journal.playlist:
+        print(f"📒 Resuming the interrupted run for '{playlist_name}'.")
+        return journal.playlist
+    playlist_id, update_existing = find_or_create_playlist(sp, playlist_name, scheduler)
+    journal.record_playlist(playlist_id, update_existing)
+    return playlist_id, update_existing
+
+def upload_tracks(tracks, playlist_name, backend=None, journal_key=None, progress=None, cancel_event=None):
+    """
+    Resolve (number, title, artist) records and write them to the Spotify
+    playlist. `tracks` may be a generator: with the thread backend each
+    track is searched as soon as it arrives.
+    Progress is journaled under `journal_key` (default: the playlist name)
+    so a rerun after a crash resumes instead of starting over; that includes
+    a run stopped by setting `cancel_event`, which raises Cancelled.
+    progress(settled, total) is passed on to resolve_tracks.
+    Returns a summary dict.
+    """
+    sp, scheduler = create_client(cancel_event)
+    journal = open_journal(journal_key or playlist_name)
+    playlist_id, update_existing = open_playlist(sp, journal, playlist_name, scheduler)
+
+    queries = (prepare_query(title, artist) for _, title, artist in tracks)
+    try:
+        if update_existing:
+            # The diff needs the complete list, so writes wait for every search
+            queries, resolved, not_found = resolve_tracks(sp, scheduler, queries, backend, journal=journal,
+                                                          progress=progress)
+            track_uris = [uri for uri in resolved if uri]
+            complete = write_playlist(sp, scheduler, playlist_id, update_existing, playlist_name, track_uris,
+                                      journal=journal)
+        else:
+            queries, resolved, not_found, complete = resolve_and_add(sp, scheduler, playlist_id, playlist_name,
+                                                                     queries, backend, journal=journal,
+                                                                     progress=progress)
+            track_uris = [uri for uri in resolved if uri]
+    except Cancelled:
+        # Left in place, so starting this playlist again resumes where it stopped
+        journal.close()
+        raise
+
+    if complete:
+        journal.finish()
+    else:
+        journal.close()
+        print("⚠️ Some tracks could not be added. Run again to retry just those.")
 
-        folder = "not_found_songs"
-        os.makedirs(folder, exist_ok=True)
-        safe_name = sanitize_filename(playlist_name)
-        not_found_file = os.path.join(folder, f"{safe_name}_tracks_not_found.txt")
+    print(f"📊 {scheduler.calls} API calls, rate limited {scheduler.throttled} times "
+          f"({scheduler.throttle_seconds:.0f}s paused).")
 
-        with open(not_found_file, "w", encoding="utf-8") as f:
-            for line in not_found:
-                f.write(line + "\n")
+    # Final report
+    return report_playlist(playlist_name, playlist_id, len(queries), track_uris, not_found)
 
-        print(f"📄 Not-found songs saved to '{not_found_file}'")
-    else:
-        print("\n🎉 All songs were successfully added!")
+def read_playlist_name(raw_file_path=RAW_TEXT_FILE):
+    # Extract playlist name from line 9 of the raw Amazon file
+    try:
+        with open(raw_file_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+            playlist_name = lines[8].strip() if len(lines) >= 9 else DEFAULT_PLAYLIST_NAME
+    except Exception as e:
+        print(f"⚠️ Could not read playlist name from file: {e}")
+        playlist_name = DEFAULT_PLAYLIST_NAME
+
+    return playlist_name or DEFAULT_PLAYLIST_NAME
+
+def read_playlist_csv(csv_path=CLEAN_CSV_FILE):
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield row["Number"], row["Title"], row["Artist"]
+
+def main(backend=None, playlist_name=None):
+    # Upload the CSV written by the cleaner, using the playlist name from the raw dump unless given
+    playlist_name = playlist_name or read_playlist_name()
+    with metrics.run_session(playlist_name), metrics.stage("total"):
+        return upload_tracks(read_playlist_csv(), playlist_name, backend=backend)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRAPE_FOLDER = os.path.join(BASE_DIR, "music_data")
+SYNC_STATE_FILE = os.path.join(SCRAPE_FOLDER, "sync_state.json")
+
+def fingerprint(playlist_name, queries):
+    """
+    Hash of a cleaned playlist: its name and every (title, artist) in order.
+    """
+    digest = hashlib.sha256(playlist_name.encode("utf-8"))
+    for raw_track, _, artist in queries:
+        digest.update(f"\n{raw_track}\t{artist}".encode("utf-8"))
+    return digest.hexdigest()
+
+class SyncState:
+    """
+    What each source URL looked like when it was last synced: the
+    fingerprint of its cleaned track list, the Spotify playlist it was
+    written to and that playlist's snapshot_id right after the write.
+    If both still match, the playlist needs no Spotify work at all.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or SYNC_STATE_FILE
+        self._lock = threading.Lock()
+        self.entries = {}  # url -> {"fingerprint", "playlist_id", "snapshot_id", "found", "not_found", ...}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+
+    def candidate(self, url, fingerprint):
+        """
+        Return the entry for `url` if its track list is unchanged, else None.
+        The target playlist's snapshot still has to be checked.
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry and entry["fingerprint"] == fingerprint:
+                return entry
+            return None
+
+    def record(self, url, fingerprint, summary, snapshot_id):
+        with self._lock:
+            self.entries[url] = {
+                "fingerprint": fingerprint,
+                "playlist_id": summary["playlist_id"],
+                "snapshot_id": snapshot_id,
+                "tracks": summary["tracks"],
+                "found": summary["found"],
+                "not_found": summary["not_found"],
+                "synced_at": time.time(),
+            }
@@ -0,0 +1,130 @@
+import json
+import os
+import time
+from html.parser import HTMLParser
+
+import requests
+
+from components.cleaner import write_playlist_csv, CLEAN_CSV_FILE
+from components.metrics import registry as metrics
+
+# Headless alternative to scrapper.py: fetches the public playlist page over
+# HTTP and reads the track rows straight out of the markup, instead of
+# driving a browser and copying the rendered page through the clipboard.
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+ROW_TAGS = {"music-image-row", "music-text-row"}
+FETCH_ATTEMPTS = 3
+
+class PlaylistPageParser(HTMLParser):
+    """
+    Collects the playlist name and (title, artist) rows from an Amazon Music
+    playlist page, either from its JSON-LD block or its track row elements.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.name = None
+        self.og_title = None
+        self.rows = []
+        self.ld_rows = []
+        self._in_ld_json = False
+        self._ld_buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ROW_TAGS:
+            title = (attrs.get("primary-text") or "").strip()
+            artist = (attrs.get("secondary-text-1") or "").strip()
+            if title and artist:
+                self.rows.append((title, artist))
+        elif tag == "music-detail-header" and attrs.get("headline"):
+            self.name = attrs["headline"].strip()
+        elif tag == "meta" and attrs.get("property") == "og:title":
+            self.og_title = (attrs.get("content") or "").strip()
+        elif tag == "script" and attrs.get("type") == "application/ld+json":
+            self._in_ld_json = True
+            self._ld_buffer = []
+
+    def handle_data(self, data):
+        if self._in_ld_json:
+            self._ld_buffer.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._in_ld_json:
+            self._in_ld_json = False
+            self._parse_ld_json("".join(self._ld_buffer))
+
+    def _parse_ld_json(self, text):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return
+        for entry in data if isinstance(data, list) else [data]:
+            if not isinstance(entry, dict) or entry.get("@type") != "MusicPlaylist":
+                continue
+            self.name = self.name or entry.get("name")
+            tracks = entry.get("track") or []
+            if isinstance(tracks, dict):
+                tracks = tracks.get("itemListElement", [])
+            for track in tracks:
+                track = track.get("item", track)
+                artist = track.get("byArtist") or {}
+                if isinstance(artist, list):
+                    artist = artist[0] if artist else {}
+                title = (track.get("name") or "").strip()
+                artist_name = (artist.get("name") or "").strip()
+                if title and artist_name:
+                    self.ld_rows.append((title, artist_name))
+
+def parse_playlist_html(html):
+    """
+    Return (playlist_name, rows) where rows are (number, title, artist) tuples.
+    """
+    parser = PlaylistPageParser()
+    parser.feed(html)
+    parser.close()
+    rows = parser.ld_rows or parser.rows
+    name = parser.name or parser.og_title or "Converted from Amazon Music"
+    return name, [(str(n), title, artist) for n, (title, artist) in enumerate(rows, start=1)]
+
+def fetch_playlist(playlist_url, session=None, timeout=15):
+    """
+    Fetch and parse the playlist page, retrying briefly if it comes back
+    without any track rows.
+    """
+    session = session or requests.Session()
+    headers = {"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"}
+    name, rows = None, []
+    with metrics.stage("scrape"):
+        for attempt in range(FETCH_ATTEMPTS):
+            response = session.get(playlist_url, headers=headers, timeout=timeout)
+            response.raise_for_status()
+            name, rows = parse_playlist_html(response.text)
+            if rows:
+                break
+            if attempt + 1 < FETCH_ATTEMPTS:
+                time.sleep(attempt + 1)
+    return name, rows
+
+def main(playlist_url=None, output_file_path=CLEAN_CSV_FILE):
+    """
+    Scrape the playlist over HTTP and write the cleaned CSV directly.
+    Returns (playlist_name, rows).
+    """
+    if not playlist_url:
+        playlist_url = input("🔗 Paste your Amazon Music playlist URL: ").strip()
+
+    print(f"🌐 Fetching playlist page: {playlist_url}")
+    name, rows = fetch_playlist(playlist_url)
+    if not rows:
+        print("⚠️ No tracks found on the playlist page. Is the playlist public?")
+        return name, rows
+
+    print(f"📝 Found {len(rows)} tracks in '{name}'")
+    os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+    write_playlist_csv(rows, output_file_path)
+    return name, rows
@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from components import pipeline
+from components.ratelimit import Cancelled
+
+# Runs the GUI's conversions on a bounded pool of worker threads. Each job
+# reports its progress through Qt signals and can be cancelled: the pipeline
+# stops at its next track or API call and keeps its journal, so starting the
+# same playlist again resumes it. Output is tagged per job so concurrent
+# conversions stay readable, and debug dumps go to a folder per job.
+
+JOB_WORKERS = int(os.getenv("TRACKSWAP_GUI_WORKERS", "2"))
+JOBS_FOLDER = os.path.join(pipeline.SCRAPE_FOLDER, "jobs")
+PROGRESS_INTERVAL = 0.2  # seconds between progress signals for one job
+
+class Job:
+    """
+    One playlist conversion and its state, as shown in the job list.
+    """
+
+    def __init__(self, job_id, url):
+        self.id = job_id
+        self.url = url
+        self.status = "queued"  # queued, running, cancelling, done, cancelled, failed
+        self.settled = 0
+        self.total = 0
+        self.summary = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self._resolve_started = None
+        self._last_signal = 0.0
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running", "cancelling")
+
+    def eta(self):
+        """
+        Seconds left at the resolution rate so far, or None if unknown.
+        """
+        if not self.settled or self._resolve_started is None or self.settled >= self.total:
+            return None
+        elapsed = time.monotonic() - self._resolve_started
+        return elapsed / self.settled * (self.total - self.settled)
+
+    def describe(self):
+        name = (self.summary or {}).get("playlist") or self.url
+        if self.status == "done":
+            return (f"#{self.id} ✅ {name}: {self.summary['found']}/{self.summary['tracks']} tracks "
+                    f"({len(self.summary['not_found'])} not found)")
+        if self.status == "failed":
+            return f"#{self.id} ❌ {name}: {self.error}"
+        if self.status == "cancelled":
+            return f"#{self.id} 🛑 {name}: cancelled after {self.settled}/{self.total} tracks"
+        if self.status == "queued":
+            return f"#{self.id} ⏳ {name}: queued"
+        line = f"#{self.id} 🔍 {name}: {self.settled}/{self.total} tracks"
+        eta = self.eta()
+        if eta is not None:
+            line += f", about {int(eta) // 60}:{int(eta) % 60:02d} left"
+        if self.status == "cancelling":
+            line += " (cancelling...)"
+        return line
+
+class JobOutput:
+    """
+    stdout/stderr replacement in front of the log view's logger. Lines
+    printed by a job's own thread are prefixed with its number; output from
+    other threads, including a job's search workers, is passed on as is.
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._jobs = {}     # thread ident -> Job
+        self._partial = {}  # thread ident -> start of a line not yet ended
+
+    def attach(self, job):
+        with self._lock:
+            self._jobs[threading.get_ident()] = job
+
+    def detach(self):
+        ident = threading.get_ident()
+        with self._lock:
+            job = self._jobs.pop(ident, None)
+            rest = self._partial.pop(ident, "")
+        if rest:
+            self.logger.write(f"[#{job.id}] {rest}\n")
+
+    def current_job(self):
+        with self._lock:
+            return self._jobs.get(threading.get_ident())
+
+    def write(self, msg):
+        ident = threading.get_ident()
+        with self._lock:
+            job = self._jobs.get(ident)
+            if job is None:
+                text = None
+            else:
+                lines = (self._partial.pop(ident, "") + str(msg)).split("\n")
+                if lines[-1]:
+                    self._partial[ident] = lines[-1]
+                text = "".join(f"[#{job.id}] {line}\n" if line else "\n" for line in lines[:-1])
+        if job is None:
+            self.logger.write(msg)
+        elif text:
+            self.logger.write(text)
+
+    def flush(self):
+        self.logger.flush()
+
+class JobEngine(QObject):
+    """
+    Queue of conversion jobs run by up to `workers` threads at once.
+    job_changed is emitted (from the worker thread; Qt queues it for the
+    GUI thread) whenever a job's status or progress changes.
+    """
+
+    job_changed = pyqtSignal(object)
+
+    def __init__(self, output, workers=JOB_WORKERS, parent=None):
+        super().__init__(parent)
+        self.output = output
+        self.jobs = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="trackswap-job")
+
+    def submit(self, url):
+        """
+        Queue a conversion of `url` and return its Job, or None if that
+        playlist is already queued or running (both would share its journal).
+        """
+        with self._lock:
+            if any(job.url == url and job.active for job in self.jobs):
+                return None
+            job = Job(len(self.jobs) + 1, url)
+            self.jobs.append(job)
+        self._executor.submit(self._run, job)
+        self.job_changed.emit(job)
+        return job
+
+    def cancel(self, job):
+        if not job.active:
+            return
+        job.cancel_event.set()
+        if job.status == "running":
+            job.status = "cancelling"
+            self.job_changed.emit(job)
+
+    def cancel_all(self):
+        for job in list(self.jobs):
+            self.cancel(job)
+
+    def shutdown(self):
+        """
+        Cancel every job and stop accepting new ones, without waiting.
+        """
+        self.cancel_all()
+        self._executor.shutdown(wait=False)
+
+    def _progress(self, job, settled, total):
+        now = time.monotonic()
+        if job._resolve_started is None:
+            job._resolve_started = now
+        job.settled, job.total = settled, total
+        if settled == total or now - job._last_signal >= PROGRESS_INTERVAL:
+            job._last_signal = now
+            self.job_changed.emit(job)
+
+    def _run(self, job):
+        if job.cancel_event.is_set():
+            job.status = "cancelled"
+            self.job_changed.emit(job)
+            return
+        job.status = "running"
+        self.job_changed.emit(job)
+        debug_dir = os.path.join(JOBS_FOLDER, f"gui-{job.id:03d}") if pipeline.DEBUG_DUMPS else None
+        self.output.attach(job)
+        try:
+            print(f"🚀 Starting Amazon Music to Spotify Conversion of {job.url}...\n")
+            job.summary = pipeline.run(job.url, debug_dir=debug_dir,
+                                       progress=lambda settled, total: self._progress(job, settled, total),
+                                       cancel_event=job.cancel_event)
+            job.status = "done"
+            print("\n✅ Playlist successfully transferred to Spotify!")
+        except Cancelled:
+            job.status = "cancelled"
+            print("\n🛑 Conversion cancelled. Start it again to resume where it stopped.")
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            print(f"\n❌ An error occurred: {e}")
+        finally:
+            if job.active:
+                # Only a BaseException (not an Exception) gets here, e.g. SystemExit from a library
+                job.status = "failed"
+                job.error = "stopped unexpectedly"
+            self.output.detach()
+            self.job_changed.emit(job)
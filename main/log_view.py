@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+
+from PyQt5.QtWidgets import QApplication, QPlainTextEdit
+from PyQt5.QtGui import QFont, QTextCursor
+from PyQt5.QtCore import QTimer
+
+# Log window shared by main.py and sync.py. print() output from any thread
+# is collected in memory and drawn at a fixed frame rate, so a flood of
+# per-track messages costs one repaint per frame instead of one per print.
+# The view keeps only the latest lines; the full log is written to logs/.
+
+LOGS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+FRAME_INTERVAL_MS = 50    # 20 refreshes per second
+MAX_VIEW_LINES = 5000
+
+class BufferedLogger:
+    """
+    File-like stdout/stderr replacement. Writes are appended to a pending
+    buffer and to the log file; the GUI thread drains the buffer.
+    """
+
+    def __init__(self, log_path=None):
+        self._lock = threading.Lock()
+        self._pending = []
+        self.log_path = log_path
+        self._file = None
+        if log_path:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            self._file = open(log_path, "a", encoding="utf-8")
+
+    def write(self, msg):
+        msg = str(msg)
+        with self._lock:
+            self._pending.append(msg)
+            if self._file:
+                self._file.write(msg)
+
+    def flush(self):
+        with self._lock:
+            if self._file:
+                self._file.flush()
+
+    def drain(self):
+        """
+        Return everything written since the last call, and flush the log file.
+        """
+        with self._lock:
+            text = "".join(self._pending)
+            self._pending = []
+            if self._file:
+                self._file.flush()
+        return text
+
+def new_log_path(prefix):
+    return os.path.join(LOGS_FOLDER, f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}.log")
+
+class LogView(QPlainTextEdit):
+    """
+    Read-only, bounded log view fed by a BufferedLogger.
+    """
+
+    def __init__(self, parent=None, log_prefix="trackswap"):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(MAX_VIEW_LINES)
+        self.setFont(QFont("Consolas", 11))
+        self.setStyleSheet("""
+            background-color: #2e2e2e;
+            color: #e0e0ff;
+            border: 1px solid #555;
+            padding: 10px;
+        """)
+
+        self.logger = BufferedLogger(new_log_path(log_prefix))
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.timeout.connect(self.flush_pending)
+        self.flush_timer.start(FRAME_INTERVAL_MS)
+        QApplication.instance().aboutToQuit.connect(self.flush_pending)
+
+    def flush_pending(self):
+        text = self.logger.drain()
+        if not text:
+            return
+        scrollbar = self.verticalScrollBar()
+        # Only follow new output if the user hasn't scrolled up to read something
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
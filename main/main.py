@@ -1,45 +1,23 @@
 import sys
-import threading
 import queue
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QTextEdit, QInputDialog,
+    QPushButton, QInputDialog, QLabel, QListWidget, QListWidgetItem,
 )
-from PyQt5.QtGui import QFont, QTextCursor
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 
-from components import scrapper
-from components import cleaner
-from components import script
+from components.metrics import registry as metrics
+from components.ratelimit import Cancelled
+from job_engine import JobEngine, JobOutput
+from log_view import LogView
 
 import builtins
-import io
-
-from PyQt5.QtCore import pyqtSignal, QObject
-
-class QTextEditLogger(QObject):
-    new_text = pyqtSignal(str)
-
-    def __init__(self, text_edit):
-        super().__init__()
-        self.text_edit = text_edit
-        self.new_text.connect(self._append_text)
-
-    def write(self, msg):
-        self.new_text.emit(str(msg))
-
-    def flush(self):
-        pass
-
-    def _append_text(self, msg):
-        cursor = self.text_edit.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        self.text_edit.setTextCursor(cursor)
-        self.text_edit.insertPlainText(msg)
-        self.text_edit.moveCursor(QTextCursor.End)
-        self.text_edit.ensureCursorVisible()
 
 class ConverterApp(QWidget):
+    # Emitted by a job's thread; Qt delivers it to the GUI thread
+    input_requested = pyqtSignal(str, str, object)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("TrackSwap")
@@ -50,18 +28,24 @@ class ConverterApp(QWidget):
         main_layout = QVBoxLayout()
         button_row = QHBoxLayout()
 
-        # Output Text Area
-        self.text_edit = QTextEdit(self)
-        self.text_edit.setReadOnly(True)
-        self.text_edit.setFont(QFont("Consolas", 11))
-        self.text_edit.setStyleSheet("""
-            background-color: #2e2e2e;
-            color: #e0e0ff;
-            border: 1px solid #555;
-            padding: 10px;
-        """)
+        # Output Text Area (bounded; the full log is written to logs/)
+        self.text_edit = LogView(self, log_prefix="trackswap")
         main_layout.addWidget(self.text_edit)
 
+        # One line per conversion: progress and ETA while running, then its result
+        self.job_list = QListWidget(self)
+        self.job_list.setFont(QFont("Consolas", 10))
+        self.job_list.setStyleSheet("background-color: #262626; color: #e0e0ff; border: 1px solid #555;")
+        self.job_list.setMaximumHeight(150)
+        main_layout.addWidget(self.job_list)
+        self.job_items = {}  # job id -> QListWidgetItem
+
+        # Live counters for the current run
+        self.metrics_label = QLabel(metrics.summary(), self)
+        self.metrics_label.setFont(QFont("Consolas", 10))
+        self.metrics_label.setStyleSheet("color: #b0b0d0; padding: 4px 10px;")
+        main_layout.addWidget(self.metrics_label)
+
         # Start Button (80%)
         self.start_button = QPushButton("Start Conversion")
         self.start_button.setFont(QFont("Segoe UI", 13, QFont.Bold))
@@ -81,7 +65,27 @@ class ConverterApp(QWidget):
         """)
         self.start_button.setMinimumWidth(0)
         self.start_button.clicked.connect(self.start_conversion)
-        button_row.addWidget(self.start_button, 9)
+        button_row.addWidget(self.start_button, 8)
+
+        # Cancel Button: the selected job, or every job if none is selected
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setFont(QFont("Segoe UI", 13))
+        self.cancel_button.setStyleSheet("""
+            QPushButton {
+                background-color: #424242;
+                color: white;
+                padding: 12px;
+                border-radius: 6px;
+            }
+            QPushButton:hover {
+                background-color: #555555;
+            }
+            QPushButton:pressed {
+                background-color: #303030;
+            }
+        """)
+        self.cancel_button.clicked.connect(self.cancel_conversion)
+        button_row.addWidget(self.cancel_button, 1)
 
         # Exit Button (20%)
         self.exit_button = QPushButton("Exit")
@@ -108,53 +112,68 @@ class ConverterApp(QWidget):
 
         self.setLayout(main_layout)
 
-        # Redirect print to GUI
-        self.logger = QTextEditLogger(self.text_edit)
+        # Redirect print to GUI, tagged with the job that printed it
+        self.logger = JobOutput(self.text_edit.logger)
         sys.stdout = self.logger
         sys.stderr = self.logger  # optional: capture errors too
 
-        # Setup input redirection
-        self.input_queue = queue.Queue()
+        # Conversions run on the job engine's worker pool
+        self.engine = JobEngine(self.logger, parent=self)
+        self.engine.job_changed.connect(self.show_job)
+
+        # Input prompts from a job's thread are answered through a signal
+        self.input_requested.connect(self.ask_input)
         builtins.input = self.get_input
 
-        # Periodic check for input prompts from background thread
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.process_input_requests)
-        self.timer.start(200)
+        self.metrics_timer = QTimer()
+        self.metrics_timer.timeout.connect(lambda: self.metrics_label.setText(metrics.summary()))
+        self.metrics_timer.start(500)
         
 
     def get_input(self, prompt=""):
-        response_queue = queue.Queue()
-        self.input_queue.put((prompt, response_queue))
-        return response_queue.get()
-
-    def process_input_requests(self):
-        if not self.input_queue.empty():
-            prompt, response_queue = self.input_queue.get()
-            user_input, ok = QInputDialog.getText(self, "Input Required", prompt)
-            if ok:
-                response_queue.put(user_input)
-            else:
-                QApplication.quit()
+        """
+        input() for job threads: blocks until the dialog is answered, and
+        cancels the job if it is dismissed.
+        """
+        job = self.logger.current_job()
+        title = f"Input Required (job #{job.id})" if job else "Input Required"
+        response_queue = queue.Queue(maxsize=1)
+        self.input_requested.emit(title, prompt, response_queue)
+        answer = response_queue.get()
+        if answer is None:
+            raise Cancelled()
+        return answer
+
+    def ask_input(self, title, prompt, response_queue):
+        user_input, ok = QInputDialog.getText(self, title, prompt)
+        response_queue.put(user_input if ok else None)
 
     def start_conversion(self):
-        self.text_edit.append("🚀 Starting Amazon Music to Spotify Conversion...\n")
-        threading.Thread(target=self.run_pipeline, daemon=True).start()
-
-    def run_pipeline(self):
-        try:
-            print("\n📥 Running scraper...")
-            scrapper.main()
-
-            print("\n🧹 Running cleaner...")
-            cleaner.main()
-
-            print("\n🎧 Running Spotify uploader...")
-            script.main()
-
-            print("\n✅ Playlist successfully transferred to Spotify!")
-        except Exception as e:
-            print(f"\n❌ An error occurred: {e}")
+        url, ok = QInputDialog.getText(self, "New Conversion", "🔗 Paste your Amazon Music playlist URL:")
+        url = url.strip()
+        if not ok or not url:
+            return
+        if self.engine.submit(url) is None:
+            print(f"⚠️ {url} is already being converted.")
+
+    def cancel_conversion(self):
+        selected = [item.data(Qt.UserRole) for item in self.job_list.selectedItems()]
+        jobs = [job for job in self.engine.jobs if job.id in selected] or self.engine.jobs
+        for job in jobs:
+            self.engine.cancel(job)
+
+    def show_job(self, job):
+        item = self.job_items.get(job.id)
+        if item is None:
+            item = QListWidgetItem(self.job_list)
+            item.setData(Qt.UserRole, job.id)
+            self.job_items[job.id] = item
+        item.setText(job.describe())
+
+    def closeEvent(self, event):
+        # Stop every job at its next track or API call instead of leaving them running
+        self.engine.shutdown()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
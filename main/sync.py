@@ -3,41 +3,17 @@ import threading
 import queue
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QTextEdit
+    QPushButton
 )
-from PyQt5.QtGui import QFont, QTextCursor
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QObject
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, QTimer
 
-from components import scrapper
-from components import cleaner
-from components import script
+from components import batch
+from log_view import LogView
 
 import builtins
-import io
 import os
 
-class QTextEditLogger(QObject):
-    new_text = pyqtSignal(str)
-
-    def __init__(self, text_edit):
-        super().__init__()
-        self.text_edit = text_edit
-        self.new_text.connect(self._append_text)
-
-    def write(self, msg):
-        self.new_text.emit(str(msg))
-
-    def flush(self):
-        pass
-
-    def _append_text(self, msg):
-        cursor = self.text_edit.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        self.text_edit.setTextCursor(cursor)
-        self.text_edit.insertPlainText(msg)
-        self.text_edit.moveCursor(QTextCursor.End)
-        self.text_edit.ensureCursorVisible()
-
 class ConverterApp(QWidget):
     def __init__(self):
         super().__init__()
@@ -49,16 +25,8 @@ class ConverterApp(QWidget):
         main_layout = QVBoxLayout()
         button_row = QHBoxLayout()
 
-        # Output Text Area
-        self.text_edit = QTextEdit(self)
-        self.text_edit.setReadOnly(True)
-        self.text_edit.setFont(QFont("Consolas", 11))
-        self.text_edit.setStyleSheet("""
-            background-color: #2e2e2e;
-            color: #e0e0ff;
-            border: 1px solid #555;
-            padding: 10px;
-        """)
+        # Output Text Area (bounded; the full log is written to logs/)
+        self.text_edit = LogView(self, log_prefix="trackswap-sync")
         main_layout.addWidget(self.text_edit)
 
         # Start Button
@@ -104,7 +72,7 @@ class ConverterApp(QWidget):
         main_layout.addLayout(button_row)
         self.setLayout(main_layout)
 
-        self.logger = QTextEditLogger(self.text_edit)
+        self.logger = self.text_edit.logger
         sys.stdout = self.logger
         sys.stderr = self.logger
 
@@ -116,7 +84,7 @@ class ConverterApp(QWidget):
         return ""
 
     def start_conversion(self):
-        self.text_edit.append("🚀 Starting Amazon Music to Spotify Sync...\n")
+        print("🚀 Starting Amazon Music to Spotify Sync...\n")
         threading.Thread(target=self.run_all_playlists, daemon=True).start()
 
     def run_all_playlists(self):
@@ -125,27 +93,14 @@ class ConverterApp(QWidget):
             print("❌ playlists.txt file not found in the current directory.[if not made, create this file in the same directory and paste your playlists in each line]")
             return
 
-        with open(playlists_file, "r", encoding="utf-8") as f:
-            urls = [line.strip() for line in f if line.strip()]
+        urls = batch.read_playlist_urls(playlists_file)
 
         if not urls:
             print("❌ No playlist URLs found in playlists.txt.")
             return
 
-        for idx, url in enumerate(urls, start=1):
-            print(f"\n⏳ Processing playlist {idx}/{len(urls)}: {url}")
-            try:
-                scrapper.main(url)
-
-                print("\n🧹 Running cleaner...")
-                cleaner.main()
-
-                print("\n🎧 Running Spotify uploader...")
-                script.main()
-
-                print(f"\n✅ Playlist {idx} successfully transferred to Spotify!")
-            except Exception as e:
-                print(f"\n❌ Error with playlist {idx}: {e}")
+        print(f"🧵 Syncing {len(urls)} playlists with up to {batch.BATCH_WORKERS} at a time...")
+        batch.run_batch(urls)
 
         print("\n🎯 All playlists processed!")
 
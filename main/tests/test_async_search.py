@@ -0,0 +1,74 @@
+import threading
+import unittest
+
+from components import async_search
+from components.matcher import MatchStats
+from components.mock_server import start_server
+from components.ratelimit import Cancelled, RequestScheduler
+from components.script import prepare_query
+
+# The async search backend against the mock Spotify API: results, the
+# shared scheduler's limits and 429 handling, token refresh, cancellation.
+
+CATALOG = [
+    {"name": "Tum Hi Ho", "artists": ["Arijit Singh"], "uri": "spotify:track:" + "1".zfill(22)},
+    {"name": "Blinding Lights", "artists": ["The Weeknd"], "uri": "spotify:track:" + "2".zfill(22)},
+    {"name": "Cruel Summer", "artists": ["Taylor Swift"], "uri": "spotify:track:" + "3".zfill(22)},
+]
+QUERIES = [
+    prepare_query("Tum Hi Ho", "Arijit Singh"),
+    prepare_query("Blinding Lights (Remastered)", "The Weeknd"),
+    prepare_query("Cruel Summer", "Taylor Swift"),
+    prepare_query("No Such Song", "Nobody"),
+]
+
+class AsyncSearchTest(unittest.TestCase):
+
+    def start(self, **kwargs):
+        server, base_url = start_server(CATALOG, seed=7, **kwargs)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server, base_url
+
+    def search(self, base_url, scheduler, get_token=lambda: "token", **kwargs):
+        return async_search.search_tracks(QUERIES, scheduler, get_token, base_url=base_url, **kwargs)
+
+    def test_resolves_in_query_order(self):
+        _, base_url = self.start()
+        scheduler = RequestScheduler(rate=100, max_rate=100)
+        stats = MatchStats()
+        done = []
+        results = self.search(base_url, scheduler, stats=stats, on_result=lambda i, result: done.append(i))
+        self.assertEqual([uri for _, uri, _, _ in results], [t["uri"] for t in CATALOG] + [None])
+        self.assertEqual([found for found, _, _, _ in results], [True, True, True, False])
+        self.assertEqual(sorted(done), [0, 1, 2, 3])
+        self.assertEqual(scheduler.calls, stats.api_calls)
+        self.assertEqual(scheduler.in_flight, 0)
+
+    def test_token_is_read_for_every_request(self):
+        _, base_url = self.start()
+        scheduler = RequestScheduler(rate=100, max_rate=100)
+        tokens = []
+        self.search(base_url, scheduler, get_token=lambda: tokens.append(1) or f"token-{len(tokens)}")
+        self.assertEqual(len(tokens), scheduler.calls)
+
+    def test_429_pauses_the_shared_scheduler(self):
+        server, base_url = self.start(throttle_rate=0.3)
+        scheduler = RequestScheduler(rate=100, max_rate=100)
+        results = self.search(base_url, scheduler)
+        self.assertEqual([uri for _, uri, _, _ in results], [t["uri"] for t in CATALOG] + [None])
+        self.assertGreater(server.throttled, 0)
+        self.assertEqual(scheduler.throttled, server.throttled)
+        self.assertLess(scheduler.rate, 100)
+        self.assertGreater(scheduler.throttle_seconds, 0)
+
+    def test_cancelled_before_any_request(self):
+        server, base_url = self.start()
+        cancel_event = threading.Event()
+        cancel_event.set()
+        with self.assertRaises(Cancelled):
+            self.search(base_url, RequestScheduler(cancel_event=cancel_event))
+        self.assertEqual(server.request_count, 0)
+
+if __name__ == "__main__":
+    unittest.main()
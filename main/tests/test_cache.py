@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from components import cache as cache_module
+from components.cache import TrackCache
+
+# The SQLite track cache: key normalization, expiry, LRU eviction, and
+# several threads and connections writing to one file.
+
+class Clock:
+    """
+    Stand-in for time.time that only moves when told to.
+    """
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+class TrackCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.path = os.path.join(folder, "cache", "track_cache.sqlite3")
+        self.clock = Clock()
+        patcher = mock.patch.object(cache_module.time, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def open(self, **kwargs):
+        cache = TrackCache(self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_keys_are_normalized(self):
+        cache = self.open()
+        cache.put("Tum  Hi Ho", "Arijit Singh", "spotify:track:1")
+        self.assertEqual(cache.get("tum hi ho", " ARIJIT   singh "), "spotify:track:1")
+        self.assertIsNone(cache.get("Tum Hi Ho", "Shreya Ghoshal"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_put_replaces(self):
+        cache = self.open()
+        cache.put("Tum Hi Ho", "Arijit Singh", "spotify:track:1")
+        cache.put("tum hi ho", "arijit singh", "spotify:track:2")
+        self.assertEqual(cache.get("Tum Hi Ho", "Arijit Singh"), "spotify:track:2")
+        self.assertEqual(len(cache.entries()), 1)
+
+    def test_persists_across_opens(self):
+        cache = self.open()
+        cache.put("Tum Hi Ho", "Arijit Singh", "spotify:track:1")
+        cache.close()
+        self.assertEqual(self.open().get("Tum Hi Ho", "Arijit Singh"), "spotify:track:1")
+
+    def test_entries_expire(self):
+        cache = self.open(ttl=100)
+        cache.put("Tum Hi Ho", "Arijit Singh", "spotify:track:1")
+        self.clock.advance(99)
+        self.assertEqual(cache.get("Tum Hi Ho", "Arijit Singh"), "spotify:track:1")
+        self.clock.advance(2)
+        self.assertIsNone(cache.get("Tum Hi Ho", "Arijit Singh"))
+        self.assertEqual(cache.entries(), [])
+
+    def test_expired_entries_are_purged_on_open(self):
+        cache = self.open(ttl=100)
+        cache.put("Tum Hi Ho", "Arijit Singh", "spotify:track:1")
+        cache.close()
+        self.clock.advance(101)
+        reopened = self.open(ttl=100)
+        self.assertEqual(reopened._size, 0)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = self.open(max_entries=3)
+        for n in range(3):
+            cache.put(f"Song {n}", "Artist", f"spotify:track:{n}")
+            self.clock.advance(1)
+        cache.get("Song 0", "Artist")
+        self.clock.advance(1)
+        cache.put("Song 3", "Artist", "spotify:track:3")
+        self.assertIsNone(cache.get("Song 1", "Artist"))
+        for n in (0, 2, 3):
+            self.assertEqual(cache.get(f"Song {n}", "Artist"), f"spotify:track:{n}")
+
+    def test_found_track_clears_its_miss(self):
+        cache = self.open()
+        cache.put_miss("Tum Hi Ho", "Arijit Singh", "Tum Hi Ho", "Arijit Singh")
+        self.assertTrue(cache.known_miss("tum hi ho", "arijit singh"))
+        cache.put("Tum Hi Ho", "Arijit Singh", "spotify:track:1")
+        self.assertFalse(cache.known_miss("Tum Hi Ho", "Arijit Singh"))
+
+    def test_concurrent_writers(self):
+        caches = [self.open(), self.open()]
+        self.assertEqual(caches[0]._conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        errors = []
+
+        def work(worker):
+            cache = caches[worker % 2]
+            try:
+                for n in range(100):
+                    cache.put(f"Song {worker}-{n}", "Artist", f"spotify:track:{worker}-{n}")
+                    cache.get(f"Song {worker}-{n // 2}", "Artist")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.open().entries()), 800)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+from components import cleaner
+
+# The streaming parser on raw page text laid out like a copied playlist
+# page: header, then per row the number, title, a detail line, the artist,
+# the album and the duration.
+
+HEADER = ["Amazon Music", "Home", "Find", "Library", "Search", "Playlist", "", "", "Road Trip",
+          "4 SONGS", "15 MINUTES", "2024", ""]
+# Album names that are numbers close to the track numbers must not be taken for rows
+ROWS = [
+    ("1", "Hello", "Adele", "25"),
+    ("2", "Rolling in the Deep", "Adele", "21"),
+    ("3", "Skyfall", "Adele", "Skyfall"),
+    ("4", "Someone Like You", "Adele", "21"),
+]
+
+FOOTER = ["Contact Us", "2024"]
+
+def row_lines(rows):
+    lines = []
+    for number, title, artist, album in rows:
+        lines += [number, title, "E", artist, album, "3:45", ""]
+    return lines
+
+def page(rows, header=HEADER, footer=FOOTER):
+    return list(header) + row_lines(rows) + list(footer)
+
+def parse(lines):
+    report = cleaner.ParseReport()
+    return list(cleaner.iter_tracks(lines, report)), report
+
+class IterTracksTest(unittest.TestCase):
+
+    def test_clean_page(self):
+        tracks, report = parse(page(ROWS))
+        self.assertEqual(tracks, [(number, title, artist) for number, title, artist, _ in ROWS])
+        self.assertEqual((report.malformed, report.missing_numbers, report.restarts), (0, 0, 0))
+
+    def test_playlist_name(self):
+        name, lines = cleaner.split_playlist_name(page(ROWS))
+        self.assertEqual(name, "Road Trip")
+        self.assertEqual(len(parse(lines)[0]), len(ROWS))
+
+    def test_year_in_header_is_not_a_track(self):
+        header = HEADER[:-1] + ["2024", "12", ""]
+        tracks, _ = parse(page(ROWS, header=header))
+        self.assertEqual([t[0] for t in tracks], ["1", "2", "3", "4"])
+
+    def test_restart_after_stray_number(self):
+        # Parsed from the middle of the list, a stray number can't be told from a track
+        # until the numbering restarts below it
+        rows = [(number, title, artist, "Album") for number, title, artist, _ in ROWS]
+        parser = cleaner.PlaylistParser(first_number=None)
+        lines = [line for line in ["2024"] + row_lines(rows) if line]
+        records = [parser.feed(line, idx) for idx, line in enumerate(lines)]
+        tracks = [record for record in records if record]
+        self.assertEqual([t[0] for t in tracks], ["2024", "2", "3", "4"])
+        self.assertEqual(parser.report.restarts, 1)
+
+    def test_lone_lower_number_is_noise(self):
+        lines = page(ROWS[:2], footer=()) + ["1"] + row_lines(ROWS[2:])
+        tracks, report = parse(lines)
+        self.assertEqual([t[0] for t in tracks], ["1", "2", "3", "4"])
+        self.assertEqual(report.restarts, 0)
+
+    def test_missing_tracks_are_reported(self):
+        tracks, report = parse(page([ROWS[0], ROWS[3]]))
+        self.assertEqual(tracks, [("1", "Hello", "Adele"), ("4", "Someone Like You", "Adele")])
+        self.assertEqual(report.missing_numbers, 2)
+
+    def test_block_without_artist(self):
+        lines = page(ROWS[:1], footer=()) + ["2", "Rolling in the Deep", "E"] + row_lines(ROWS[2:])
+        tracks, report = parse(lines)
+        self.assertEqual([t[0] for t in tracks], ["1", "3", "4"])
+        self.assertEqual(report.malformed, 1)
+
+    def test_page_text_instead_of_artist(self):
+        lines = page(ROWS[:1], footer=()) + ["2", "Rolling in the Deep", "E", "Search"] + row_lines(ROWS[2:])
+        tracks, report = parse(lines)
+        self.assertEqual([t[0] for t in tracks], ["1", "3", "4"])
+        self.assertEqual(report.malformed, 1)
+
+    def test_cut_off_at_the_end(self):
+        tracks, report = parse(page(ROWS, footer=()) + ["5", "Water Under the Bridge"])
+        self.assertEqual(len(tracks), 4)
+        self.assertEqual(report.malformed, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from components import journal
+from components.journal import RunJournal
+
+# The run journal: what a resumed run gets back from the file an earlier
+# one left behind.
+
+def uris(numbers):
+    return [f"spotify:track:{n}" for n in numbers]
+
+class RunJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.path = os.path.join(folder, "journals", "run.jsonl")
+
+    def open(self):
+        run_journal = RunJournal(self.path)
+        self.addCleanup(run_journal.close)
+        return run_journal
+
+    def test_committed_uris(self):
+        run_journal = self.open()
+        self.assertEqual(run_journal.committed_uris(), [])
+        run_journal.record_batch(0, uris(range(100)))
+        run_journal.record_batch(100, uris(range(100, 150)))
+        self.assertEqual(run_journal.committed_uris(), uris(range(150)))
+
+    def test_batches_committed_out_of_order(self):
+        run_journal = self.open()
+        run_journal.record_batch(2, uris([2, 3]))
+        run_journal.record_batch(0, uris([0, 1]))
+        self.assertEqual(run_journal.committed_uris(), uris(range(4)))
+
+    def test_gap_between_batches(self):
+        run_journal = self.open()
+        run_journal.record_batch(0, uris([0, 1]))
+        run_journal.record_batch(3, uris([3]))
+        self.assertIsNone(run_journal.committed_uris())
+
+    def test_resume(self):
+        run_journal = self.open()
+        run_journal.record_playlist("playlist-1", False)
+        run_journal.record_track("Tum Hi Ho", "Arijit Singh", "spotify:track:1")
+        run_journal.record_track("No Such Song", "Nobody", None)
+        run_journal.record_batch(0, uris([1]))
+        run_journal.close()
+        # A crash can cut the last line short
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"type": "batch", "start": 1, "ur')
+
+        resumed = self.open()
+        self.assertEqual(resumed.playlist, ("playlist-1", False))
+        self.assertEqual(resumed.lookup_track("tum hi  ho", "ARIJIT SINGH"), (True, "spotify:track:1"))
+        self.assertEqual(resumed.lookup_track("No Such Song", "Nobody"), (True, None))
+        self.assertEqual(resumed.lookup_track("Cruel Summer", "Taylor Swift"), (False, None))
+        self.assertEqual(resumed.committed_uris(), uris([1]))
+
+    def test_finish_removes_the_file(self):
+        run_journal = self.open()
+        run_journal.record_batch(0, uris([1]))
+        run_journal.finish()
+        self.assertFalse(os.path.exists(self.path))
+        reopened = self.open()
+        self.assertEqual((reopened.playlist, reopened.tracks, reopened.batches), (None, {}, []))
+
+    def test_old_journal_is_discarded(self):
+        run_journal = self.open()
+        run_journal.record_playlist("playlist-1", True)
+        run_journal.close()
+        old = time.time() - journal.MAX_AGE - 60
+        os.utime(self.path, (old, old))
+        resumed = self.open()
+        self.assertEqual((resumed.playlist, resumed.tracks, resumed.batches), (None, {}, []))
+
+if __name__ == "__main__":
+    unittest.main()
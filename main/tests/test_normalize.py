@@ -0,0 +1,50 @@
+import random
+import unittest
+
+from components import normalize
+from components.fuzzy_index import FuzzyIndex
+
+# The column helpers must give exactly what the per-string ones give.
+
+VALUES = [
+    "Tum Hi Ho", "tum hi ho", "Tum Hi Ho", "Blinding Lights (Remastered)", "  Cruel   Summer!! ",
+    "Lo-Fi / Slowed + Reverb", "...", "", "Line\nbreak", "trailing\n", "Ünïcödé — dash", "ΣΊΣΥΦΟΣ",
+    "Café del Mar [Live]", "Song (From \"Film\")", "under_score", "tab\tseparated", "A&B feat. C",
+]
+
+def random_values(count, seed=42):
+    rng = random.Random(seed)
+    alphabet = "ab Z9_-!.,()[]&\n\tÉßσΣ "
+    return [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        for _ in range(count)
+    ]
+
+class ColumnTest(unittest.TestCase):
+
+    def test_normalize_column(self):
+        for values in (VALUES, random_values(2000), []):
+            self.assertEqual(normalize.normalize_column(values), [normalize.normalize_text(v) for v in values])
+
+    def test_clean_track_column(self):
+        for values in (VALUES, random_values(2000)):
+            self.assertEqual(normalize.clean_track_column(values), [normalize.clean_track_name(v) for v in values])
+
+    def test_fuzzy_index_add_many(self):
+        rng = random.Random(7)
+        entries = [
+            (rng.choice(VALUES), rng.choice(["Arijit Singh", "arijit  singh", "The Weeknd", "A.R. Rahman"]),
+             f"spotify:track:{n}")
+            for n in range(300)
+        ]
+        one_by_one = FuzzyIndex()
+        for track, artist, uri in entries:
+            one_by_one.add(track, artist, uri)
+        at_once = FuzzyIndex()
+        at_once.add_many(entries)
+        self.assertEqual(at_once._keys, one_by_one._keys)
+        self.assertEqual(at_once._titles, one_by_one._titles)
+        self.assertEqual(at_once._uris, one_by_one._uris)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import random
+import unittest
+
+from components.playlist_sync import compute_delta, delta_calls, rewrite_calls
+
+# compute_delta: the operations it returns, applied the way the Web API
+# applies them, must turn the current playlist into the target.
+
+def apply_delta(current, removals, moves, inserts):
+    drop = {pos for positions in removals.values() for pos in positions}
+    uris = [uri for pos, uri in enumerate(current) if pos not in drop]
+    for range_start, insert_before in moves:
+        moved = uris.pop(range_start)
+        if insert_before > range_start:
+            insert_before -= 1
+        uris.insert(insert_before, moved)
+    for position, batch in inserts:
+        uris[position:position] = batch
+    return uris
+
+def uris(numbers):
+    return [f"spotify:track:{n}" for n in numbers]
+
+class ComputeDeltaTest(unittest.TestCase):
+
+    def check(self, current, target):
+        removals, moves, inserts = compute_delta(current, target)
+        self.assertEqual(apply_delta(current, removals, moves, inserts), target)
+        return removals, moves, inserts
+
+    def test_unchanged(self):
+        self.assertEqual(self.check(uris(range(10)), uris(range(10))), ({}, [], []))
+
+    def test_append(self):
+        removals, moves, inserts = self.check(uris(range(10)), uris(range(15)))
+        self.assertEqual((removals, moves), ({}, []))
+        self.assertEqual(inserts, [(10, uris(range(10, 15)))])
+
+    def test_one_track_moved(self):
+        target = uris(range(10))
+        current = target[:3] + target[4:] + target[3:4]
+        _, moves, _ = self.check(current, target)
+        self.assertEqual(len(moves), 1)
+
+    def test_duplicates(self):
+        self.check(uris([1, 2, 1, 3, 1]), uris([1, 3, 1, 2]))
+        self.check(uris([1, 1, 1]), uris([2, 1, 2, 1]))
+
+    def test_long_insert_is_split_into_batches(self):
+        _, _, inserts = self.check([], uris(range(250)))
+        self.assertEqual([len(batch) for _, batch in inserts], [100, 100, 50])
+
+    def test_random_edits(self):
+        rng = random.Random(42)
+        for _ in range(300):
+            pool = uris(range(rng.randint(1, 40)))
+            current = [rng.choice(pool) for _ in range(rng.randint(0, 30))]
+            target = [rng.choice(pool) for _ in range(rng.randint(0, 30))]
+            self.check(current, target)
+
+    def test_random_shuffles(self):
+        rng = random.Random(7)
+        for _ in range(100):
+            current = uris(range(rng.randint(0, 300)))
+            target = list(current)
+            for _ in range(rng.randint(0, 5)):
+                if target:
+                    target.insert(rng.randrange(len(target) + 1), target.pop(rng.randrange(len(target))))
+            self.check(current, target)
+
+class CallCountTest(unittest.TestCase):
+
+    def test_reversed_playlist_costs_more_than_a_rewrite(self):
+        current = uris(range(2000))
+        delta = compute_delta(current, current[::-1])
+        self.assertGreater(delta_calls(*delta), rewrite_calls(current))
+
+    def test_small_edit_costs_less_than_a_rewrite(self):
+        current = uris(range(2000))
+        target = current[:500] + current[501:] + uris(["new"])
+        delta = compute_delta(current, target)
+        self.assertLess(delta_calls(*delta), rewrite_calls(target))
+
+if __name__ == "__main__":
+    unittest.main()
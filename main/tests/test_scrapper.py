@@ -0,0 +1,88 @@
+import unittest
+from unittest import mock
+
+from components import batch, cleaner, scrapper
+from components.scrapper import ChunkCollector, ScrapeError
+
+# ChunkCollector on overlapping copies of a long playlist page, as the
+# scroll capture takes them: the same header every time, a window of
+# rendered rows whose top row may be cut off, then the footer. Also how a
+# machine that can't run the GUI scraper is reported.
+
+TOTAL = 120
+HEADER = ["Amazon Music", "Home", "Find", "Library", "Search", "Playlist", "", "", "Long Mix",
+          f"{TOTAL} SONGS", "8 HOURS", "2024", ""]
+FOOTER = ["Contact Us", "2024"]
+
+def row(n):
+    # Every fourth album is a number, like "21"
+    album = str(n % 30) if n % 4 == 0 else f"Album {n}"
+    return [str(n), f"Song {n}", "E", f"Artist {n}", album, "3:45", ""]
+
+def copy(first, last, cut_top=False):
+    lines = []
+    for n in range(first, min(last, TOTAL) + 1):
+        lines += row(n)
+    if cut_top and first > 1:
+        lines = lines[2:]
+    return "\n".join(HEADER + lines + FOOTER)
+
+def collect(copies):
+    collector = ChunkCollector()
+    lines = []
+    for text in copies:
+        lines.extend(collector.feed(text))
+    name, lines = cleaner.split_playlist_name(lines)
+    return collector, name, list(cleaner.iter_tracks(lines))
+
+class ChunkCollectorTest(unittest.TestCase):
+
+    def test_overlapping_copies(self):
+        copies = [copy(first, first + 29, cut_top=True) for first in range(1, TOTAL, 20)]
+        collector, name, tracks = collect(copies)
+        self.assertEqual(name, "Long Mix")
+        self.assertEqual([int(t[0]) for t in tracks], list(range(1, TOTAL + 1)))
+        self.assertEqual(tracks[3], ("4", "Song 4", "Artist 4"))
+        self.assertTrue(collector.complete)
+
+    def test_repeated_copy_adds_nothing(self):
+        collector = ChunkCollector()
+        collector.feed(copy(1, 30))
+        self.assertEqual(collector.feed(copy(1, 30)), [])
+        self.assertEqual((collector.new, collector.overlap), (0, 30))
+
+    def test_gap_is_refused_when_asked(self):
+        collector = ChunkCollector()
+        collector.feed(copy(1, 30))
+        self.assertIsNone(collector.feed(copy(41, 70), allow_gap=False))
+        self.assertEqual(collector.gap, 10)
+        self.assertEqual(collector.last, 30)
+        lines = collector.feed(copy(41, 70))
+        self.assertEqual(lines[0], "41")
+        self.assertEqual(collector.last, 70)
+
+    def test_first_copy_before_rows_render(self):
+        collector = ChunkCollector()
+        self.assertEqual(collector.feed("\n".join(HEADER + FOOTER)), [])
+        _, _, tracks = collect(["\n".join(HEADER + FOOTER), copy(1, TOTAL)])
+        self.assertEqual(len(tracks), TOTAL)
+
+class UnsupportedSetupTest(unittest.TestCase):
+
+    def test_unsupported_os(self):
+        with mock.patch.object(scrapper.platform, "system", return_value="Linux"):
+            with self.assertRaises(ScrapeError):
+                scrapper.platform_settings()
+
+    def test_missing_chrome(self):
+        with self.assertRaises(ScrapeError):
+            scrapper.open_incognito_chrome("https://music.amazon.com/", "/nonexistent/chrome")
+
+    def test_batch_job_reports_the_failure(self):
+        with mock.patch.object(scrapper.platform, "system", return_value="Linux"):
+            job = batch.scrape_job(1, 1, "https://music.amazon.com/playlists/x", scraper_backend="gui")
+        self.assertEqual(job["status"], "error")
+        self.assertIn("Unsupported operating system", job["error"])
+
+if __name__ == "__main__":
+    unittest.main()
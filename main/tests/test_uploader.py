@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from components import cache as cache_module
+from components import client, fuzzy_index, script
+from components.journal import RunJournal
+from components.mock_server import start_server
+from components.ratelimit import RequestScheduler
+
+# The streaming uploader against the mock Spotify API, resuming from the
+# journal an interrupted run left behind, and search results being settled
+# while the source is still being read.
+
+CATALOG = [
+    {"name": f"Song {n}", "artists": [f"Artist {n}"], "uri": "spotify:track:" + str(n).zfill(22)}
+    for n in range(6)
+]
+URIS = [track["uri"] for track in CATALOG]
+
+class MockApiTest(unittest.TestCase):
+
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.journal_path = os.path.join(folder, "journals", "run.jsonl")
+
+        self.server, base_url = start_server(CATALOG, seed=7)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        for patcher in (
+            mock.patch.dict(os.environ, {"TRACKSWAP_API_BASE": base_url, "TRACKSWAP_ACCESS_TOKEN": "token"}),
+            mock.patch.object(cache_module, "CACHE_FILE", os.path.join(folder, "track_cache.sqlite3")),
+            mock.patch.object(fuzzy_index, "FUZZY_LOOKUP", False),
+            mock.patch.object(script, "ADD_BATCH_SIZE", 2),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.sp = client.build_client()
+        self.scheduler = RequestScheduler(rate=100, max_rate=100)
+
+class ResumeUploadTest(MockApiTest):
+
+    def interrupted_run(self, batches):
+        """
+        A playlist and journal as left by a run that added `batches`
+        ({start: uris}) and then died.
+        """
+        playlist = self.sp.user_playlist_create("mock-user", "Resumed", public=False)
+        journal = RunJournal(self.journal_path)
+        journal.record_playlist(playlist["id"], False)
+        for start, uris in sorted(batches.items()):
+            self.sp.playlist_add_items(playlist["id"], uris)
+            journal.record_batch(start, uris)
+        journal.close()
+        return playlist["id"]
+
+    def resume(self, playlist_id):
+        journal = RunJournal(self.journal_path)
+        self.addCleanup(journal.close)
+        queries = (script.prepare_query(track["name"], track["artists"][0]) for track in CATALOG)
+        _, resolved, not_found, complete = script.resolve_and_add(
+            self.sp, self.scheduler, playlist_id, "Resumed", queries, "thread", journal=journal)
+        self.assertEqual((resolved, not_found, complete), (URIS, [], True))
+        return self.server.api.playlists[playlist_id]["uris"]
+
+    def test_resume_after_contiguous_batches(self):
+        playlist_id = self.interrupted_run({0: URIS[:2], 2: URIS[2:4]})
+        self.assertEqual(self.resume(playlist_id), URIS)
+
+    def test_resume_after_a_failed_batch(self):
+        # The batch at 2 failed and the one at 4 went through, so the journal has a gap
+        playlist_id = self.interrupted_run({0: URIS[:2], 4: URIS[4:]})
+        self.assertEqual(self.resume(playlist_id), URIS)
+
+class StreamingResolveTest(MockApiTest):
+
+    def test_results_are_recorded_while_the_source_is_read(self):
+        scheduler = RequestScheduler(rate=100, max_rate=100, max_concurrency=1)
+        settled_when_read = []
+        settled = []
+
+        def queries():
+            for track in CATALOG:
+                settled_when_read.append(len(settled))
+                yield script.prepare_query(track["name"], track["artists"][0])
+
+        with mock.patch.object(script, "SEARCHES_PER_WORKER", 1):
+            _, resolved, not_found = script.resolve_tracks(
+                self.sp, scheduler, queries(), "thread", on_resolved=lambda idx, uri: settled.append(idx))
+        self.assertEqual((resolved, not_found), (URIS, []))
+        # With one search in flight, each track is settled before the next one is read
+        self.assertEqual(settled_when_read, list(range(len(CATALOG))))
+
+if __name__ == "__main__":
+    unittest.main()
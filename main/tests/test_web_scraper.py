@@ -0,0 +1,62 @@
+import os
+import unittest
+from unittest import mock
+
+from components import web_scraper
+from components.mock_server import load_pages, start_server
+
+# Offline checks of the HTTP scraper: reduced playlist pages from
+# tests/fixtures/ are served by the mock server and fetched over HTTP.
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+class FetchPlaylistTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server, base_url = start_server([], pages=load_pages(FIXTURES))
+        cls.site = base_url[:-len("/v1")]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def fetch(self, page):
+        with mock.patch.object(web_scraper.time, "sleep") as sleep:
+            name, rows = web_scraper.fetch_playlist(f"{self.site}/{page}")
+        return name, rows, [call.args[0] for call in sleep.call_args_list]
+
+    def test_track_rows(self):
+        name, rows, sleeps = self.fetch("playlist_rows")
+        self.assertEqual(name, "Late Night Drive")
+        self.assertEqual(rows, [
+            ("1", "Blinding Lights", "The Weeknd"),
+            ("2", "Tum Hi Ho", "Arijit Singh"),
+            ("3", "Cruel Summer", "Taylor Swift"),
+            ("4", "Lose Yourself", "Eminem"),
+        ])
+        self.assertEqual(sleeps, [])
+
+    def test_json_ld_takes_precedence(self):
+        name, rows, _ = self.fetch("playlist_ld_json")
+        self.assertEqual(name, "Roadtrip Hits")
+        self.assertEqual(rows, [
+            ("1", "Kesariya", "Pritam"),
+            ("2", "Levitating", "Dua Lipa"),
+            ("3", "Señorita", "Shawn Mendes"),
+        ])
+
+    def test_page_without_rows_is_retried_without_a_final_sleep(self):
+        name, rows, sleeps = self.fetch("playlist_shell")
+        self.assertEqual(rows, [])
+        self.assertEqual(name, "Private Mix on Amazon Music")
+        self.assertEqual(sleeps, [1, 2])
+        self.assertEqual(self.server.endpoint_counts["GET /playlist_shell"], web_scraper.FETCH_ATTEMPTS)
+
+    def test_missing_page_raises(self):
+        with self.assertRaises(web_scraper.requests.HTTPError):
+            self.fetch("no_such_playlist")
+
+if __name__ == "__main__":
+    unittest.main()